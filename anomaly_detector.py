@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Streaming Spending Anomaly Detection
+Keeps running statistics per vendor and per category (Welford mean/variance
+plus P² quantile sketches) that are updated as transactions are logged, and
+scores each new transaction in O(1) against the history before it.
+Flagged transactions feed the report's Report_4 sheet and the LLM context.
+"""
+
+import bisect
+import json
+import math
+import os
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from transaction_logger import TransactionLogger, get_transaction_logger
+
+# Bump when the saved state layout changes so older files are rebuilt
+STATE_VERSION = 2
+
+STATE_FILE = 'anomaly_stats.json'
+
+# Robust score (distance from the median in IQR-derived standard deviations) that flags a transaction
+ANOMALY_THRESHOLD = 3.5
+
+# Transactions a vendor needs before it is scored on its own (otherwise its category is used)
+MIN_HISTORY = 8
+
+# Smallest spread used for scoring: keeps a fixed-price vendor from flagging cent-level changes
+MIN_SCALE = 1.0
+MIN_SCALE_FRACTION = 0.05
+
+SKETCH_QUANTILES = (0.25, 0.5, 0.75)
+
+# Amounts kept exactly (exact quantiles) before switching to the P² sketches,
+# which need this much history before their markers settle
+EXACT_HISTORY = 30
+
+
+class P2Quantile:
+    """
+    P² (Jain & Chlamtac) running estimate of one quantile
+
+    Five markers in constant memory; each observation is an O(1) update.
+    """
+
+    def __init__(self, p: float):
+        self.p = p
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        q = self.heights
+        if len(q) < 5:
+            bisect.insort(q, x)
+            return
+
+        n = self.positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(q, x) - 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the middle markers toward their desired positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def value(self) -> Optional[float]:
+        """Current estimate (exact while fewer than five values have been seen)"""
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            rank = self.p * (len(q) - 1)
+            low = int(math.floor(rank))
+            high = min(low + 1, len(q) - 1)
+            return q[low] + (q[high] - q[low]) * (rank - low)
+        return q[2]
+
+    def to_dict(self) -> Dict:
+        return {'p': self.p, 'heights': self.heights, 'positions': self.positions, 'desired': self.desired}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "P2Quantile":
+        sketch = cls(data['p'])
+        sketch.heights = data['heights']
+        sketch.positions = data['positions']
+        sketch.desired = data['desired']
+        return sketch
+
+
+class SpendStats:
+    """
+    Welford mean/variance, min/max and quantiles of one vendor's or category's amounts
+
+    Quantiles are exact over the first EXACT_HISTORY amounts (kept sorted),
+    then come from P² sketches fed from the start.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.exact = []
+        self.quantiles = {p: P2Quantile(p) for p in SKETCH_QUANTILES}
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+        if self.count <= EXACT_HISTORY:
+            bisect.insort(self.exact, x)
+        else:
+            self.exact = []
+        for sketch in self.quantiles.values():
+            sketch.add(x)
+
+    def quantile(self, p: float) -> Optional[float]:
+        """Quantile of the amounts seen (exact while the history is short)"""
+        if not self.exact:
+            return self.quantiles[p].value()
+        rank = p * (len(self.exact) - 1)
+        low = int(math.floor(rank))
+        high = min(low + 1, len(self.exact) - 1)
+        return self.exact[low] + (self.exact[high] - self.exact[low]) * (rank - low)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def scale(self) -> float:
+        """
+        Robust spread: IQR / 1.349 (the standard deviation for normal data), floored
+
+        A short history's IQR often lands far below the true spread, so the
+        standard deviation is used when larger until the sketches take over.
+        """
+        iqr = self.quantile(0.75) - self.quantile(0.25)
+        spread = iqr / 1.349 if iqr > 0 else self.std
+        if self.exact:
+            spread = max(spread, self.std)
+        return max(spread, MIN_SCALE, MIN_SCALE_FRACTION * abs(self.median))
+
+    def score(self, x: float) -> float:
+        """Signed distance of an amount from the median, in robust standard deviations"""
+        return (x - self.median) / self.scale()
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max,
+            'exact': self.exact,
+            'quantiles': [sketch.to_dict() for sketch in self.quantiles.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SpendStats":
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = data['count'], data['mean'], data['m2']
+        stats.min, stats.max = data['min'], data['max']
+        stats.exact = data['exact']
+        for sketch_data in data['quantiles']:
+            sketch = P2Quantile.from_dict(sketch_data)
+            stats.quantiles[sketch.p] = sketch
+        return stats
+
+
+class AnomalyDetector:
+    """
+    Per-vendor and per-category spending statistics over TransactionLogger's archive
+
+    Registers with the logger so every logged transaction is scored, then
+    folded into the statistics. State (statistics, rows folded per month,
+    flags) is saved to anomaly_stats.json next to the archive.
+    """
+
+    def __init__(self, tx_logger: TransactionLogger = None):
+        self.tx_logger = tx_logger or get_transaction_logger()
+        self.path = Path(self.tx_logger.log_dir) / STATE_FILE
+        self._reset()
+        self.load()
+        self.sync()
+        self.tx_logger.add_insert_listener(self._on_insert)
+        self.tx_logger.add_update_listener(self._on_update)
+        self.tx_logger.add_save_listener(self.save)
+
+    def _reset(self):
+        self.vendors = {}
+        self.categories = {}
+        self.folded = {}
+        self.flags = {}
+        self._dirty = False
+
+    def load(self) -> bool:
+        """
+        Read saved state
+
+        Returns:
+            True if a current-version state file was read
+        """
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable anomaly statistics: {e}")
+            return False
+        if data.get('version') != STATE_VERSION:
+            return False
+
+        self.vendors = {key: SpendStats.from_dict(stats) for key, stats in data['vendors'].items()}
+        self.categories = {key: SpendStats.from_dict(stats) for key, stats in data['categories'].items()}
+        self.folded = data['folded']
+        self.flags = data['flags']
+        return True
+
+    def save(self):
+        """Write state if it changed (temp file + rename)"""
+        if not self._dirty:
+            return
+        data = {
+            'version': STATE_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'folded': self.folded,
+            'flags': self.flags,
+            'vendors': {key: stats.to_dict() for key, stats in self.vendors.items()},
+            'categories': {key: stats.to_dict() for key, stats in self.categories.items()},
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with self.tx_logger.lock.exclusive():
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def score(self, vendor: str, category: str, amount: float) -> Optional[Dict]:
+        """
+        Score one transaction against current statistics (O(1))
+
+        Uses the vendor's own history once it has MIN_HISTORY transactions,
+        otherwise the category's.
+
+        Returns:
+            Dictionary with 'score', 'basis', 'typical', 'range' and 'history',
+            or None if there isn't enough history yet
+        """
+        stats, basis = self.vendors.get(vendor), 'vendor'
+        if stats is None or stats.count < MIN_HISTORY:
+            stats, basis = self.categories.get(category), 'category'
+        if stats is None or stats.count < MIN_HISTORY:
+            return None
+
+        spend = abs(float(amount))
+        return {
+            'score': stats.score(spend),
+            'basis': basis,
+            'typical': stats.median,
+            'range': [stats.quantile(0.25), stats.quantile(0.75)],
+            'history': stats.count,
+        }
+
+    def _fold(self, month_key: str, rows: pd.DataFrame):
+        """Score then add rows (archive columns) in logging order"""
+        month_flags = self.flags.setdefault(month_key, [])
+        for tx in rows.itertuples(index=False):
+            result = self.score(tx.vendor, tx.category, tx.amount)
+            if result is not None and abs(result['score']) >= ANOMALY_THRESHOLD:
+                month_flags.append({
+                    'id': tx.id, 'date': tx.date, 'vendor': tx.vendor, 'category': tx.category,
+                    'amount': float(tx.amount), **result,
+                })
+
+            spend = abs(float(tx.amount))
+            self.vendors.setdefault(tx.vendor, SpendStats()).add(spend)
+            self.categories.setdefault(tx.category, SpendStats()).add(spend)
+
+        if not month_flags:
+            del self.flags[month_key]
+        self.folded[month_key] = self.folded.get(month_key, 0) + len(rows)
+        self._dirty = True
+
+    def _on_insert(self, month_key: str, rows: pd.DataFrame):
+        # Rows logged by another process since the last sync are folded first
+        if self.folded.get(month_key, 0) + len(rows) != self.tx_logger.get_month_aggregates(month_key).count:
+            self.sync()
+            return
+        self._fold(month_key, rows)
+
+    def _on_update(self, month_key: str, rows: pd.DataFrame):
+        # Flags show the new category; amounts already folded stay in the old category's statistics
+        categories = dict(zip(zip(rows['date'], rows['vendor'], rows['amount']), rows['category']))
+        for flag in self.flags.get(month_key, []):
+            category = categories.get((flag['date'], flag['vendor'], flag['amount']))
+            if category is not None and category != flag['category']:
+                flag['category'] = category
+                self._dirty = True
+
+    def sync(self) -> int:
+        """
+        Fold in archived transactions not seen yet (e.g. logged by another process)
+
+        Months only ever grow, so the rows past each month's folded count are
+        new; a month that shrank means the archive was rewritten, and the
+        statistics are rebuilt from scratch.
+
+        Returns:
+            Number of transactions folded
+        """
+        months = self.tx_logger.get_available_months()
+        counts = {m: self.tx_logger.get_month_aggregates(m).count for m in months}
+        if any(counts.get(m, 0) < folded for m, folded in self.folded.items()):
+            print("⚠️  Archive was rewritten; rebuilding anomaly statistics")
+            self._reset()
+
+        folded = 0
+        for month_key in months:
+            start = self.folded.get(month_key, 0)
+            if counts[month_key] > start:
+                rows = self.tx_logger.get_month_frame(month_key).iloc[start:]
+                self._fold(month_key, rows)
+                folded += len(rows)
+
+        if folded:
+            self.save()
+        return folded
+
+    def flagged(self, month_key: str = None) -> List[Dict]:
+        """Flagged transactions for a month (default: every month), largest score first"""
+        months = [month_key] if month_key else sorted(self.flags)
+        items = [dict(flag, month=m) for m in months for flag in self.flags.get(m, [])]
+        return sorted(items, key=lambda flag: abs(flag['score']), reverse=True)
+
+    def flagged_frame(self, month_key: str) -> pd.DataFrame:
+        """A month's flags as a report table"""
+        columns = ["Date", "Category", "Vendor", "Amount", "Typical", "Score", "Compared With"]
+        rows = [
+            [flag['date'], flag['category'], flag['vendor'], round(flag['amount'], 2),
+             round(flag['typical'], 2), round(flag['score'], 1), f"{flag['basis']} ({flag['history']} txns)"]
+            for flag in self.flagged(month_key)
+        ]
+        return pd.DataFrame(rows, columns=columns)
+
+    def build_anomaly_context(self, months: int = 2, top_n: int = 15) -> str:
+        """
+        Build context for LLM listing unusual transactions in recent months
+
+        Args:
+            months: Number of most recent archived months to include
+            top_n: Transactions to list
+
+        Returns:
+            Formatted context string for LLM (empty if nothing was flagged)
+        """
+        recent = self.tx_logger.get_available_months()[-months:]
+        items = [flag for m in recent for flag in self.flagged(m)][:top_n]
+        if not items:
+            return ""
+
+        context = ["UNUSUAL TRANSACTIONS (compared with each vendor's or category's usual amounts):"]
+        for flag in items:
+            direction = "above" if flag['score'] > 0 else "below"
+            context.append(
+                f"  - {flag['date']} {flag['vendor']} ({flag['category']}): ${abs(flag['amount']):.2f}, "
+                f"usually ${flag['typical']:.2f} — {abs(flag['score']):.1f} std devs {direction} its {flag['basis']}"
+            )
+        return "\n".join(context)
+
+
+# Global anomaly detector instance
+_anomaly_detector = None
+
+def get_anomaly_detector() -> AnomalyDetector:
+    """Get or create global anomaly detector"""
+    global _anomaly_detector
+    if _anomaly_detector is None:
+        _anomaly_detector = AnomalyDetector()
+    return _anomaly_detector
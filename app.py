@@ -64,6 +64,18 @@ def get_sender_email_from_config():
             return None
     return None
 
+def find_report_file(dir_path, month_input):
+    """Find the workbook for the requested month (MM/YYYY), else the newest report"""
+    parts = (month_input or "").split("/")
+    if len(parts) == 2 and parts[0].strip().isdigit():
+        expected = os.path.join(dir_path, f"Spending_Report_{parts[0].strip().zfill(2)}_{parts[1].strip()}.xlsx")
+        if os.path.exists(expected):
+            return expected
+    
+    # Month not given on the command line (generator prompted for it): use the newest report
+    candidates = sorted(Path(dir_path).glob("Spending_Report_*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return str(candidates[0]) if candidates else None
+
 def print_menu():
     """Print main menu options"""
     print("\n" + "─"*70)
@@ -207,45 +219,44 @@ def menu_reports():
             if not sender_email:
                 print("❌ No sender email configured. Please restart the app to configure email.")
             else:
-                # Find the generated report file
-                report_files = [f for f in os.listdir(dir_path) if f.startswith("Spending_Report") and f.endswith(".xlsx")]
-                if not report_files:
+                # Locate this run's report from the requested month, not whatever listdir returns first
+                report_path = find_report_file(dir_path, month_input)
+                if not report_path:
                     print("❌ No report file found.")
                 else:
-                    report_path = os.path.join(dir_path, report_files[0])
                     try:
-                        to_addr = input("\nEnter recipient email address: ").strip()
+                        to_addr = input("\nEnter recipient email address(es), comma-separated: ").strip()
                     except EOFError:
                         to_addr = ""
                     
                     if to_addr:
                         # Compose email with summary tables
                         try:
-                            import pandas as pd
                             from email.mime.multipart import MIMEMultipart
                             from email.mime.text import MIMEText
                             from email.mime.base import MIMEBase
                             from email import encoders
-                            from gmail_auth import send_email
-                            
-                            # Read Excel file to get data for email body
-                            report2_df = pd.read_excel(report_path, sheet_name='Report_2')
-                            report3_df = pd.read_excel(report_path, sheet_name='Report_3')
+                            from email_delivery import deliver_report, parse_recipients
+                            from report_outputs import load_report_sidecar, sidecar_path
                             
-                            # Generate HTML tables
-                            report2_html_table = report2_df.to_html(index=False, border=1)
-                            report3_html_table = report3_df[["Date", "Category", "Vendor", "Amount"]].to_html(index=False, border=1)
-                            
-                            # Extract month/year from filename
-                            filename = os.path.basename(report_path)
-                            # Format: Spending_Report_MM_YYYY.xlsx
-                            parts = filename.replace("Spending_Report_", "").replace(".xlsx", "").split("_")
-                            if len(parts) >= 2:
-                                mm = parts[0]
-                                yyyy = parts[1]
-                                date_str = f"{mm}/{yyyy}"
+                            # Use the tables the generator already rendered (sidecar next to the workbook)
+                            base_name = os.path.basename(report_path)[:-len(".xlsx")]
+                            sidecar = load_report_sidecar(sidecar_path(os.path.dirname(report_path), base_name))
+                            if sidecar is not None:
+                                report2_html_table = sidecar['html']['report_2']
+                                report3_html_table = sidecar['html']['report_3']
+                                date_str = sidecar['month']
                             else:
-                                date_str = "Current"
+                                # Older reports without a sidecar: fall back to reading the workbook
+                                import pandas as pd
+                                report2_df = pd.read_excel(report_path, sheet_name='Report_2')
+                                report3_df = pd.read_excel(report_path, sheet_name='Report_3')
+                                report2_html_table = report2_df.to_html(index=False, border=1)
+                                report3_html_table = report3_df[["Date", "Category", "Vendor", "Amount"]].to_html(index=False, border=1)
+                                
+                                # Format: Spending_Report_MM_YYYY.xlsx
+                                parts = base_name.replace("Spending_Report_", "").split("_")
+                                date_str = f"{parts[0]}/{parts[1]}" if len(parts) >= 2 else "Current"
                             
                             # Build HTML email body with tables
                             body_html = f"""
@@ -264,7 +275,8 @@ def menu_reports():
                             
                             msg = MIMEMultipart('alternative')
                             msg['From'] = sender_email
-                            msg['To'] = to_addr
+                            recipients = parse_recipients(to_addr)
+                            msg['To'] = ", ".join(recipients)
                             msg['Subject'] = f'Spending Report for {date_str}'
                             msg.attach(MIMEText(body_html, 'html'))
                             
@@ -281,8 +293,15 @@ def menu_reports():
                             print("EMAIL DELIVERY (OAuth2)")
                             print("="*70)
                             print("⏳ Opening browser for Google authentication...")
-                            send_email(sender_email, to_addr, msg, method='oauth')
-                            print("✅ Email sent successfully to " + to_addr)
+                            # One Gmail API session for all recipients; failures go to the outbox
+                            results = deliver_report(sender_email, recipients, msg, method='oauth')
+                            for r in results:
+                                if r.ok:
+                                    print(f"✅ Email sent successfully to {r.recipient}")
+                                elif r.queued:
+                                    print(f"⏳ Could not send to {r.recipient} ({r.error}); queued for retry")
+                                else:
+                                    print(f"❌ Failed to send to {r.recipient}: {r.error}")
                             print("="*70 + "\n")
                         except Exception as e:
                             print(f"❌ Failed to send email: {e}")
@@ -320,6 +339,9 @@ def menu_ai_assistant():
             ("2", "📊 Query logs & performance", "Ask AI about application metrics and logs"),
             ("3", "� Compare monthly expenses", "Analyze spending trends between months"),
             ("4", "📜 View query history", "Browse past AI responses and queries"),
+            ("5", "📈 Multi-month trends", "Rolling averages, year-over-year and trend slopes"),
+            ("6", "🔎 Search transactions", "Find archived transactions by date, vendor, category or amount"),
+            ("7", "🔁 Subscriptions & recurring bills", "Recurring charges with new, missed and price-changed alerts"),
             ("0", "⬅️  Back to main menu", "Return to main menu"),
         ]
         
@@ -328,7 +350,7 @@ def menu_ai_assistant():
             print(f"     {desc}\n")
         
         try:
-            choice = input("👉 Select option (0-4): ").strip()
+            choice = input("👉 Select option (0-7): ").strip()
         except EOFError:
             return False
         
@@ -340,10 +362,16 @@ def menu_ai_assistant():
             menu_compare_months()
         elif choice == "4":
             menu_query_history()
+        elif choice == "5":
+            menu_trends()
+        elif choice == "6":
+            menu_search_transactions()
+        elif choice == "7":
+            menu_recurring_charges()
         elif choice == "0":
             return True
         else:
-            print("\n❌ Invalid choice. Please select 0-4\n")
+            print("\n❌ Invalid choice. Please select 0-7\n")
 
 def menu_nlq():
     """Natural language queries"""
@@ -421,11 +449,11 @@ def menu_compare_months():
         print(f"📍 Comparing {month1} (latest) vs {month2} (previous)\n")
         print("🤖 Analyzing spending patterns with AI...\n")
         
-        # Get AI analysis
-        analysis = lm.compare_months_with_llm(month1, month2)
-        
+        # Stream the AI analysis as it is generated
         print("─" * 70)
-        print(f"\n💡 AI INSIGHTS:\n{analysis}\n")
+        print("\n💡 AI INSIGHTS:")
+        lm.compare_months_with_llm(month1, month2, stream=True)
+        print("\n")
         print("─" * 70)
         
         # Offer further comparison options
@@ -453,9 +481,10 @@ def menu_compare_months():
                         m1, m2 = months[indices[0]], months[indices[1]]
                         if m1 != m2:
                             print(f"\n🤖 Analyzing {m1} vs {m2}...\n")
-                            analysis = lm.compare_months_with_llm(m1, m2)
                             print("─" * 70)
-                            print(f"\n💡 AI INSIGHTS:\n{analysis}\n")
+                            print("\n💡 AI INSIGHTS:")
+                            lm.compare_months_with_llm(m1, m2, stream=True)
+                            print("\n")
                             print("─" * 70)
                         else:
                             print("\n❌ Please select two different months\n")
@@ -475,6 +504,168 @@ def menu_compare_months():
         input("\n👉 Press Enter to continue...")
         return False
 
+def menu_trends():
+    """Multi-month trend analysis over the transaction archive"""
+    print("\n" + "="*70)
+    print("📈 MULTI-MONTH SPENDING TRENDS")
+    print("="*70)
+    
+    try:
+        import pandas as pd
+        from transaction_logger import get_transaction_logger
+        from trend_analytics import TrendAnalytics
+        
+        tx_logger = get_transaction_logger()
+        tx_logger.load_monthly_logs()
+        months = tx_logger.get_available_months()
+        
+        if len(months) < 2:
+            print("⚠️  Not enough transaction data for trends.")
+            print(f"   Available months: {months if months else 'None'}")
+            input("\n👉 Press Enter to continue...")
+            return False
+        
+        try:
+            window_input = input("\n👉 Rolling window in months (default 3): ").strip()
+        except EOFError:
+            return False
+        window = int(window_input) if window_input.isdigit() and int(window_input) > 0 else 3
+        
+        trends = TrendAnalytics(tx_logger).analyze('category', window)
+        totals = trends['totals']
+        latest = totals.index[-1]
+        
+        print(f"\n📅 {totals.index[0]} to {latest} ({len(totals)} months)\n")
+        print(f"{'Category':<35} {'Latest':>10} {f'{window}-mo avg':>10} {'Trend/mo':>10} {'YoY %':>8}")
+        print("─" * 77)
+        order = trends['rolling'].loc[latest].abs().sort_values(ascending=False).index
+        for cat in order:
+            yoy = trends['yoy_percent'].at[latest, cat]
+            yoy_text = f"{yoy:+.1f}" if not pd.isna(yoy) else "—"
+            print(f"{str(cat)[:35]:<35} {totals.at[latest, cat]:>10.2f} "
+                  f"{trends['rolling'].at[latest, cat]:>10.2f} {trends['slope'][cat]:>+10.2f} {yoy_text:>8}")
+        
+        try:
+            ask = input("\n👉 Get AI insights on these trends? (y/N): ").strip().lower()
+        except EOFError:
+            return False
+        
+        if ask == "y":
+            from spending_lm import SpendingLM
+            lm = SpendingLM()
+            print("🤖 Analyzing trends with AI...\n")
+            print("─" * 70)
+            print("\n💡 AI INSIGHTS:")
+            lm.analyze_trends_with_llm(window, stream=True)
+            print("\n")
+            print("─" * 70)
+        
+        input("\n👉 Press Enter to continue...")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def menu_search_transactions():
+    """Search the transaction archive by date range, vendor, category and amount"""
+    print("\n" + "="*70)
+    print("🔎 SEARCH TRANSACTIONS")
+    print("="*70)
+    print("Press Enter to skip any filter.\n")
+    
+    try:
+        from transaction_logger import get_transaction_logger
+        
+        start = input("👉 From date (YYYY-MM-DD or YYYY-MM): ").strip() or None
+        end = input("👉 To date (YYYY-MM-DD or YYYY-MM): ").strip() or None
+        vendor = input("👉 Vendor (start of name, or *text to match anywhere): ").strip()
+        category = input("👉 Category: ").strip() or None
+        min_amount = input("👉 Minimum amount: ").strip()
+        max_amount = input("👉 Maximum amount: ").strip()
+        
+        results = get_transaction_logger().query(
+            start=start,
+            end=end,
+            vendor_prefix=vendor if vendor and not vendor.startswith('*') else None,
+            vendor_contains=vendor[1:] if vendor.startswith('*') and len(vendor) > 1 else None,
+            category=category,
+            min_amount=float(min_amount) if min_amount else None,
+            max_amount=float(max_amount) if max_amount else None,
+        )
+        
+        if results.empty:
+            print("\n⚠️  No matching transactions.")
+            input("\n👉 Press Enter to continue...")
+            return True
+        
+        shown = results.head(50)
+        print(f"\n{'Date':<12} {'Vendor':<30} {'Category':<25} {'Amount':>10}")
+        print("─" * 80)
+        for tx in shown.itertuples(index=False):
+            print(f"{tx.date:<12} {tx.vendor[:30]:<30} {tx.category[:25]:<25} {tx.amount:>10.2f}")
+        print("─" * 80)
+        if len(results) > len(shown):
+            print(f"(showing first {len(shown)} of {len(results)})")
+        print(f"{len(results)} transactions, total ${results['amount'].sum():.2f}")
+        
+        input("\n👉 Press Enter to continue...")
+        return True
+        
+    except EOFError:
+        return False
+    except ValueError as e:
+        print(f"❌ Invalid filter: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def menu_recurring_charges():
+    """Subscriptions and recurring bills detected in the transaction archive"""
+    print("\n" + "="*70)
+    print("🔁 SUBSCRIPTIONS & RECURRING BILLS")
+    print("="*70)
+    
+    try:
+        from recurring_detector import get_recurring_detector
+        
+        found = get_recurring_detector().detect()
+        if found.empty:
+            print("\n⚠️  No recurring charges found in the transaction archive.")
+            input("\n👉 Press Enter to continue...")
+            return True
+        
+        live = found[found['status'] != 'ended']
+        print(f"\n{'Vendor':<28} {'Every':<10} {'Amount':>10} {'Last':<12} {'Next':<12} {'Status'}")
+        print("─" * 90)
+        for item in live.itertuples(index=False):
+            notes = [item.status] if item.status != 'active' else []
+            if item.flags:
+                notes.append(item.flags)
+            print(f"{item.vendor[:28]:<28} {item.period:<10} {item.typical_amount:>10.2f} "
+                  f"{item.last_date:%Y-%m-%d}   {item.next_expected:%Y-%m-%d}   {', '.join(notes) or 'ok'}")
+        print("─" * 90)
+        print(f"{len(live)} recurring charges, about ${live['monthly_cost'].sum():.2f} per month")
+        
+        ended = found[found['status'] == 'ended']
+        if not ended.empty:
+            print(f"({len(ended)} older recurrences have stopped: {', '.join(ended['vendor'].head(10))})")
+        
+        for item in live[live['flags'].str.contains('price changed')].itertuples(index=False):
+            print(f"⚠️  {item.vendor} price changed: ${item.previous_price:.2f} → ${item.last_amount:.2f}")
+        for item in live[live['status'] == 'missed'].itertuples(index=False):
+            print(f"⚠️  {item.vendor} expected around {item.next_expected:%Y-%m-%d} but not charged")
+        
+        input("\n👉 Press Enter to continue...")
+        return True
+        
+    except EOFError:
+        return False
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
 def menu_manage_rules():
     """Manage categories and rules"""
     print("\n" + "="*70)
@@ -517,21 +708,20 @@ def menu_hierarchy():
             print("❌ categories.csv not found")
             return False
         
+        from category_tree import get_category_tree
+        
         df = pd.read_csv(categories_file)
+        tree = get_category_tree(categories_file)
         
-        # Print root categories (no parent)
+        # Print the tree once in display order (roots first, then their sub-categories)
         print("📂 ROOT CATEGORIES:")
         print("─"*70)
-        root_cats = df[df['ParentCategory'].isna()]
-        for _, row in root_cats.iterrows():
-            print(f"  • {row['CategoryName']}")
-            
-            # Print sub-categories
-            sub_cats = df[df['ParentCategory'] == row['CategoryName']]
-            if not sub_cats.empty:
-                for _, sub_row in sub_cats.iterrows():
-                    marker = "✨" if sub_row.get('IsUserDefined') == 'Yes' else "  "
-                    print(f"    {marker} ↳ {sub_row['CategoryName']}")
+        for name, depth in tree.walk():
+            if depth == 0:
+                print(f"  • {name}")
+            else:
+                marker = "✨" if name in tree.user_defined else "  "
+                print(f"  {'  ' * depth}{marker} ↳ {name}")
         
         print("\n✨ = Custom user-defined category")
         print("\nTotal categories: " + str(len(df)))
@@ -684,9 +874,9 @@ def menu_query_logs():
             question = None
         
         print("\n🔍 Analyzing logs...\n")
-        response = lm.query_logs(question)
-        
-        print(f"💡 Response:\n{response}\n")
+        print("💡 Response:")
+        lm.query_logs(question, stream=True)
+        print("\n")
         return True
         
     except Exception as e:
@@ -718,7 +908,12 @@ def menu_query_history():
         print(f"{item['index']}. [{item['timestamp']}]")
         print(f"   Q: {item['question']}")
         print(f"   A: {item['response_preview']}")
-        print(f"   ⏱️  {item['inference_time']:.2f}s | 💾 {item['response_length']} chars")
+        speed = ""
+        if item.get('tokens_per_second'):
+            speed = f" | ⚡ {item['tokens_per_second']:.1f} tok/s"
+        if item.get('time_to_first_token') is not None:
+            speed += f" | first token {item['time_to_first_token']:.2f}s"
+        print(f"   ⏱️  {item['inference_time']:.2f}s | 💾 {item['response_length']} chars{speed}")
         print()
     
     selection = input("View full response? (enter number or press Enter to skip): ").strip()
@@ -732,7 +927,12 @@ def menu_query_history():
             print(full_query['response'])
             print(f"\n⏱️  Inference time: {full_query['inference_time_seconds']:.2f}s")
             print(f"💾 Response length: {full_query['response_length']} characters")
-            print(f"🧠 Peak memory: {full_query['memory_peak_mb']:.1f} MB\n")
+            print(f"🧠 Peak memory: {full_query['memory_peak_mb']:.1f} MB")
+            if full_query.get('tokens_per_second'):
+                print(f"⚡ Generation: {full_query['tokens_generated']} tokens at {full_query['tokens_per_second']:.1f} tokens/s")
+            if full_query.get('time_to_first_token_seconds') is not None:
+                print(f"🚀 Time to first token: {full_query['time_to_first_token_seconds']:.2f}s")
+            print()
         else:
             print("❌ Invalid selection\n")
     
@@ -759,6 +959,15 @@ def interactive_menu():
     
     print_banner()
     
+    # Resume background retries of report emails left in the outbox by earlier sessions
+    try:
+        from email_delivery import resume_outbox
+        pending = resume_outbox()
+        if pending:
+            print(f"📤 Retrying {pending} queued report email(s) in the background")
+    except Exception:
+        pass
+    
     ai_enabled = get_ai_feature_enabled()
     
     # Build menu_actions dynamically based on AI feature status
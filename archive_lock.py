@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cross-Process Archive Locking
+Advisory fcntl locks on transaction_logs/.archive.lock so the report
+generator and the app can read and write the archive concurrently.
+Shared for reads, exclusive for writes; a no-op where fcntl is unavailable.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+LOCK_FILE = '.archive.lock'
+
+
+class ArchiveLock:
+    """
+    Re-entrant shared/exclusive lock on an archive directory
+
+    Nested acquisitions in the same process reuse the held lock; asking for
+    exclusive while holding shared upgrades it until the inner block exits.
+    flock converts a lock by releasing it first, so another process may
+    write in between: on_reacquire is called after every conversion so the
+    holder can re-validate what it read.
+    """
+
+    def __init__(self, log_dir: Path, on_reacquire: Callable[[], None] = None):
+        self.path = Path(log_dir) / LOCK_FILE
+        self.on_reacquire = on_reacquire
+        self._thread_lock = threading.RLock()
+        self._fd = None
+        self._mode = None
+        self._depth = 0
+
+    def _record_wait(self, mode: str, waited: float):
+        # Imported lazily: metrics_logger pulls in psutil and sets up logging
+        try:
+            from metrics_logger import get_metrics_logger
+            get_metrics_logger().log_lock_wait(str(self.path.parent), mode, waited)
+        except Exception:
+            pass
+
+    def _flock(self, mode: str):
+        start = time.time()
+        fcntl.flock(self._fd, fcntl.LOCK_EX if mode == 'exclusive' else fcntl.LOCK_SH)
+        self._record_wait(mode, time.time() - start)
+
+    @contextmanager
+    def _hold(self, mode: str):
+        with self._thread_lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+
+            previous = self._mode
+            upgraded = False
+            if self._depth == 0:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    self._flock(mode)
+                except BaseException:
+                    os.close(self._fd)
+                    self._fd = None
+                    raise
+                self._mode = mode
+            elif mode == 'exclusive' and previous == 'shared':
+                self._flock(mode)
+                self._mode = mode
+                upgraded = True
+
+            self._depth += 1
+            try:
+                if upgraded:
+                    self._reacquired()
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                    os.close(self._fd)
+                    self._fd = None
+                    self._mode = None
+                elif self._mode != previous:
+                    # Drop back to the outer block's shared lock
+                    fcntl.flock(self._fd, fcntl.LOCK_SH)
+                    self._mode = previous
+                    self._reacquired()
+
+    def _reacquired(self):
+        if self.on_reacquire is not None:
+            self.on_reacquire()
+
+    def shared(self):
+        """Context manager for reading the archive"""
+        return self._hold('shared')
+
+    def exclusive(self):
+        """Context manager for writing the archive"""
+        return self._hold('exclusive')
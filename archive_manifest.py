@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Transaction Archive Manifest
+manifest.json in the transaction_logs directory: per-month row counts,
+totals, category and top-vendor aggregates, kept current on every save so
+listing and comparing months never has to read transaction rows
+"""
+
+import json
+import os
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Bump when the entry layout changes so older manifests are rebuilt
+MANIFEST_VERSION = 2
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _merge_stat(stats: Dict[str, Dict], key: str, total: float, count: int, low: float, high: float):
+    """Fold sum/count/min/max into a per-key stats dictionary"""
+    stat = stats.get(key)
+    if stat is None:
+        stats[key] = {'total': total, 'count': count, 'min': low, 'max': high}
+    else:
+        stat['total'] += total
+        stat['count'] += count
+        stat['min'] = min(stat['min'], low)
+        stat['max'] = max(stat['max'], high)
+
+
+class MonthAggregates:
+    """
+    Running sum/count/min/max for one month, overall and per category and vendor
+
+    Updated as transactions are logged, so a summary never rescans rows.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.by_category = {}
+        self.by_vendor = {}
+
+    def add(self, category: str, vendor: str, amount: float):
+        """Fold in one transaction"""
+        amount = float(amount)
+        self.count += 1
+        self.total += amount
+        self.min = amount if self.min is None else min(self.min, amount)
+        self.max = amount if self.max is None else max(self.max, amount)
+        _merge_stat(self.by_category, category, amount, 1, amount, amount)
+        _merge_stat(self.by_vendor, vendor, amount, 1, amount, amount)
+
+    def add_frame(self, df: pd.DataFrame):
+        """Fold in a frame of transactions (archive columns) with one groupby per key"""
+        if df.empty:
+            return
+
+        amounts = df['amount'].astype(float)
+        self.count += len(df)
+        self.total += float(amounts.sum())
+        low, high = float(amounts.min()), float(amounts.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+        for column, stats in (('category', self.by_category), ('vendor', self.by_vendor)):
+            grouped = amounts.groupby(df[column]).agg(['sum', 'count', 'min', 'max'])
+            for key, row in zip(grouped.index, grouped.itertuples(index=False)):
+                _merge_stat(stats, key, float(row[0]), int(row[1]), float(row[2]), float(row[3]))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "MonthAggregates":
+        aggs = cls()
+        aggs.add_frame(df)
+        return aggs
+
+    @classmethod
+    def from_entry(cls, entry: Dict) -> "MonthAggregates":
+        """Rebuild from a manifest entry"""
+        aggs = cls()
+        aggs.count = entry['row_count']
+        aggs.total = entry['total_amount']
+        if aggs.count:
+            aggs.min = entry['min_transaction']
+            aggs.max = entry['max_transaction']
+        for source, stats in ((entry['by_category'], aggs.by_category), (entry['by_vendor'], aggs.by_vendor)):
+            for key, stat in source.items():
+                stats[key] = {'total': stat['total'], 'count': stat['count'], 'min': stat['min'], 'max': stat['max']}
+        return aggs
+
+    def top_vendors(self, n: int = 10) -> Dict[str, float]:
+        """Vendors with the largest totals"""
+        ranked = sorted(self.by_vendor.items(), key=lambda item: item[1]['total'], reverse=True)
+        return {vendor: stat['total'] for vendor, stat in ranked[:n]}
+
+    def summary(self, month_key: str) -> Dict:
+        """Spending summary in calculate_monthly_summary's shape"""
+        if not self.count:
+            return {
+                'month': month_key,
+                'total_transactions': 0,
+                'total_amount': 0,
+                'average_spending': 0,
+                'by_category': {},
+                'top_vendors': [],
+                'available': False
+            }
+
+        return {
+            'month': month_key,
+            'total_transactions': self.count,
+            'total_amount': self.total,
+            'average_spending': self.total / self.count,
+            'max_transaction': self.max,
+            'min_transaction': self.min,
+            'by_category': {
+                cat: {
+                    'total': stat['total'],
+                    'count': stat['count'],
+                    'average': stat['total'] / stat['count'],
+                    'min': stat['min'],
+                    'max': stat['max']
+                }
+                for cat, stat in self.by_category.items()
+            },
+            'top_vendors': self.top_vendors(),
+            'available': True
+        }
+
+
+def summarize_frame(month_key: str, df: pd.DataFrame) -> Dict:
+    """Calculate the spending summary for one month's archive frame"""
+    return MonthAggregates.from_frame(df).summary(month_key)
+
+
+class ArchiveManifest:
+    """
+    Per-month aggregates for an archive directory
+
+    Each entry holds row_count, total/average/max/min amounts, by_category,
+    by_vendor, top_vendors and a content_version that increases on every write.
+    """
+
+    def __init__(self, log_dir: Path):
+        self.path = Path(log_dir) / MANIFEST_FILE
+        self.backend = None
+        self.months = {}
+        self._stamp = None
+        self.load()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _disk_stamp(self) -> Optional[tuple]:
+        # Saves replace the file, so the inode changes even within one mtime tick
+        try:
+            stat = self.path.stat()
+            return (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def changed_on_disk(self) -> bool:
+        """Whether another process has saved the manifest since we read or wrote it"""
+        return self._disk_stamp() != self._stamp
+
+    def load(self) -> bool:
+        """
+        (Re)read manifest.json
+
+        Returns:
+            True if a current-version manifest was read
+        """
+        self.backend = None
+        self.months = {}
+        self._stamp = self._disk_stamp()
+        if self._stamp is None:
+            return False
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable archive manifest: {e}")
+            return False
+
+        if data.get('version') != MANIFEST_VERSION:
+            return False
+
+        self.backend = data.get('backend')
+        self.months = data.get('months', {})
+        return True
+
+    def save(self):
+        """Write manifest.json (temp file + rename)"""
+        data = {
+            'version': MANIFEST_VERSION,
+            'backend': self.backend,
+            'updated_at': datetime.now().isoformat(),
+            'months': dict(sorted(self.months.items())),
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._stamp = self._disk_stamp()
+
+    def list_months(self) -> List[str]:
+        """Months recorded in the manifest (sorted YYYY-MM keys)"""
+        return sorted(self.months)
+
+    def content_version(self, month_key: str) -> int:
+        """Write counter for a month (0 if unknown)"""
+        return self.months.get(month_key, {}).get('content_version', 0)
+
+    def update_month(self, month_key: str, aggregates: MonthAggregates):
+        """Record a freshly written month's aggregates (call save() afterwards)"""
+        summary = aggregates.summary(month_key)
+        self.months[month_key] = {
+            'row_count': summary['total_transactions'],
+            'total_amount': summary['total_amount'],
+            'average_spending': summary['average_spending'],
+            'max_transaction': summary.get('max_transaction', 0),
+            'min_transaction': summary.get('min_transaction', 0),
+            'by_category': summary['by_category'],
+            'by_vendor': {vendor: dict(stat) for vendor, stat in aggregates.by_vendor.items()},
+            'top_vendors': summary['top_vendors'],
+            'content_version': self.content_version(month_key) + 1,
+            'updated_at': datetime.now().isoformat(),
+        }
+
+    def aggregates(self, month_key: str) -> Optional[MonthAggregates]:
+        """A month's running aggregates, or None if the month isn't in the manifest"""
+        entry = self.months.get(month_key)
+        return MonthAggregates.from_entry(entry) if entry is not None else None
+
+    def summary(self, month_key: str) -> Optional[Dict]:
+        """
+        A month's summary in calculate_monthly_summary's shape
+
+        Returns:
+            Summary dictionary, or None if the month isn't in the manifest
+        """
+        entry = self.months.get(month_key)
+        if entry is None:
+            return None
+
+        return {
+            'month': month_key,
+            'total_transactions': entry['row_count'],
+            'total_amount': entry['total_amount'],
+            'average_spending': entry['average_spending'],
+            'max_transaction': entry['max_transaction'],
+            'min_transaction': entry['min_transaction'],
+            'by_category': entry['by_category'],
+            'top_vendors': entry['top_vendors'],
+            'available': entry['row_count'] > 0
+        }
+
+    def rebuild(self, backend, months: List[str] = None) -> int:
+        """
+        Recompute entries by reading months from a storage backend
+
+        Args:
+            backend: ArchiveBackend to read from
+            months: Months to rebuild (default: every month in the backend)
+
+        Returns:
+            Number of months summarized
+        """
+        if months is None:
+            self.months = {}
+            months = backend.list_months()
+
+        for month_key in months:
+            if backend.supports_aggregates:
+                aggregates = backend.aggregate_month(month_key)
+            else:
+                aggregates = MonthAggregates.from_frame(backend.read_month(month_key))
+            self.update_month(month_key, aggregates)
+
+        self.backend = backend.name
+        self.save()
+        return len(months)
+
+
+def rebuild_manifest(log_dir: Path, backend) -> ArchiveManifest:
+    """Rebuild manifest.json from scratch for an archive directory"""
+    manifest = ArchiveManifest(log_dir)
+    count = manifest.rebuild(backend)
+    print(f"✓ Rebuilt archive manifest for {count} month(s) → {manifest.path}")
+    return manifest
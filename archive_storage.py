@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+"""
+Transaction Archive Storage Backends
+Pluggable on-disk formats for TransactionLogger's monthly archives:
+- json:    transactions_YYYY-MM.json (original format) + .delta.jsonl appends
+- jsonl:   transactions_YYYY-MM.jsonl.gz (one record per line, streamed; jsonl-zstd: .jsonl.zst)
+- parquet: parquet/month=YYYY-MM/part-*.parquet (columnar, one partition per month)
+- sqlite:  transactions.db (indexed, summaries computed as SQL aggregates)
+
+Full writes go to a temp file that is renamed into place; saves that only add
+rows append a segment, and months are compacted once segments pile up.
+"""
+
+import gzip
+import io
+import json
+import os
+import sqlite3
+import threading
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List
+from archive_manifest import ArchiveManifest, MonthAggregates
+from archive_lock import ArchiveLock
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import pyarrow
+    PARQUET_AVAILABLE = True
+except ImportError:
+    try:
+        import fastparquet
+        PARQUET_AVAILABLE = True
+    except ImportError:
+        PARQUET_AVAILABLE = False
+
+# Column layout shared by every backend
+ARCHIVE_COLUMNS = ['id', 'date', 'vendor', 'amount', 'category', 'description', 'logged_at']
+
+# Rows per frame when streaming a month
+STREAM_CHUNK_ROWS = 10000
+
+
+def records_to_frame(records: List[Dict]) -> pd.DataFrame:
+    """Build a typed archive frame from transaction dicts"""
+    df = pd.DataFrame(records, columns=ARCHIVE_COLUMNS)
+    return normalize_frame(df)
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce an archive frame to the canonical column order and dtypes"""
+    df = df.reindex(columns=ARCHIVE_COLUMNS)
+    for col in ('id', 'date', 'vendor', 'category', 'description', 'logged_at'):
+        df[col] = df[col].fillna('').astype(str)
+    df['amount'] = pd.to_numeric(df['amount'], errors='coerce').fillna(0.0).astype('float64')
+    return df.reset_index(drop=True)
+
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict]:
+    """Convert an archive frame back to transaction dicts"""
+    return normalize_frame(df).to_dict(orient='records')
+
+
+class ArchiveCorruptionError(IOError):
+    """A stored month that can no longer be decoded"""
+
+
+class _BoundedReader(io.RawIOBase):
+    """Binary reader that stops after the first `limit` bytes of a file"""
+
+    def __init__(self, file_path: Path, limit: int):
+        self._file = open(file_path, 'rb')
+        self._left = limit
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._left <= 0:
+            return 0
+        view = memoryview(buffer)[:self._left]
+        n = self._file.readinto(view)
+        self._left -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _fsync_replace(tmp_path: Path, path: Path):
+    """Flush a finished temp file to disk and rename it over the target"""
+    with open(tmp_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ArchiveBackend:
+    """Base class for monthly archive storage"""
+
+    name = None
+
+    # True if the backend can summarize a month without loading its rows
+    supports_aggregates = False
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+    def list_months(self) -> List[str]:
+        """Months present in the archive (sorted YYYY-MM keys)"""
+        raise NotImplementedError
+
+    def has_month(self, month_key: str) -> bool:
+        """Check whether a month is stored"""
+        return month_key in self.list_months()
+
+    def read_month(self, month_key: str) -> pd.DataFrame:
+        """Read one month as a typed frame (empty frame if missing)"""
+        raise NotImplementedError
+
+    def iter_month(self, month_key: str, chunk_size: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Stream one month as typed frames in storage order
+
+        The default reads the whole month; streaming backends yield frames of
+        about chunk_size rows so callers never hold the full month.
+        """
+        yield self.read_month(month_key)
+
+    def filter_month(self, month_key: str, predicate: Callable[[pd.DataFrame], pd.Series]) -> pd.DataFrame:
+        """
+        Rows of a month matching a vectorized predicate, read chunk by chunk
+
+        Args:
+            month_key: Month to scan (YYYY-MM)
+            predicate: Function mapping an archive frame to a boolean mask
+
+        Returns:
+            Typed frame of the matching rows
+        """
+        matches = [chunk[predicate(chunk)] for chunk in self.iter_month(month_key)]
+        if not matches:
+            return records_to_frame([])
+        return normalize_frame(pd.concat(matches, ignore_index=True))
+
+    def write_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        """Replace one month with the given frame; returns the written path"""
+        raise NotImplementedError
+
+    def location(self, month_key: str) -> Path:
+        """Where a month is stored (for display)"""
+        raise NotImplementedError
+
+    def aggregate_month(self, month_key: str) -> MonthAggregates:
+        """Monthly aggregates computed in storage (only if supports_aggregates)"""
+        raise NotImplementedError
+
+    def summarize_month(self, month_key: str) -> Dict:
+        """Monthly summary computed in storage (only if supports_aggregates)"""
+        return self.aggregate_month(month_key).summary(month_key)
+
+    def append_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        """
+        Add rows to a stored month without rewriting it
+
+        The default rewrites the month; backends override this with a real append.
+        """
+        current = self.read_month(month_key)
+        return self.write_month(month_key, pd.concat([current, normalize_frame(df)], ignore_index=True))
+
+    def needs_compaction(self, month_key: str) -> bool:
+        """Whether appended segments should be merged into the month's base"""
+        return False
+
+    def compact_month(self, month_key: str) -> Path:
+        """Merge appended segments into a single base (atomic rewrite)"""
+        return self.write_month(month_key, self.read_month(month_key))
+
+
+class JsonArchiveBackend(ArchiveBackend):
+    """
+    Original format: one pretty-printed JSON document per month, plus a
+    transactions_YYYY-MM.delta.jsonl of rows appended since the last rewrite
+    """
+
+    name = 'json'
+
+    # Fold the delta into the base once it reaches this size (or half the base)
+    COMPACT_MIN_BYTES = 256 * 1024
+
+    def _path(self, month_key: str) -> Path:
+        return self.log_dir / f"transactions_{month_key}.json"
+
+    def _delta_path(self, month_key: str) -> Path:
+        return self.log_dir / f"transactions_{month_key}.delta.jsonl"
+
+    def list_months(self) -> List[str]:
+        months = set()
+        for file_path in self.log_dir.glob("transactions_*.json"):
+            months.add(file_path.stem[len("transactions_"):])
+        for file_path in self.log_dir.glob("transactions_*.delta.jsonl"):
+            months.add(file_path.name[len("transactions_"):-len(".delta.jsonl")])
+        return sorted(months)
+
+    def has_month(self, month_key: str) -> bool:
+        return self._path(month_key).exists() or self._delta_path(month_key).exists()
+
+    def _read_delta(self, month_key: str) -> List[Dict]:
+        delta_path = self._delta_path(month_key)
+        if not delta_path.exists():
+            return []
+
+        records = []
+        with open(delta_path, 'r') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append
+                    print(f"⚠️  Skipping unreadable line {line_no} in {delta_path.name}")
+        return records
+
+    def read_month(self, month_key: str) -> pd.DataFrame:
+        transactions = []
+        file_path = self._path(month_key)
+        if file_path.exists():
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+            transactions = data.get('transactions', [])
+        return records_to_frame(transactions + self._read_delta(month_key))
+
+    def write_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        file_path = self._path(month_key)
+        transactions = frame_to_records(df)
+
+        log_data = {
+            'month': month_key,
+            'generated_at': datetime.now().isoformat(),
+            'transaction_count': len(transactions),
+            'transactions': transactions
+        }
+
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(log_data, f, indent=2)
+        _fsync_replace(tmp_path, file_path)
+
+        # The base now holds everything
+        self._delta_path(month_key).unlink(missing_ok=True)
+        return file_path
+
+    def append_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        delta_path = self._delta_path(month_key)
+        lines = ''.join(json.dumps(record) + '\n' for record in frame_to_records(df))
+
+        with open(delta_path, 'ab') as f:
+            # Start on a fresh line if a previous append was cut short
+            if f.tell() > 0:
+                with open(delta_path, 'rb') as tail:
+                    tail.seek(-1, os.SEEK_END)
+                    if tail.read(1) != b'\n':
+                        f.write(b'\n')
+            f.write(lines.encode())
+            f.flush()
+            os.fsync(f.fileno())
+        return delta_path
+
+    def needs_compaction(self, month_key: str) -> bool:
+        delta_path = self._delta_path(month_key)
+        if not delta_path.exists():
+            return False
+        base_path = self._path(month_key)
+        base_size = base_path.stat().st_size if base_path.exists() else 0
+        return delta_path.stat().st_size >= max(self.COMPACT_MIN_BYTES, base_size // 2)
+
+    def location(self, month_key: str) -> Path:
+        return self._path(month_key)
+
+
+class JsonlArchiveBackend(ArchiveBackend):
+    """
+    Compressed JSON lines: transactions_YYYY-MM.jsonl.gz, one record per line
+
+    Appends add a gzip member to the end of the file (concatenated members
+    read back as one stream), and reads decompress line by line, so filters
+    and aggregates run without holding the whole month in memory.
+
+    A .committed file beside each month records how many bytes belong to
+    complete appends; readers stop there and the next append truncates any
+    member left torn by a crash, so later appends stay readable.
+    """
+
+    name = 'jsonl'
+    supports_aggregates = True
+    suffix = '.jsonl.gz'
+
+    def _compress(self, data: bytes) -> bytes:
+        return gzip.compress(data)
+
+    def _open_lines(self, raw: io.RawIOBase):
+        """Text stream over every compressed member read from raw"""
+        return gzip.open(raw, 'rt', encoding='utf-8')
+
+    def _path(self, month_key: str) -> Path:
+        return self.log_dir / f"transactions_{month_key}{self.suffix}"
+
+    def _committed_path(self, file_path: Path) -> Path:
+        return file_path.with_name(file_path.name + '.committed')
+
+    def _committed_size(self, file_path: Path) -> int:
+        """Bytes of complete appends (the whole file if no marker was written)"""
+        size = file_path.stat().st_size
+        try:
+            return min(int(self._committed_path(file_path).read_text()), size)
+        except (OSError, ValueError):
+            return size
+
+    def _commit(self, file_path: Path, size: int):
+        committed_path = self._committed_path(file_path)
+        tmp_path = committed_path.with_name(committed_path.name + '.tmp')
+        tmp_path.write_text(str(size))
+        _fsync_replace(tmp_path, committed_path)
+
+    def list_months(self) -> List[str]:
+        return sorted(
+            file_path.name[len("transactions_"):-len(self.suffix)]
+            for file_path in self.log_dir.glob(f"transactions_*{self.suffix}")
+        )
+
+    def has_month(self, month_key: str) -> bool:
+        return self._path(month_key).exists()
+
+    def iter_records(self, month_key: str) -> Iterator[Dict]:
+        """Stream one month's transaction dicts"""
+        file_path = self._path(month_key)
+        if not file_path.exists():
+            return
+
+        with _BoundedReader(file_path, self._committed_size(file_path)) as raw, self._open_lines(raw) as f:
+            line_no = 0
+            try:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"⚠️  Skipping unreadable line {line_no} in {file_path.name}")
+            except Exception as e:
+                # Torn appends sit past the committed size, so this is real damage
+                raise ArchiveCorruptionError(f"{file_path.name} is corrupt after line {line_no}: {e}") from e
+
+    def iter_month(self, month_key: str, chunk_size: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        chunk = []
+        for record in self.iter_records(month_key):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield records_to_frame(chunk)
+                chunk = []
+        if chunk:
+            yield records_to_frame(chunk)
+
+    def read_month(self, month_key: str) -> pd.DataFrame:
+        return records_to_frame(list(self.iter_records(month_key)))
+
+    def _encode(self, df: pd.DataFrame) -> bytes:
+        lines = ''.join(json.dumps(record) + '\n' for record in frame_to_records(df))
+        return self._compress(lines.encode('utf-8'))
+
+    def write_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        file_path = self._path(month_key)
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(self._encode(df))
+        # No marker means the whole (new) file is committed
+        self._committed_path(file_path).unlink(missing_ok=True)
+        _fsync_replace(tmp_path, file_path)
+        return file_path
+
+    def append_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        file_path = self._path(month_key)
+        data = self._encode(df)
+        committed = self._committed_size(file_path) if file_path.exists() else 0
+        if not self._committed_path(file_path).exists():
+            self._commit(file_path, committed)
+
+        with open(file_path, 'ab') as f:
+            # Drop a member left torn by an interrupted append
+            f.truncate(committed)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._commit(file_path, committed + len(data))
+        return file_path
+
+    # Appended members cost a few bytes each, so compaction is only on demand
+    # (archive_storage.py --compact jsonl)
+
+    def aggregate_month(self, month_key: str) -> MonthAggregates:
+        aggs = MonthAggregates()
+        for chunk in self.iter_month(month_key):
+            aggs.add_frame(chunk)
+        return aggs
+
+    def location(self, month_key: str) -> Path:
+        return self._path(month_key)
+
+
+class ZstdJsonlArchiveBackend(JsonlArchiveBackend):
+    """Zstandard-compressed JSON lines: transactions_YYYY-MM.jsonl.zst (needs zstandard)"""
+
+    name = 'jsonl-zstd'
+    suffix = '.jsonl.zst'
+
+    def __init__(self, log_dir: Path):
+        if not ZSTD_AVAILABLE:
+            raise ImportError("The jsonl-zstd archive needs the zstandard package (pip install zstandard)")
+        super().__init__(log_dir)
+
+    def _compress(self, data: bytes) -> bytes:
+        # Each append is its own frame; the reader continues across frames
+        return zstandard.ZstdCompressor().compress(data)
+
+    def _open_lines(self, raw: io.RawIOBase):
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+
+
+class ParquetArchiveBackend(ArchiveBackend):
+    """Columnar format: parquet/month=YYYY-MM/part-00000.parquet (needs pyarrow or fastparquet)"""
+
+    name = 'parquet'
+
+    # Merge a partition's parts once it has more than this many
+    COMPACT_MAX_PARTS = 8
+
+    def __init__(self, log_dir: Path):
+        if not PARQUET_AVAILABLE:
+            raise ImportError("The parquet archive needs pyarrow (pip install pyarrow) or fastparquet")
+        super().__init__(log_dir)
+        self.root = self.log_dir / 'parquet'
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _partition(self, month_key: str) -> Path:
+        return self.root / f"month={month_key}"
+
+    def list_months(self) -> List[str]:
+        months = []
+        for part_dir in self.root.glob("month=*"):
+            if any(part_dir.glob("*.parquet")):
+                months.append(part_dir.name[len("month="):])
+        return sorted(months)
+
+    def has_month(self, month_key: str) -> bool:
+        return any(self._partition(month_key).glob("*.parquet"))
+
+    def read_month(self, month_key: str) -> pd.DataFrame:
+        parts = sorted(self._partition(month_key).glob("*.parquet"))
+        if not parts:
+            return records_to_frame([])
+        return normalize_frame(pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True))
+
+    def iter_month(self, month_key: str, chunk_size: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        # One frame per part file
+        for part in sorted(self._partition(month_key).glob("*.parquet")):
+            yield normalize_frame(pd.read_parquet(part))
+
+    def _write_part(self, file_path: Path, df: pd.DataFrame):
+        # Hidden temp name so readers globbing *.parquet never see a partial file
+        tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+        normalize_frame(df).to_parquet(tmp_path, index=False)
+        _fsync_replace(tmp_path, file_path)
+
+    def write_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        partition = self._partition(month_key)
+        partition.mkdir(parents=True, exist_ok=True)
+
+        file_path = partition / "part-00000.parquet"
+        self._write_part(file_path, df)
+
+        # A full write replaces any other parts of the partition
+        for stale in partition.glob("*.parquet"):
+            if stale != file_path:
+                stale.unlink()
+        return file_path
+
+    def append_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        partition = self._partition(month_key)
+        partition.mkdir(parents=True, exist_ok=True)
+
+        # Parts sort by name, so appended rows stay after earlier ones
+        existing = sorted(partition.glob("part-*.parquet"))
+        next_index = int(existing[-1].stem.split('-')[1]) + 1 if existing else 0
+        file_path = partition / f"part-{next_index:05d}.parquet"
+        self._write_part(file_path, df)
+        return file_path
+
+    def needs_compaction(self, month_key: str) -> bool:
+        return len(list(self._partition(month_key).glob("*.parquet"))) > self.COMPACT_MAX_PARTS
+
+    def location(self, month_key: str) -> Path:
+        return self._partition(month_key)
+
+
+class SqliteArchiveBackend(ArchiveBackend):
+    """
+    Single SQLite database (WAL mode) indexed on month, category and vendor
+    Summaries, comparisons and month listings run as SQL aggregates
+    """
+
+    name = 'sqlite'
+    supports_aggregates = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id          TEXT NOT NULL,
+            month       TEXT NOT NULL,
+            date        TEXT,
+            vendor      TEXT,
+            amount      REAL NOT NULL,
+            category    TEXT,
+            description TEXT,
+            logged_at   TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_month ON transactions(month);
+        CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category, month);
+        CREATE INDEX IF NOT EXISTS idx_transactions_vendor ON transactions(vendor, month);
+    """
+
+    def __init__(self, log_dir: Path):
+        super().__init__(log_dir)
+        self.db_path = self.log_dir / 'transactions.db'
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def list_months(self) -> List[str]:
+        with self._lock:
+            rows = self.conn.execute("SELECT DISTINCT month FROM transactions ORDER BY month").fetchall()
+        return [r[0] for r in rows]
+
+    def has_month(self, month_key: str) -> bool:
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM transactions WHERE month = ? LIMIT 1", (month_key,)).fetchone()
+        return row is not None
+
+    def read_month(self, month_key: str) -> pd.DataFrame:
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM transactions WHERE month = ? ORDER BY rowid",
+                self.conn, params=(month_key,)
+            )
+        return normalize_frame(df)
+
+    def iter_month(self, month_key: str, chunk_size: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        # Keyset pagination on rowid, so the connection lock is only held per chunk
+        last_rowid = 0
+        while True:
+            with self._lock:
+                chunk = pd.read_sql_query(
+                    f"SELECT rowid AS row_id, {', '.join(ARCHIVE_COLUMNS)} FROM transactions "
+                    "WHERE month = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    self.conn, params=(month_key, last_rowid, chunk_size)
+                )
+            if chunk.empty:
+                return
+            last_rowid = int(chunk['row_id'].iloc[-1])
+            yield normalize_frame(chunk)
+
+    def _insert_rows(self, month_key: str, df: pd.DataFrame, replace: bool) -> Path:
+        df = normalize_frame(df)
+        rows = list(zip(
+            df['id'], [month_key] * len(df), df['date'], df['vendor'], df['amount'].tolist(),
+            df['category'], df['description'], df['logged_at']
+        ))
+
+        # One transaction per call: (delete +) bulk insert
+        with self._lock, self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM transactions WHERE month = ?", (month_key,))
+            self.conn.executemany(
+                "INSERT INTO transactions (id, month, date, vendor, amount, category, description, logged_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return self.db_path
+
+    def write_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        return self._insert_rows(month_key, df, replace=True)
+
+    def append_month(self, month_key: str, df: pd.DataFrame) -> Path:
+        return self._insert_rows(month_key, df, replace=False)
+
+    def compact_month(self, month_key: str) -> Path:
+        # Appends are plain inserts; there are no segments to merge
+        return self.db_path
+
+    def location(self, month_key: str) -> Path:
+        return self.db_path
+
+    def count_transactions(self) -> int:
+        """Total rows across all months"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def aggregate_month(self, month_key: str) -> MonthAggregates:
+        aggs = MonthAggregates()
+        with self._lock:
+            count, total, min_tx, max_tx = self.conn.execute(
+                "SELECT COUNT(*), SUM(amount), MIN(amount), MAX(amount) "
+                "FROM transactions WHERE month = ?", (month_key,)
+            ).fetchone()
+            if not count:
+                return aggs
+
+            aggs.count, aggs.total, aggs.min, aggs.max = int(count), float(total), float(min_tx), float(max_tx)
+            for column, stats in (('category', aggs.by_category), ('vendor', aggs.by_vendor)):
+                rows = self.conn.execute(
+                    f"SELECT {column}, SUM(amount), COUNT(*), MIN(amount), MAX(amount) "
+                    f"FROM transactions WHERE month = ? GROUP BY {column}", (month_key,)
+                ).fetchall()
+                for key, key_total, key_count, key_min, key_max in rows:
+                    stats[key] = {'total': float(key_total), 'count': int(key_count),
+                                  'min': float(key_min), 'max': float(key_max)}
+        return aggs
+
+
+# Registered backends by name
+ARCHIVE_BACKENDS = {
+    JsonArchiveBackend.name: JsonArchiveBackend,
+    JsonlArchiveBackend.name: JsonlArchiveBackend,
+    ZstdJsonlArchiveBackend.name: ZstdJsonlArchiveBackend,
+    ParquetArchiveBackend.name: ParquetArchiveBackend,
+    SqliteArchiveBackend.name: SqliteArchiveBackend,
+}
+
+
+def get_archive_backend(name: str, log_dir: Path) -> ArchiveBackend:
+    """Create a backend by name"""
+    name = (name or 'json').lower()
+    if name not in ARCHIVE_BACKENDS:
+        raise ValueError(f"Unknown archive backend '{name}' (choose from: {', '.join(ARCHIVE_BACKENDS)})")
+    return ARCHIVE_BACKENDS[name](log_dir)
+
+
+def migrate_archive(log_dir: Path, target: str, source: str = 'json') -> Dict[str, int]:
+    """
+    One-shot copy of every month from one backend to another
+    (the source files are left in place)
+
+    Args:
+        log_dir: transaction_logs directory
+        target: Backend name to write
+        source: Backend name to read (default: the original JSON files)
+
+    Returns:
+        Dictionary of month -> transactions migrated
+    """
+    src = get_archive_backend(source, log_dir)
+    dst = get_archive_backend(target, log_dir)
+
+    migrated = {}
+    with ArchiveLock(log_dir).exclusive():
+        for month_key in src.list_months():
+            df = src.read_month(month_key)
+            dst.write_month(month_key, df)
+            migrated[month_key] = len(df)
+            print(f"✓ Migrated {len(df)} transactions for {month_key} → {dst.location(month_key)}")
+
+        # Same months, same aggregates: the manifest now describes the target
+        manifest = ArchiveManifest(log_dir)
+        if manifest.backend == src.name:
+            manifest.backend = dst.name
+            manifest.save()
+
+    return migrated
+
+
+def compact_archive(log_dir: Path, backend: str = 'json') -> Dict[str, Path]:
+    """
+    Merge every month's appended segments into its base file
+
+    Args:
+        log_dir: transaction_logs directory
+        backend: Backend name to compact
+
+    Returns:
+        Dictionary of month -> compacted path
+    """
+    store = get_archive_backend(backend, log_dir)
+
+    compacted = {}
+    with ArchiveLock(log_dir).exclusive():
+        for month_key in store.list_months():
+            compacted[month_key] = store.compact_month(month_key)
+            print(f"✓ Compacted {month_key} → {store.location(month_key)}")
+
+    return compacted
+
+
+def main():
+    """Command line entry point for archive migration and compaction"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Transaction archive storage tools")
+    parser.add_argument("--log-dir", default=None, help="transaction_logs directory (default: ~/.config/SpendingApp/transaction_logs)")
+    parser.add_argument("--from", dest="source", default="json", help="Backend to migrate from")
+    parser.add_argument("--to", dest="target", default=None, help=f"Backend to migrate to ({', '.join(ARCHIVE_BACKENDS)})")
+    parser.add_argument("--compact", metavar="BACKEND", default=None, help="Merge appended segments for a backend's months")
+    args = parser.parse_args()
+
+    if not args.target and not args.compact:
+        parser.error("one of --to or --compact is required")
+
+    log_dir = Path(args.log_dir) if args.log_dir else Path.home() / '.config' / 'SpendingApp' / 'transaction_logs'
+
+    if args.compact:
+        compacted = compact_archive(log_dir, args.compact)
+        print(f"\nCompacted {len(compacted)} month(s)")
+
+    if args.target:
+        migrated = migrate_archive(log_dir, args.target, args.source)
+        print(f"\nMigrated {sum(migrated.values())} transactions across {len(migrated)} month(s)")
+        print(f"Set \"archive_backend\": \"{args.target}\" in ~/.config/SpendingApp/config.json to use it")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Per-Category Budgets
+Monthly budgets from budgets.csv, checked against spend-to-date that is
+rolled up the ParentCategory hierarchy and kept current as transactions
+are logged, so budget status never rescans transactions
+"""
+
+import calendar
+import os
+import pandas as pd
+from datetime import date
+from typing import Dict, List
+from category_tree import CATEGORIES_FILE, CategoryTree, get_category_tree
+from transaction_logger import TransactionLogger, get_transaction_logger
+
+BUDGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budgets.csv")
+
+# Share of the prorated budget spent so far that marks a category as at risk
+AT_RISK_PACE = 1.1
+
+# Share of the full budget that marks a category as at risk regardless of pace
+AT_RISK_USED = 0.9
+
+
+def load_budgets(path: str = None) -> Dict[str, float]:
+    """
+    Read budgets.csv (CategoryName, MonthlyBudget)
+
+    Returns:
+        Category -> monthly budget (blank or non-positive budgets are skipped)
+    """
+    path = path or BUDGETS_FILE
+    if not os.path.exists(path):
+        return {}
+
+    df = pd.read_csv(path)
+    amounts = pd.to_numeric(df["MonthlyBudget"], errors="coerce")
+    return {
+        str(name).strip(): float(amount)
+        for name, amount in zip(df["CategoryName"], amounts)
+        if pd.notna(amount) and amount > 0 and str(name).strip()
+    }
+
+
+class BudgetTracker:
+    """
+    Budget-to-date per category and month
+
+    Spend per month is seeded from TransactionLogger's running per-category
+    aggregates and rolled up the hierarchy once; after that each logged
+    batch is added to its category and every ancestor, so status is a
+    dictionary lookup. A parent's budget covers its own spend and all of
+    its sub-categories.
+    """
+
+    def __init__(self, tx_logger: TransactionLogger = None,
+                 budgets_file: str = None, categories_file: str = None):
+        self.tx_logger = tx_logger or get_transaction_logger()
+        self.budgets_file = budgets_file or BUDGETS_FILE
+        self.categories_file = categories_file or CATEGORIES_FILE
+        self.budgets = {}
+        self.tree = None
+        self._budgets_mtime = None
+        self.rolled = {}   # month -> category -> signed spend including sub-categories
+        self.counts = {}   # month -> transactions folded into rolled
+        self._refresh()
+        self.tx_logger.add_insert_listener(self._on_insert)
+        self.tx_logger.add_update_listener(self._on_update)
+
+    def _refresh(self):
+        """Reload budgets.csv and the category tree if either file changed"""
+        try:
+            mtime = os.path.getmtime(self.budgets_file)
+        except OSError:
+            mtime = None
+        if mtime != self._budgets_mtime:
+            self.budgets = load_budgets(self.budgets_file)
+            self._budgets_mtime = mtime
+
+        try:
+            tree = get_category_tree(self.categories_file)
+        except Exception:
+            tree = CategoryTree(pd.DataFrame(columns=["CategoryName", "ParentCategory"]))
+        if tree is not self.tree:
+            # Rollups depend on the hierarchy, so they are rebuilt from the aggregates
+            self.tree = tree
+            self.rolled = {}
+            self.counts = {}
+            self._check_hierarchy()
+
+    def _check_hierarchy(self):
+        """Warn when sub-category budgets add up to more than their parent's"""
+        for parent, budget in self.budgets.items():
+            children = sum(self.budgets.get(child, 0.0) for child in self.tree.children(parent))
+            if children > budget:
+                print(f"⚠️  Budgets for sub-categories of {parent} ({children:.2f}) exceed its budget ({budget:.2f})")
+
+    def _seed(self, month_key: str):
+        """Roll a month's per-category totals from the archive aggregates"""
+        aggregates = self.tx_logger.get_month_aggregates(month_key)
+        own = {category: stat['total'] for category, stat in aggregates.by_category.items()}
+        self.rolled[month_key] = self.tree.rollup(own)
+        self.counts[month_key] = aggregates.count
+
+    def _on_insert(self, month_key: str, rows: pd.DataFrame):
+        if month_key not in self.rolled:
+            return  # Seeded from the aggregates when first asked for
+        # Rows logged by another process since seeding are picked up by reseeding
+        if self.counts[month_key] + len(rows) != self.tx_logger.get_month_aggregates(month_key).count:
+            self._seed(month_key)
+            return
+
+        rolled = self.rolled[month_key]
+        for category, total in rows.groupby('category')['amount'].sum().items():
+            for name in [category] + self.tree.ancestors(category):
+                rolled[name] = rolled.get(name, 0.0) + float(total)
+        self.counts[month_key] += len(rows)
+
+    def _on_update(self, month_key: str, rows: pd.DataFrame):
+        # Re-categorized rows move spend between branches; reseeded when next asked for
+        self.rolled.pop(month_key, None)
+        self.counts.pop(month_key, None)
+
+    def spent(self, month_key: str) -> Dict[str, float]:
+        """Month-to-date spend per category, including sub-categories"""
+        self._refresh()
+        if month_key not in self.rolled or self.counts[month_key] != self.tx_logger.get_month_aggregates(month_key).count:
+            self._seed(month_key)
+        return {category: abs(total) for category, total in self.rolled[month_key].items()}
+
+    def status(self, month_key: str, as_of: date = None) -> List[Dict]:
+        """
+        Budget status for every budgeted category
+
+        Args:
+            month_key: Month in YYYY-MM format
+            as_of: Day the month is judged at (default: today within the current month, else month end)
+
+        Returns:
+            List of dictionaries (hierarchy order) with category, depth, budget, spent,
+            remaining, used (fraction of budget), expected (prorated budget to date)
+            and status ('over', 'at risk' or 'on track')
+        """
+        spent = self.spent(month_key)
+        year, month = int(month_key[:4]), int(month_key[5:7])
+        days_in_month = calendar.monthrange(year, month)[1]
+        if as_of is None:
+            today = date.today()
+            as_of = today if (today.year, today.month) == (year, month) else date(year, month, days_in_month)
+        elapsed = min(max(as_of.day if (as_of.year, as_of.month) == (year, month) else days_in_month, 1), days_in_month)
+
+        ordered = [(name, depth) for name, depth in self.tree.walk() if name in self.budgets]
+        ordered += [(name, 0) for name in sorted(self.budgets) if name not in self.tree.depth_of]
+
+        items = []
+        for category, depth in ordered:
+            budget = self.budgets[category]
+            amount = spent.get(category, 0.0)
+            expected = budget * elapsed / days_in_month
+            if amount > budget:
+                state = 'over'
+            elif amount > expected * AT_RISK_PACE or amount > budget * AT_RISK_USED:
+                state = 'at risk'
+            else:
+                state = 'on track'
+            items.append({
+                'category': category,
+                'depth': depth,
+                'budget': budget,
+                'spent': amount,
+                'remaining': budget - amount,
+                'used': amount / budget,
+                'expected': expected,
+                'status': state,
+            })
+        return items
+
+    def status_frame(self, month_key: str, as_of: date = None) -> pd.DataFrame:
+        """A month's budget status as a report table"""
+        columns = ["Category", "Budget", "Spent", "Remaining", "Used", "Expected To Date", "Status"]
+        rows = [
+            ["  " * item['depth'] + item['category'], round(item['budget'], 2), round(item['spent'], 2),
+             round(item['remaining'], 2), f"{item['used'] * 100:.1f}%", round(item['expected'], 2), item['status']]
+            for item in self.status(month_key, as_of)
+        ]
+        return pd.DataFrame(rows, columns=columns)
+
+    def build_budget_context(self, month_key: str = None) -> str:
+        """
+        Build context for LLM with budget status
+
+        Args:
+            month_key: Month in YYYY-MM format (default: latest archived month)
+
+        Returns:
+            Formatted context string for LLM (empty if no budgets are set)
+        """
+        if month_key is None:
+            months = self.tx_logger.get_available_months()
+            if not months:
+                return ""
+            month_key = months[-1]
+
+        items = self.status(month_key)
+        if not items:
+            return ""
+
+        context = [f"BUDGET STATUS FOR {month_key} (budgets include sub-categories):"]
+        for item in items:
+            left = (f"${item['remaining']:.2f} left" if item['remaining'] >= 0
+                    else f"over by ${-item['remaining']:.2f}")
+            context.append(
+                f"  - {item['category']}: ${item['spent']:.2f} of ${item['budget']:.2f} "
+                f"({item['used'] * 100:.0f}% used, {left}) — {item['status'].upper()}"
+            )
+        return "\n".join(context)
+
+
+# Global budget tracker instance
+_budget_tracker = None
+
+def get_budget_tracker() -> BudgetTracker:
+    """Get or create global budget tracker"""
+    global _budget_tracker
+    if _budget_tracker is None:
+        _budget_tracker = BudgetTracker()
+    return _budget_tracker
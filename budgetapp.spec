@@ -3,7 +3,7 @@ import sys
 import os
 from PyInstaller.utils.hooks import collect_data_files
 
-datas = [('categories.csv', '.'), ('category_rules.csv', '.')]
+datas = [('categories.csv', '.'), ('category_rules.csv', '.'), ('budgets.csv', '.')]
 if os.path.exists('.gmail_oauth_config'):
     datas.append(('.gmail_oauth_config', '.'))
 
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Category Hierarchy Index
+Builds the ParentCategory tree from categories.csv once and computes
+bottom-up rollups of category totals (shared by reports and app menus)
+"""
+
+import os
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+CATEGORIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "categories.csv")
+
+
+class CategoryTree:
+    """
+    Parent/child index over categories with arbitrary depth
+
+    The pre-order walk is computed once at construction; rollups iterate
+    it in reverse so every child is folded into its parent in one pass.
+    """
+
+    def __init__(self, categories_df: pd.DataFrame):
+        """Build the index from a categories DataFrame (CategoryName, ParentCategory)"""
+
+        self.parent_of = {}
+        self.children_of = {}
+        self.user_defined = set()
+        self.order = []  # Category names in categories.csv order
+
+        for _, row in categories_df.iterrows():
+            name = str(row["CategoryName"]).strip()
+            if not name or name in self.parent_of:
+                continue
+            parent = row.get("ParentCategory")
+            parent = None if pd.isna(parent) or not str(parent).strip() else str(parent).strip()
+            self.parent_of[name] = parent
+            self.children_of[name] = []
+            self.order.append(name)
+            if row.get("IsUserDefined") == "Yes":
+                self.user_defined.add(name)
+
+        # Unknown parents and cycles are treated as roots so every category is reachable
+        for name in self.order:
+            if self.parent_of[name] not in self.parent_of or self._has_cycle(name):
+                self.parent_of[name] = None
+
+        for name in self.order:
+            parent = self.parent_of[name]
+            if parent is not None:
+                self.children_of[parent].append(name)
+
+        self.roots = [name for name in self.order if self.parent_of[name] is None]
+
+        # Pre-order walk: (name, depth)
+        self._walk = []
+        stack = [(name, 0) for name in reversed(self.roots)]
+        while stack:
+            name, depth = stack.pop()
+            self._walk.append((name, depth))
+            for child in reversed(self.children_of[name]):
+                stack.append((child, depth + 1))
+        self.depth_of = dict(self._walk)
+
+    def _has_cycle(self, name: str) -> bool:
+        """Check whether following parents from name loops back on itself"""
+        seen = {name}
+        parent = self.parent_of.get(name)
+        while parent is not None:
+            if parent in seen:
+                return True
+            seen.add(parent)
+            parent = self.parent_of.get(parent)
+        return False
+
+    @classmethod
+    def from_csv(cls, path: str = None) -> "CategoryTree":
+        """Load the tree from categories.csv"""
+        return cls(pd.read_csv(path or CATEGORIES_FILE))
+
+    def walk(self) -> List[Tuple[str, int]]:
+        """Categories in display order (parents before children) with their depth"""
+        return list(self._walk)
+
+    def names(self) -> List[str]:
+        """Category names in display order"""
+        return [name for name, _ in self._walk]
+
+    def children(self, name: str) -> List[str]:
+        """Direct children of a category"""
+        return list(self.children_of.get(name, []))
+
+    def parent(self, name: str) -> Optional[str]:
+        """Parent of a category (None for roots and unknown categories)"""
+        return self.parent_of.get(name)
+
+    def ancestors(self, name: str) -> List[str]:
+        """Parents of a category from nearest to root"""
+        result = []
+        parent = self.parent_of.get(name)
+        while parent is not None:
+            result.append(parent)
+            parent = self.parent_of.get(parent)
+        return result
+
+    def root_of(self, name: str) -> str:
+        """Top-level category a category rolls up into"""
+        ancestors = self.ancestors(name)
+        return ancestors[-1] if ancestors else name
+
+    def rollup(self, totals: Dict[str, float]) -> Dict[str, float]:
+        """
+        Roll category totals up the hierarchy
+
+        Args:
+            totals: Category -> own total (categories missing from the tree are kept as-is)
+
+        Returns:
+            Category -> total including all descendants
+        """
+        rolled = {name: float(totals.get(name, 0.0)) for name, _ in self._walk}
+
+        # Reverse pre-order visits every child before its parent
+        for name, _ in reversed(self._walk):
+            parent = self.parent_of[name]
+            if parent is not None:
+                rolled[parent] += rolled[name]
+
+        for name, total in totals.items():
+            if name not in rolled:
+                rolled[name] = float(total)
+
+        return rolled
+
+
+# Cached tree instance (rebuilt only when categories.csv changes)
+_category_tree_cache = None
+_category_tree_key = None
+
+def get_category_tree(path: str = None) -> CategoryTree:
+    """Get the category tree for categories.csv, building it once per file version"""
+    global _category_tree_cache, _category_tree_key
+
+    path = path or CATEGORIES_FILE
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if _category_tree_cache is None or _category_tree_key != key:
+        _category_tree_cache = CategoryTree.from_csv(path)
+        _category_tree_key = key
+    return _category_tree_cache
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+Report Email Delivery
+Sends a report to several recipients over one authenticated SMTP or Gmail
+API session, and spools failed sends to a local outbox that is retried
+with exponential backoff in the background
+"""
+
+import copy
+import json
+import os
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+import base64
+from email import message_from_bytes
+from email import policy
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from gmail_auth import get_gmail_auth
+
+
+class DeliveryResult:
+    """Outcome of sending to one recipient"""
+
+    def __init__(self, recipient: str, ok: bool, error: str = None, queued: bool = False):
+        self.recipient = recipient
+        self.ok = ok
+        self.error = error
+        self.queued = queued
+
+    def __repr__(self):
+        status = "sent" if self.ok else ("queued" if self.queued else "failed")
+        return f"DeliveryResult({self.recipient!r}, {status})"
+
+
+def message_for_recipient(msg, recipient: str):
+    """Copy of msg addressed to a single recipient"""
+    m = copy.deepcopy(msg)
+    del m['To']
+    m['To'] = recipient
+    return m
+
+
+def parse_recipients(value: str) -> List[str]:
+    """Split a comma/semicolon/space separated address list (duplicates removed, order kept)"""
+    recipients = []
+    for addr in value.replace(";", ",").replace(" ", ",").split(","):
+        addr = addr.strip()
+        if addr and addr not in recipients:
+            recipients.append(addr)
+    return recipients
+
+
+# ========================================================
+# Transports
+# ========================================================
+class SmtpTransport:
+    """
+    One SMTP connection reused for every message in a delivery
+    Tries STARTTLS first and falls back to SMTPS once per session (not per message)
+    """
+
+    def __init__(self,
+                 host: str = 'smtp.gmail.com',
+                 port: int = 587,
+                 ssl_port: Optional[int] = 465,
+                 use_tls: bool = True,
+                 authenticate: Callable = None,
+                 timeout: int = 60):
+        """
+        Args:
+            host: SMTP server
+            port: STARTTLS (or plain, with use_tls=False) port
+            ssl_port: SMTPS fallback port (None to disable)
+            use_tls: Use STARTTLS/SMTPS (disable for a local test server)
+            authenticate: Callable(server) that logs the connection in (None for no auth)
+            timeout: Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.ssl_port = ssl_port if use_tls else None
+        self.use_tls = use_tls
+        self.authenticate = authenticate
+        self.timeout = timeout
+        self.server = None
+
+    def _context(self):
+        try:
+            import certifi
+            return ssl.create_default_context(cafile=certifi.where())
+        except ImportError:
+            return ssl.create_default_context()
+
+    def open(self):
+        """Connect and authenticate (no-op if already connected)"""
+        if self.server is not None:
+            return self.server
+
+        server = None
+        try:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.ehlo()
+            if self.use_tls:
+                server.starttls(context=self._context())
+                server.ehlo()
+            if self.authenticate:
+                self.authenticate(server)
+        except smtplib.SMTPAuthenticationError:
+            server.close()
+            raise
+        except Exception:
+            if server is not None:
+                server.close()
+            if not self.ssl_port:
+                raise
+            server = smtplib.SMTP_SSL(self.host, self.ssl_port, context=self._context(), timeout=self.timeout)
+            try:
+                if self.authenticate:
+                    self.authenticate(server)
+            except Exception:
+                server.close()
+                raise
+
+        self.server = server
+        return server
+
+    def send(self, sender_email: str, recipient: str, msg):
+        """Send one message over the open connection"""
+        self.open().send_message(msg, from_addr=sender_email, to_addrs=[recipient])
+
+    def send_many(self, sender_email: str, messages: Dict[str, object]) -> Dict[str, Optional[str]]:
+        """
+        Send recipient -> message over one session
+
+        Returns:
+            recipient -> error string (None on success)
+        """
+        errors = {}
+        for recipient, msg in messages.items():
+            try:
+                self.send(sender_email, recipient, msg)
+                errors[recipient] = None
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+                # Connection dropped mid-delivery: reconnect once for the remaining messages
+                self.close()
+                try:
+                    self.send(sender_email, recipient, msg)
+                    errors[recipient] = None
+                except Exception as e2:
+                    errors[recipient] = str(e2)
+            except Exception as e:
+                errors[recipient] = str(e)
+        return errors
+
+    def close(self):
+        """Close the connection"""
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+
+class GmailApiTransport:
+    """Sends through the session's cached Gmail API client using batch requests"""
+
+    # Gmail allows up to 100 calls per batch; stay well below it
+    BATCH_SIZE = 50
+
+    def __init__(self, auth=None, interactive: bool = True):
+        self.auth = auth or get_gmail_auth()
+        self.interactive = interactive
+
+    def send_many(self, sender_email: str, messages: Dict[str, object]) -> Dict[str, Optional[str]]:
+        """
+        Send recipient -> message as Gmail API batch requests
+
+        Returns:
+            recipient -> error string (None on success)
+        """
+        service = self.auth.get_gmail_service(interactive=self.interactive)
+        errors = {}
+        items = list(messages.items())
+
+        for start in range(0, len(items), self.BATCH_SIZE):
+            chunk = items[start:start + self.BATCH_SIZE]
+
+            def callback(request_id, response, exception):
+                recipient = chunk[int(request_id)][0]
+                errors[recipient] = str(exception) if exception is not None else None
+
+            batch = service.new_batch_http_request(callback=callback)
+            for i, (recipient, msg) in enumerate(chunk):
+                raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
+                batch.add(service.users().messages().send(userId='me', body={'raw': raw}), request_id=str(i))
+
+            try:
+                batch.execute()
+            except Exception as e:
+                for recipient, _ in chunk:
+                    errors.setdefault(recipient, str(e))
+
+        return errors
+
+    def close(self):
+        pass
+
+
+def smtp_xoauth2_authenticator(sender_email: str, auth=None, interactive: bool = True) -> Callable:
+    """Authenticator that logs an SMTP connection in with the cached OAuth2 token"""
+    auth = auth or get_gmail_auth()
+
+    def authenticate(server):
+        creds = auth.get_oauth2_credentials(scope='smtp', interactive=interactive)
+        auth_string = f'user={sender_email}\x01auth=Bearer {creds.token}\x01\x01'
+        auth_b64 = base64.b64encode(auth_string.encode()).decode()
+        code, resp = server.docmd('AUTH', 'XOAUTH2 ' + auth_b64)
+        if code != 235:
+            raise smtplib.SMTPAuthenticationError(code, resp)
+
+    return authenticate
+
+
+def smtp_login_authenticator(sender_email: str, password: str) -> Callable:
+    """Authenticator that logs an SMTP connection in with email + (app) password"""
+
+    def authenticate(server):
+        server.login(sender_email, password)
+
+    return authenticate
+
+
+# ========================================================
+# Outbox spool
+# ========================================================
+class Outbox:
+    """
+    Local spool of failed sends
+    Each entry is <id>.eml (the message) plus <id>.json (recipient, attempts, next retry).
+    A worker claims an entry by renaming <id>.json to <id>.sending before
+    sending it, so concurrent workers (in this or another process) never send
+    the same entry twice.
+    """
+
+    BASE_DELAY_SECONDS = 30
+    MAX_DELAY_SECONDS = 3600
+    MAX_ATTEMPTS = 8
+
+    # Claims older than this are from a worker that died mid-send
+    STALE_CLAIM_SECONDS = 15 * 60
+
+    def __init__(self, outbox_dir: str = None):
+        """Initialize outbox"""
+
+        if outbox_dir is None:
+            home = Path.home()
+            outbox_dir = home / '.config' / 'SpendingApp' / 'outbox'
+
+        self.outbox_dir = Path(outbox_dir)
+        self.failed_dir = self.outbox_dir / 'failed'
+        self.outbox_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _write_json(self, path: Path, data: Dict):
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """Delay before the next retry after `attempts` failures"""
+        return min(self.BASE_DELAY_SECONDS * (2 ** max(attempts - 1, 0)), self.MAX_DELAY_SECONDS)
+
+    def enqueue(self, sender_email: str, recipient: str, msg, method: str, error: str = "",
+                smtp_settings: Dict = None) -> str:
+        """Spool a message for retry (with the SMTP server it was meant for); returns the entry ID"""
+        entry_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        entry = {
+            'id': entry_id,
+            'sender': sender_email,
+            'recipient': recipient,
+            'method': method,
+            'attempts': 1,
+            'last_error': error,
+            'queued_at': datetime.now().isoformat(),
+            'next_attempt_at': time.time() + self.backoff_seconds(1),
+        }
+        if smtp_settings is not None:
+            entry['smtp'] = dict(smtp_settings)
+
+        with self._lock:
+            with open(self.outbox_dir / f"{entry_id}.eml", 'wb') as f:
+                f.write(msg.as_bytes())
+            self._write_json(self.outbox_dir / f"{entry_id}.json", entry)
+        return entry_id
+
+    def pending(self) -> List[Dict]:
+        """All spooled entries, oldest first"""
+        entries = []
+        for meta_file in sorted(self.outbox_dir.glob('*.json')):
+            try:
+                with open(meta_file, 'r') as f:
+                    entries.append(json.load(f))
+            except Exception:
+                continue
+        return entries
+
+    def due(self, now: float = None) -> List[Dict]:
+        """Entries whose backoff has elapsed"""
+        now = time.time() if now is None else now
+        return [e for e in self.pending() if e.get('next_attempt_at', 0) <= now]
+
+    def next_due_at(self) -> Optional[float]:
+        """Earliest retry time, or None if the outbox is empty"""
+        times = [e.get('next_attempt_at', 0) for e in self.pending()]
+        return min(times) if times else None
+
+    def load_message(self, entry: Dict):
+        """Read a spooled message back"""
+        with open(self.outbox_dir / f"{entry['id']}.eml", 'rb') as f:
+            return message_from_bytes(f.read(), policy=policy.compat32)
+
+    def claim(self, entry: Dict) -> Optional[Dict]:
+        """
+        Take an entry for sending (atomic rename of its .json to .sending)
+
+        Returns:
+            The entry as stored when claimed, or None if another worker has it
+            or its retry is no longer due
+        """
+        claimed = self.outbox_dir / f"{entry['id']}.sending"
+        try:
+            os.rename(self.outbox_dir / f"{entry['id']}.json", claimed)
+        except FileNotFoundError:
+            return None
+
+        with open(claimed, 'r') as f:
+            current = json.load(f)
+        if current.get('next_attempt_at', 0) > time.time():
+            self.release(current)
+            return None
+        return current
+
+    def release(self, entry: Dict):
+        """Return a claimed entry to the queue unchanged"""
+        os.replace(self.outbox_dir / f"{entry['id']}.sending", self.outbox_dir / f"{entry['id']}.json")
+
+    def release_stale_claims(self) -> int:
+        """Requeue entries claimed by workers that died mid-send; returns how many"""
+        released = 0
+        for claimed in self.outbox_dir.glob('*.sending'):
+            try:
+                if time.time() - claimed.stat().st_mtime > self.STALE_CLAIM_SECONDS:
+                    os.replace(claimed, claimed.with_suffix('.json'))
+                    released += 1
+            except FileNotFoundError:
+                continue
+        return released
+
+    def mark_sent(self, entry: Dict):
+        """Remove a delivered (claimed) entry"""
+        with self._lock:
+            for suffix in ('.eml', '.sending', '.json'):
+                path = self.outbox_dir / f"{entry['id']}{suffix}"
+                if path.exists():
+                    path.unlink()
+
+    def mark_failed(self, entry: Dict, error: str):
+        """Record a failed retry and release the claim; entries past MAX_ATTEMPTS move to outbox/failed"""
+        with self._lock:
+            entry['attempts'] = entry.get('attempts', 0) + 1
+            entry['last_error'] = error
+            entry['next_attempt_at'] = time.time() + self.backoff_seconds(entry['attempts'])
+
+            if entry['attempts'] >= self.MAX_ATTEMPTS:
+                self.failed_dir.mkdir(parents=True, exist_ok=True)
+                os.replace(self.outbox_dir / f"{entry['id']}.eml", self.failed_dir / f"{entry['id']}.eml")
+                self._write_json(self.failed_dir / f"{entry['id']}.json", entry)
+            else:
+                self._write_json(self.outbox_dir / f"{entry['id']}.json", entry)
+            (self.outbox_dir / f"{entry['id']}.sending").unlink(missing_ok=True)
+
+
+# ========================================================
+# Delivery
+# ========================================================
+
+# Running outbox retry threads, keyed by outbox, sender, method and SMTP server
+_outbox_workers = {}
+_outbox_workers_lock = threading.Lock()
+
+
+class ReportDelivery:
+    """
+    Sends a message to a recipient list over one session and spools failures
+
+    Example:
+        delivery = ReportDelivery(sender, method='oauth')
+        results = delivery.send(msg, ['a@example.com', 'b@example.com'])
+    """
+
+    def __init__(self,
+                 sender_email: str,
+                 method: str = 'oauth',
+                 password: str = None,
+                 outbox: Outbox = None,
+                 smtp_host: str = 'smtp.gmail.com',
+                 smtp_port: int = 587,
+                 smtp_ssl_port: Optional[int] = 465,
+                 smtp_use_tls: bool = True):
+        """
+        Args:
+            sender_email: Gmail address
+            method: 'oauth' (Gmail API), 'smtp_oauth', 'smtp_login' or 'smtp' (no auth, e.g. a local test server)
+            password: Password for smtp_login (kept in memory only, never spooled)
+            outbox: Outbox for failed sends (default: ~/.config/SpendingApp/outbox)
+            smtp_host/smtp_port/smtp_ssl_port/smtp_use_tls: SMTP server settings
+        """
+        if method not in ('oauth', 'smtp_oauth', 'smtp_login', 'smtp'):
+            raise ValueError(f'Invalid method: {method}')
+
+        self.sender_email = sender_email
+        self.method = method
+        self.password = password
+        self.outbox = outbox or Outbox()
+        self.smtp_settings = {
+            'host': smtp_host,
+            'port': smtp_port,
+            'ssl_port': smtp_ssl_port,
+            'use_tls': smtp_use_tls,
+        }
+
+    def _worker_key(self) -> tuple:
+        smtp = () if self.method == 'oauth' else tuple(self.smtp_settings.values())
+        return (str(self.outbox.outbox_dir), self.sender_email, self.method) + smtp
+
+    def _owns(self, entry: Dict) -> bool:
+        """Whether an outbox entry was queued by a delivery like this one (entries without 'smtp' predate it)"""
+        if entry.get('sender') != self.sender_email or entry.get('method') != self.method:
+            return False
+        return self.method == 'oauth' or entry.get('smtp', self.smtp_settings) == self.smtp_settings
+
+    def _transport(self, interactive: bool = True):
+        """Create a transport for one delivery session (background retries never open a browser)"""
+        if self.method == 'oauth':
+            return GmailApiTransport(interactive=interactive)
+
+        if self.method == 'smtp_oauth':
+            authenticate = smtp_xoauth2_authenticator(self.sender_email, interactive=interactive)
+        elif self.method == 'smtp_login':
+            if not self.password:
+                raise RuntimeError('smtp_login needs a password')
+            authenticate = smtp_login_authenticator(self.sender_email, self.password)
+        else:
+            authenticate = None
+
+        return SmtpTransport(authenticate=authenticate, **self.smtp_settings)
+
+    def _send_messages(self, messages: Dict[str, object]) -> Dict[str, Optional[str]]:
+        transport = self._transport()
+        try:
+            return transport.send_many(self.sender_email, messages)
+        except Exception as e:
+            # Session could not be opened at all: every recipient failed
+            return {recipient: str(e) for recipient in messages}
+        finally:
+            transport.close()
+
+    def send(self, msg, recipients: List[str], spool_failures: bool = True) -> List[DeliveryResult]:
+        """
+        Send msg to each recipient (individually addressed) over one session
+
+        Args:
+            msg: MIME message (its To header is replaced per recipient)
+            recipients: Recipient addresses
+            spool_failures: Queue failed sends in the outbox for background retry
+
+        Returns:
+            One DeliveryResult per recipient
+        """
+        messages = {r: message_for_recipient(msg, r) for r in recipients}
+        errors = self._send_messages(messages)
+
+        results = []
+        for recipient in recipients:
+            error = errors.get(recipient)
+            if error is None:
+                results.append(DeliveryResult(recipient, True))
+            elif spool_failures:
+                self.outbox.enqueue(self.sender_email, recipient, messages[recipient], self.method, error,
+                                    None if self.method == 'oauth' else self.smtp_settings)
+                results.append(DeliveryResult(recipient, False, error, queued=True))
+            else:
+                results.append(DeliveryResult(recipient, False, error))
+
+        if spool_failures and any(r.queued for r in results):
+            self.start_outbox_worker()
+
+        return results
+
+    def retry_outbox(self) -> Dict[str, int]:
+        """
+        Retry due outbox entries for this sender, one session per pass
+
+        Returns:
+            {'sent': n, 'failed': n}
+        """
+        due = [e for e in self.outbox.due() if self._owns(e)]
+        due = [claimed for claimed in map(self.outbox.claim, due) if claimed is not None]
+        if not due:
+            return {'sent': 0, 'failed': 0}
+
+        # Transports key by recipient; send per entry so two queued reports to one person both go out
+        sent = failed = 0
+        processed = set()
+        transport = None
+        try:
+            transport = self._transport(interactive=False)
+            for entry in due:
+                msg = self.outbox.load_message(entry)
+                errors = transport.send_many(self.sender_email, {entry['recipient']: msg})
+                error = errors.get(entry['recipient'])
+                if error is None:
+                    self.outbox.mark_sent(entry)
+                    sent += 1
+                else:
+                    self.outbox.mark_failed(entry, error)
+                    failed += 1
+                processed.add(entry['id'])
+        except Exception as e:
+            # Every claimed entry not yet handled is released with the error
+            for entry in due:
+                if entry['id'] not in processed:
+                    self.outbox.mark_failed(entry, str(e))
+                    failed += 1
+        finally:
+            if transport is not None:
+                transport.close()
+
+        return {'sent': sent, 'failed': failed}
+
+    def start_outbox_worker(self):
+        """Retry the outbox in a daemon thread until it is empty (one thread per sender and server per process)"""
+        key = self._worker_key()
+        with _outbox_workers_lock:
+            worker = _outbox_workers.get(key)
+            if worker is not None and worker.is_alive():
+                return
+            worker = threading.Thread(target=self._worker_loop, name='outbox-retry', daemon=True)
+            _outbox_workers[key] = worker
+            worker.start()
+
+    def _worker_loop(self):
+        while True:
+            mine = [e for e in self.outbox.pending() if self._owns(e)]
+            if not mine:
+                return
+            wait = min(e.get('next_attempt_at', 0) for e in mine) - time.time()
+            if wait > 0:
+                time.sleep(min(wait, 60))
+                continue
+            try:
+                self.retry_outbox()
+            except Exception:
+                time.sleep(self.outbox.BASE_DELAY_SECONDS)
+
+
+def deliver_report(sender_email: str, recipients: List[str], msg,
+                   method: str = 'oauth', password: str = None) -> List[DeliveryResult]:
+    """Send a report to several recipients; failures are queued in the outbox"""
+    delivery = ReportDelivery(sender_email, method=method, password=password)
+    return delivery.send(msg, recipients)
+
+
+def resume_outbox(outbox: Outbox = None) -> int:
+    """
+    Start background retries for spooled sends left over from earlier sessions,
+    against the SMTP server each was queued for (smtp_login entries are
+    skipped: their password is never stored)
+
+    Returns:
+        Number of pending entries being retried
+    """
+    outbox = outbox or Outbox()
+    outbox.release_stale_claims()
+    pending = [e for e in outbox.pending() if e.get('method') != 'smtp_login']
+
+    workers = {}
+    for e in pending:
+        smtp = e.get('smtp') or {}
+        key = (e['sender'], e['method'], smtp.get('host'), smtp.get('port'), smtp.get('ssl_port'), smtp.get('use_tls'))
+        workers[key] = smtp
+
+    for (sender, method, *_), smtp in workers.items():
+        settings = {f"smtp_{name}": value for name, value in smtp.items()
+                    if name in ('host', 'port', 'ssl_port', 'use_tls')}
+        ReportDelivery(sender, method=method, outbox=outbox, **settings).start_outbox_worker()
+
+    return len(pending)
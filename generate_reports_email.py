@@ -13,6 +13,16 @@ from pathlib import Path
 import argparse
 from metrics_logger import get_metrics_logger
 from transaction_logger import get_transaction_logger
+from anomaly_detector import get_anomaly_detector
+from recurring_detector import get_recurring_detector
+from budget_tracker import get_budget_tracker
+from spend_forecast import get_spend_forecaster
+from category_tree import get_category_tree
+from report_cache import get_report_cache, report_fingerprint
+from report_outputs import (
+    OUTPUT_FORMATS, parse_formats, write_report_frames,
+    sidecar_path, write_report_sidecar,
+)
 
 # -------------------------------------------------------------------
 # Security & Validation Functions
@@ -36,8 +46,17 @@ parser.add_argument("--dir", dest="cli_dir", help="Directory containing statemen
 parser.add_argument("--files", dest="cli_files", help="Comma-separated file indices (1-based) or 'all'")
 parser.add_argument("--month", dest="cli_month", help="Month for report in MM/YYYY")
 parser.add_argument("--send-email", dest="cli_send_email", action="store_true", help="Send report via email if available")
+parser.add_argument("--format", dest="cli_format", default="xlsx",
+                    help=f"Comma-separated output formats ({','.join(OUTPUT_FORMATS)}); omit xlsx for headless runs")
+parser.add_argument("--no-cache", dest="cli_no_cache", action="store_true", help="Rebuild the report even if inputs are unchanged")
 args, _ = parser.parse_known_args()
 
+try:
+    output_formats = parse_formats(args.cli_format)
+except ValueError as e:
+    print(f"Error: {e}")
+    exit(1)
+
 print("\n" + "="*70)
 print("SPENDING REPORT GENERATOR")
 print("="*70)
@@ -63,6 +82,9 @@ if not validate_directory_path(dir_path):
 print(f"\nScanning directory: {dir_path}")
 available_files = []
 for f in Path(dir_path).glob("*.[cC][sS][vV]"):
+    # Skip this tool's own --format csv outputs
+    if f.name.startswith("Spending_Report_"):
+        continue
     available_files.append(str(f))
     print(f"  - {f.name}")
 for f in Path(dir_path).glob("*.[pP][dD][fF]"):
@@ -197,6 +219,14 @@ def normalize_vendor(desc: str) -> str:
 # Cache for category rules (loaded once on first use)
 _category_rules_cache = None
 
+def find_rules_file() -> str:
+    """Locate category_rules.csv (current directory first, then the script directory)."""
+    rules_file = "category_rules.csv"
+    if not os.path.exists(rules_file):
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        rules_file = os.path.join(script_dir, "category_rules.csv")
+    return rules_file
+
 def load_category_rules():
     """Load categorization rules from CSV file with override support."""
     global _category_rules_cache
@@ -204,12 +234,7 @@ def load_category_rules():
     if _category_rules_cache is not None:
         return _category_rules_cache
     
-    rules_file = "category_rules.csv"
-    
-    # Try to find rules file in multiple locations
-    if not os.path.exists(rules_file):
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        rules_file = os.path.join(script_dir, "category_rules.csv")
+    rules_file = find_rules_file()
     
     rules = []
     try:
@@ -506,70 +531,17 @@ def load_any_statement(path):
     raise ValueError(f"Unrecognized format in file: {path}")
 
 # -------------------------------------------------------------------
-# 7. Load all selected files
-# -------------------------------------------------------------------
-all_dfs = []
-
-for path in file_paths:
-    try:
-        print(f"Processing: {path}")
-        df = load_any_statement(path)
-        all_dfs.append(df)
-        print(f"  ✓ Loaded {len(df)} transactions")
-    except Exception as e:
-        print(f"  ✗ Skipping: {e}")
-
-if not all_dfs:
-    print("No valid files found for that month. Exiting.")
-    exit(1)
-
-all_txns = pd.concat(all_dfs, ignore_index=True)
-all_txns.columns = ["Date", "Vendor", "Category", "Amount"]
-all_txns["ParsedDate"] = all_txns["Date"].astype(str).apply(parse_date_safe)
-
-print(f"\n✓ Total transactions loaded: {len(all_txns)}")
-
-# Log transactions to monthly archive for later comparison
-try:
-    tx_logger = get_transaction_logger()
-    logged_count = tx_logger.log_transactions_batch(
-        all_txns,
-        date_column='Date',
-        vendor_column='Vendor',
-        amount_column='Amount',
-        category_column='Category'
-    )
-    if logged_count > 0:
-        print(f"✓ Logged {logged_count} transactions to monthly archive")
-        # Save logs to disk
-        tx_logger.save_monthly_logs()
-except Exception as e:
-    print(f"⚠️  Note: Could not log transactions to archive: {e}")
-
-# -------------------------------------------------------------------
-# 8. Build Reports
+# 6b. Report memo (reuse the previous run when no input has changed)
 # -------------------------------------------------------------------
+CATEGORIES_FILE = os.path.join(os.path.dirname(__file__), "categories.csv")
 
-# Load category order dynamically from categories.csv
+# Load the category hierarchy once from categories.csv (parents before children)
 try:
-    categories_file = os.path.join(os.path.dirname(__file__), "categories.csv")
-    if os.path.exists(categories_file):
-        cats_df = pd.read_csv(categories_file)
-        category_order = cats_df["CategoryName"].tolist()
-    else:
-        # Fallback if categories.csv doesn't exist
-        category_order = [
-            "Groceries & Markets",
-            "Restaurants & Food",
-            "Shopping & Retail",
-            "Auto & Gas",
-            "Utilities Bills & Insurance",
-            "Health",
-            "Entertainment",
-            "Home & Services"
-        ]
-except:
-    # Fallback on any error
+    category_tree = get_category_tree(CATEGORIES_FILE)
+    category_order = category_tree.names()
+except Exception:
+    # Fallback if categories.csv doesn't exist or can't be parsed
+    category_tree = None
     category_order = [
         "Groceries & Markets",
         "Restaurants & Food",
@@ -581,48 +553,175 @@ except:
         "Home & Services"
     ]
 
-# Report 1: Category → Vendor totals
-report1_rows = []
-for cat in category_order:
-    cat_df = all_txns[all_txns["Category"] == cat]
-    if cat_df.empty:
-        continue
-
-    report1_rows.append([cat, "", ""])
-    vendor_totals = (
-        cat_df.groupby("Vendor")["Amount"]
-        .sum()
-        .reset_index()
+cached_report = None
+report_key = None
+try:
+    report_key = report_fingerprint(
+        file_paths,
+        find_rules_file(),
+        CATEGORIES_FILE,
+        f"{mm}/{yyyy}",
+        # The generator and the modules that shape the cached frames
+        extra_files=[os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                     for name in ("generate_reports_email.py", "category_tree.py", "report_outputs.py")]
     )
-    for _, row in vendor_totals.iterrows():
-        report1_rows.append(["", row["Vendor"], f"{row['Amount']:.2f}"])
+    if not args.cli_no_cache:
+        cached_report = get_report_cache().load(report_key)
+except Exception as e:
+    print(f"⚠️  Note: Report cache unavailable: {e}")
+
+if cached_report is not None:
+    print(f"\n✓ Inputs unchanged since {cached_report.created_at[:19]} — reusing cached report")
+    all_txns = cached_report.frames["transactions"]
+    report1_df = cached_report.frames["report_1"]
+    report2_df = cached_report.frames["report_2"]
+    report3_df = cached_report.frames["report_3"]
+else:
+    # -------------------------------------------------------------------
+    # 7. Load all selected files
+    # -------------------------------------------------------------------
+    all_dfs = []
+
+    # Log each file to the monthly archive as it is loaded, so budget-to-date
+    # and anomaly stats are current after every file
+    try:
+        tx_logger = get_transaction_logger()
+        # Register the anomaly detector and budget tracker first so they see transactions as they are logged
+        get_anomaly_detector()
+        get_budget_tracker()
+    except Exception as e:
+        tx_logger = None
+        print(f"⚠️  Note: Could not open the transaction archive: {e}")
+    archive_counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    # Shared across files so repeated charges get the same IDs as one combined batch
+    occurrences = {}
 
-    category_total = vendor_totals["Amount"].sum()
-    report1_rows.append(["", "Category Total", f"{category_total:.2f}"])
-    report1_rows.append(["", "", ""])
+    for path in file_paths:
+        try:
+            print(f"Processing: {path}")
+            df = load_any_statement(path)
+            df.columns = ["Date", "Vendor", "Category", "Amount"]
+            all_dfs.append(df)
+            print(f"  ✓ Loaded {len(df)} transactions")
+        except Exception as e:
+            print(f"  ✗ Skipping: {e}")
+            continue
 
-report1_df = pd.DataFrame(report1_rows, columns=["Category", "Vendor", "Total"])
+        if tx_logger is not None:
+            try:
+                file_counts = tx_logger.upsert_transactions(df, occurrences=occurrences)
+                for key in archive_counts:
+                    archive_counts[key] += file_counts[key]
+            except Exception as e:
+                print(f"  ⚠️  Note: Could not log transactions to archive: {e}")
+
+    if not all_dfs:
+        print("No valid files found for that month. Exiting.")
+        exit(1)
+
+    all_txns = pd.concat(all_dfs, ignore_index=True)
+    all_txns["ParsedDate"] = all_txns["Date"].astype(str).apply(parse_date_safe)
+
+    print(f"\n✓ Total transactions loaded: {len(all_txns)}")
+
+    if tx_logger is not None:
+        print(f"✓ Archive: {archive_counts['inserted']} new, {archive_counts['updated']} re-categorized, "
+              f"{archive_counts['skipped']} already logged")
+        if archive_counts['inserted'] > 0 or archive_counts['updated'] > 0:
+            # Save logs to disk
+            try:
+                tx_logger.save_monthly_logs()
+            except Exception as e:
+                print(f"⚠️  Note: Could not save the transaction archive: {e}")
+
+    # -------------------------------------------------------------------
+    # 8. Build Reports
+    # -------------------------------------------------------------------
+
+    # Aggregate once; every report below reads from these totals
+    category_sums = all_txns.groupby("Category")["Amount"].sum()
+    vendor_sums = all_txns.groupby(["Category", "Vendor"])["Amount"].sum()
+
+    # Parent rollups (own total + all descendants), computed bottom-up in one pass
+    if category_tree is not None:
+        rollup_totals = category_tree.rollup(category_sums.to_dict())
+    else:
+        rollup_totals = category_sums.to_dict()
 
-# Report 2: Category totals + percent
-cat_totals = []
-for cat in category_order:
-    cat_df = all_txns[all_txns["Category"] == cat]
-    if not cat_df.empty:
-        cat_totals.append((cat, cat_df["Amount"].sum()))
+    # Report 1: Category → Vendor totals
+    report1_rows = []
+    for cat in category_order:
+        if cat not in category_sums.index:
+            continue
 
-grand_total = sum(t for _, t in cat_totals)
+        report1_rows.append([cat, "", ""])
+        vendor_totals = vendor_sums.loc[cat]
+        for vendor, amount in vendor_totals.items():
+            report1_rows.append(["", vendor, f"{amount:.2f}"])
+
+        category_total = vendor_totals.sum()
+        report1_rows.append(["", "Category Total", f"{category_total:.2f}"])
+        report1_rows.append(["", "", ""])
+
+    report1_df = pd.DataFrame(report1_rows, columns=["Category", "Vendor", "Total"])
+
+    # Report 2: Category totals + percent, with parent rollups
+    cat_totals = []
+    report2_categories = []
+    for cat in category_order:
+        if cat in category_sums.index:
+            cat_totals.append((cat, category_sums[cat]))
+            report2_categories.append(cat)
+        elif rollup_totals.get(cat, 0) != 0:
+            # Parent with no direct spending but spending in its sub-categories
+            report2_categories.append(cat)
+
+    grand_total = sum(t for _, t in cat_totals)
+
+    report2_rows = [["Category", "Parent", "Total", "Percent", "Rollup Total"]]
+    for cat in report2_categories:
+        total = category_sums.get(cat, 0.0)
+        parent = category_tree.parent(cat) if category_tree is not None else None
+        pct = abs(total) / abs(grand_total) * 100 if grand_total != 0 else 0
+        report2_rows.append([cat, parent or "", f"{total:.2f}", f"{pct:.2f}%", f"{rollup_totals.get(cat, total):.2f}"])
+    report2_rows.append(["Total", "", f"{grand_total:.2f}", "100.00%", f"{grand_total:.2f}"])
+
+    report2_df = pd.DataFrame(report2_rows[1:], columns=report2_rows[0])
+
+    # Report 3: Transactions > $200
+    report3_df = all_txns[all_txns["Amount"].abs() > 200].copy()
+    report3_df = report3_df.sort_values("ParsedDate")
+
+# Report 4: Unusual transactions, scored against each vendor's (or category's) history.
+# Flags come from the archive, so they are read fresh rather than from the report cache.
+try:
+    report4_df = get_anomaly_detector().flagged_frame(f"{yyyy}-{mm}")
+except Exception as e:
+    print(f"⚠️  Note: Anomaly detection unavailable: {e}")
+    report4_df = pd.DataFrame(columns=["Date", "Category", "Vendor", "Amount", "Typical", "Score", "Compared With"])
 
-report2_rows = [["Category", "Total", "Percent"]]
-for cat, total in cat_totals:
-    pct = abs(total) / abs(grand_total) * 100 if grand_total != 0 else 0
-    report2_rows.append([cat, f"{total:.2f}", f"{pct:.2f}%"])
-report2_rows.append(["Total", f"{grand_total:.2f}", "100.00%"])
+# Report 5: Subscriptions and recurring bills as of the report month's end
+try:
+    report5_df = get_recurring_detector().report_frame(pd.Period(f"{yyyy}-{mm}", freq="M").end_time)
+except Exception as e:
+    print(f"⚠️  Note: Recurring charge detection unavailable: {e}")
+    report5_df = pd.DataFrame(columns=["Vendor", "Category", "Every", "Amount", "Last Charged", "Next Expected",
+                                       "Monthly Cost", "Status", "Alerts"])
 
-report2_df = pd.DataFrame(report2_rows[1:], columns=report2_rows[0])
+# Report 6: Budget status, from the archive's running per-category totals. budgets.csv
+# is re-read here every run, so edits show up without invalidating the report cache.
+try:
+    report6_df = get_budget_tracker().status_frame(f"{yyyy}-{mm}")
+except Exception as e:
+    print(f"⚠️  Note: Budget status unavailable: {e}")
+    report6_df = pd.DataFrame(columns=["Category", "Budget", "Spent", "Remaining", "Used", "Expected To Date", "Status"])
 
-# Report 3: Transactions > $200
-report3_df = all_txns[all_txns["Amount"].abs() > 200].copy()
-report3_df = report3_df.sort_values("ParsedDate")
+# Report 7: Month-end forecast per category from the archive's daily history
+try:
+    report7_df = get_spend_forecaster().forecast_frame(f"{yyyy}-{mm}")
+except Exception as e:
+    print(f"⚠️  Note: Spend forecast unavailable: {e}")
+    report7_df = pd.DataFrame(columns=["Category", "Spent To Date", "Forecast", "Low", "High", "Last Month"])
 
 # -----------------------------
 # Console summary for quick view
@@ -635,15 +734,22 @@ try:
     total_txns = len(all_txns)
     print(f"Total transactions considered: {total_txns}")
 
+    category_rows = report2_df[report2_df["Category"] != "Total"]
+    grand_total = float(report2_df.iloc[-1]["Total"]) if len(report2_df) else 0
+
     if grand_total == 0 or total_txns == 0:
         print("No transactions found for the selected month.")
     else:
         print(f"Grand total: {grand_total:.2f}\n")
 
         print("By Category:")
-        for cat, total in cat_totals:
-            pct = abs(total) / abs(grand_total) * 100 if grand_total != 0 else 0
-            print(f"  - {cat}: {total:.2f} ({pct:.2f}%)")
+        for _, row in category_rows.iterrows():
+            cat = row["Category"]
+            depth = category_tree.depth_of.get(cat, 0) if category_tree is not None else 0
+            line = f"  {'  ' * depth}- {cat}: {float(row['Total']):.2f} ({float(str(row['Percent']).rstrip('%')):.2f}%)"
+            if category_tree is not None and category_tree.children(cat):
+                line += f" [incl. sub-categories: {float(row['Rollup Total']):.2f}]"
+            print(line)
 
         print("\nTop vendors:")
         top_vendors = (
@@ -656,91 +762,221 @@ try:
         for v, amt in top_vendors.items():
             print(f"  - {v}: {amt:.2f}")
 
+        if len(report4_df):
+            print(f"\n⚠️  {len(report4_df)} unusual transaction(s) (see Report_4):")
+            for _, row in report4_df.head(5).iterrows():
+                print(f"  - {row['Date']} {row['Vendor']}: {row['Amount']:.2f} (usually {row['Typical']:.2f})")
+
+        recurring_alerts = report5_df[(report5_df["Status"] != "active") | (report5_df["Alerts"] != "")]
+        if len(report5_df):
+            print(f"\nRecurring charges: {len(report5_df)}, about {report5_df['Monthly Cost'].sum():.2f} per month (see Report_5)")
+            for _, row in recurring_alerts.iterrows():
+                note = ", ".join(n for n in (row["Status"] if row["Status"] != "active" else "", row["Alerts"]) if n)
+                print(f"  ⚠️  {row['Vendor']} ({row['Every']} {row['Amount']:.2f}): {note}")
+
+        if len(report6_df):
+            print("\nBudgets (see Report_6):")
+            for _, row in report6_df.iterrows():
+                marker = {"over": "❌", "at risk": "⚠️ "}.get(row["Status"], "✓")
+                print(f"  {marker} {row['Category']}: {row['Spent']:.2f} of {row['Budget']:.2f} ({row['Used']}, {row['Status']})")
+
+        if len(report7_df) and report7_df.attrs.get("as_of_day", 0) < report7_df.attrs.get("days_in_month", 0):
+            print(f"\nMonth-end forecast (data through day {report7_df.attrs['as_of_day']}, see Report_7):")
+            for _, row in report7_df.iterrows():
+                print(f"  - {row['Category']}: {row['Forecast']:.2f} ({row['Low']:.2f}–{row['High']:.2f}), "
+                      f"so far {row['Spent To Date']:.2f}")
+
     print("" + "="*70 + "\n")
 except Exception:
     pass
 
 # -------------------------------------------------------------------
-# 9. Write Excel
+# 9. Write outputs (Excel workbook and machine-readable formats)
 # -------------------------------------------------------------------
-OUTPUT_FILE = os.path.join(dir_path, f"Spending_Report_{mm}_{yyyy}.xlsx")
+REPORT_BASENAME = f"Spending_Report_{mm}_{yyyy}"
+OUTPUT_FILE = os.path.join(dir_path, f"{REPORT_BASENAME}.xlsx")
 
-try:
-    with pd.ExcelWriter(OUTPUT_FILE, engine="xlsxwriter") as writer:
-        workbook = writer.book
-
-        header_fmt = workbook.add_format({
-            "bold": True,
-            "font_color": "white",
-            "bg_color": "#4F81BD",
-            "align": "center",
-            "valign": "vcenter",
-            "text_wrap": True
-        })
-
-        total_green_fmt = workbook.add_format({
-            "bg_color": "#C6EFCE",
-            "bold": True,
-            "text_wrap": True
-        })
-
-        wrap_fmt = workbook.add_format({"text_wrap": True})
-
-        # Report 1
-        ws1 = workbook.add_worksheet("Report_1")
-        writer.sheets["Report_1"] = ws1
-
-        headers1 = list(report1_df.columns)
-        for col, h in enumerate(headers1):
-            ws1.write(0, col, h, header_fmt)
-
-        for r in range(len(report1_df)):
-            row_values = report1_df.iloc[r]
-            is_total = "total" in str(row_values.values).lower()
-            fmt = total_green_fmt if is_total else wrap_fmt
-            for c in range(len(headers1)):
-                ws1.write(r + 1, c, row_values.iloc[c], fmt)
-
-        ws1.set_column("A:C", 25, wrap_fmt)
-
-        # Report 2
-        ws2 = workbook.add_worksheet("Report_2")
-        writer.sheets["Report_2"] = ws2
-
-        headers2 = list(report2_df.columns)
-        for col, h in enumerate(headers2):
-            ws2.write(0, col, h, header_fmt)
-
-        for r in range(len(report2_df)):
-            row_values = report2_df.iloc[r]
-            is_total = "total" in str(row_values.values).lower()
-            fmt = total_green_fmt if is_total else wrap_fmt
-            for c in range(len(headers2)):
-                ws2.write(r + 1, c, row_values.iloc[c], fmt)
-
-        ws2.set_column("A:C", 25, wrap_fmt)
-
-        # Report 3
-        ws3 = workbook.add_worksheet("Report_3")
-        writer.sheets["Report_3"] = ws3
-
-        headers3 = ["Date", "Category", "Vendor", "Amount"]
-        for col, h in enumerate(headers3):
-            ws3.write(0, col, h, header_fmt)
-
-        for r in range(len(report3_df)):
-            row = report3_df.iloc[r]
-            for c, colname in enumerate(headers3):
-                ws3.write(r + 1, c, row[colname], wrap_fmt)
-
-        ws3.set_column("A:D", 25, wrap_fmt)
-
-    print(f"\n✓ Excel report generated: {OUTPUT_FILE}")
-except Exception as e:
-    print(f"\n✗ Error generating Excel: {e}")
+# The workbook is always rebuilt: Reports 1-3 may come from the cache, but
+# Reports 4-7 are read fresh from the archive and budgets on every run
+workbook_written = False
+if "xlsx" in output_formats:
+    try:
+        with pd.ExcelWriter(OUTPUT_FILE, engine="xlsxwriter") as writer:
+            workbook = writer.book
+
+            header_fmt = workbook.add_format({
+                "bold": True,
+                "font_color": "white",
+                "bg_color": "#4F81BD",
+                "align": "center",
+                "valign": "vcenter",
+                "text_wrap": True
+            })
+
+            total_green_fmt = workbook.add_format({
+                "bg_color": "#C6EFCE",
+                "bold": True,
+                "text_wrap": True
+            })
+
+            wrap_fmt = workbook.add_format({"text_wrap": True})
+
+            # Report 1
+            ws1 = workbook.add_worksheet("Report_1")
+            writer.sheets["Report_1"] = ws1
+
+            headers1 = list(report1_df.columns)
+            for col, h in enumerate(headers1):
+                ws1.write(0, col, h, header_fmt)
+
+            for r in range(len(report1_df)):
+                row_values = report1_df.iloc[r]
+                is_total = "total" in str(row_values.values).lower()
+                fmt = total_green_fmt if is_total else wrap_fmt
+                for c in range(len(headers1)):
+                    ws1.write(r + 1, c, row_values.iloc[c], fmt)
+
+            ws1.set_column("A:C", 25, wrap_fmt)
+
+            # Report 2
+            ws2 = workbook.add_worksheet("Report_2")
+            writer.sheets["Report_2"] = ws2
+
+            headers2 = list(report2_df.columns)
+            for col, h in enumerate(headers2):
+                ws2.write(0, col, h, header_fmt)
+
+            for r in range(len(report2_df)):
+                row_values = report2_df.iloc[r]
+                is_total = "total" in str(row_values.values).lower()
+                fmt = total_green_fmt if is_total else wrap_fmt
+                for c in range(len(headers2)):
+                    ws2.write(r + 1, c, row_values.iloc[c], fmt)
+
+            ws2.set_column("A:C", 25, wrap_fmt)
+
+            # Report 3
+            ws3 = workbook.add_worksheet("Report_3")
+            writer.sheets["Report_3"] = ws3
+
+            headers3 = ["Date", "Category", "Vendor", "Amount"]
+            for col, h in enumerate(headers3):
+                ws3.write(0, col, h, header_fmt)
+
+            for r in range(len(report3_df)):
+                row = report3_df.iloc[r]
+                for c, colname in enumerate(headers3):
+                    ws3.write(r + 1, c, row[colname], wrap_fmt)
+
+            ws3.set_column("A:D", 25, wrap_fmt)
+
+            # Report 4
+            ws4 = workbook.add_worksheet("Report_4")
+            writer.sheets["Report_4"] = ws4
+
+            headers4 = list(report4_df.columns)
+            for col, h in enumerate(headers4):
+                ws4.write(0, col, h, header_fmt)
+
+            for r in range(len(report4_df)):
+                row = report4_df.iloc[r]
+                for c, colname in enumerate(headers4):
+                    ws4.write(r + 1, c, row[colname], wrap_fmt)
+
+            ws4.set_column("A:G", 20, wrap_fmt)
+
+            # Report 5
+            ws5 = workbook.add_worksheet("Report_5")
+            writer.sheets["Report_5"] = ws5
+
+            headers5 = list(report5_df.columns)
+            for col, h in enumerate(headers5):
+                ws5.write(0, col, h, header_fmt)
+
+            for r in range(len(report5_df)):
+                row = report5_df.iloc[r]
+                for c, colname in enumerate(headers5):
+                    ws5.write(r + 1, c, row[colname], wrap_fmt)
+
+            ws5.set_column("A:I", 18, wrap_fmt)
+
+            # Report 6
+            ws6 = workbook.add_worksheet("Report_6")
+            writer.sheets["Report_6"] = ws6
+
+            headers6 = list(report6_df.columns)
+            for col, h in enumerate(headers6):
+                ws6.write(0, col, h, header_fmt)
+
+            for r in range(len(report6_df)):
+                row = report6_df.iloc[r]
+                for c, colname in enumerate(headers6):
+                    ws6.write(r + 1, c, row[colname], wrap_fmt)
+
+            ws6.set_column("A:G", 20, wrap_fmt)
+
+            # Report 7
+            ws7 = workbook.add_worksheet("Report_7")
+            writer.sheets["Report_7"] = ws7
+
+            headers7 = list(report7_df.columns)
+            for col, h in enumerate(headers7):
+                ws7.write(0, col, h, header_fmt)
+
+            for r in range(len(report7_df)):
+                row = report7_df.iloc[r]
+                for c, colname in enumerate(headers7):
+                    value = row[colname]
+                    ws7.write(r + 1, c, "" if pd.isna(value) else value, wrap_fmt)
+
+            ws7.set_column("A:F", 20, wrap_fmt)
+
+        workbook_written = True
+        print(f"\n✓ Excel report generated: {OUTPUT_FILE}")
+    except Exception as e:
+        print(f"\n✗ Error generating Excel: {e}")
+
+# Machine-readable outputs (written directly from the frames, no workbook round-trip)
+machine_formats = [f for f in output_formats if f != "xlsx"]
+if machine_formats:
+    try:
+        written = write_report_frames(
+            {
+                "report_1": report1_df,
+                "report_2": report2_df,
+                "report_3": report3_df[["Date", "Category", "Vendor", "Amount"]],
+                "report_4": report4_df,
+                "report_5": report5_df,
+                "report_6": report6_df,
+                "report_7": report7_df,
+                "transactions": all_txns,
+            },
+            dir_path,
+            REPORT_BASENAME,
+            machine_formats,
+        )
+        for fmt, paths in written.items():
+            print(f"✓ {fmt} output: {len(paths)} file(s) → {os.path.dirname(paths[0]) or '.'}")
+    except Exception as e:
+        print(f"\n✗ Error writing {', '.join(machine_formats)} output: {e}")
+
+# Remember this run so an identical re-run can skip the pipeline (statement-derived frames only)
+if report_key is not None and cached_report is None:
+    try:
+        get_report_cache().store(
+            report_key,
+            {
+                "report_1": report1_df,
+                "report_2": report2_df,
+                "report_3": report3_df,
+                "transactions": all_txns,
+            }
+        )
+    except Exception as e:
+        print(f"⚠️  Note: Could not cache report: {e}")
 
 # -------------------------------------------------------------------
-# 10. Email sending (optional)
+# 10. Email hand-off (summary sidecar read by app.py)
 # -------------------------------------------------------------------
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
@@ -751,29 +987,23 @@ import getpass
 
 import sys
 
-# Check if email should be sent
-send_email = False
-
-# Check if user enabled email sending from the app
+# Email composition happens in app.py after user confirmation. Hand it the
+# rendered tables through a sidecar next to the workbook so it never has to
+# read the Excel file back.
 try:
-    # Read sender email from config to determine if email was requested
-    import json
-    from pathlib import Path
-    config_file = Path.home() / '.config' / 'SpendingApp' / 'config.json'
-    config = {}
-    if config_file.exists():
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-    # Check if sender email is configured (indicates user might want email)
-    if config.get('sender_email'):
-        # Email composition happens in app.py after user confirmation
-        # This script just needs to store data for email in Excel
-        
-        # Generate HTML tables for email body (in case needed)
-        report2_html_table = report2_df.to_html(index=False, border=1)
-        report3_html_table = report3_df[["Date", "Category", "Vendor", "Amount"]].to_html(index=False, border=1)
-except Exception:
-    pass
+    report3_email_df = report3_df[["Date", "Category", "Vendor", "Amount"]]
+    report2_html_table = report2_df.to_html(index=False, border=1)
+    report3_html_table = report3_email_df.to_html(index=False, border=1)
+
+    write_report_sidecar(
+        sidecar_path(dir_path, REPORT_BASENAME),
+        f"{mm}/{yyyy}",
+        {"report_2": report2_df, "report_3": report3_email_df},
+        {"report_2": report2_html_table, "report_3": report3_html_table},
+        OUTPUT_FILE if workbook_written else None  # Never a workbook left over from an earlier run
+    )
+except Exception as e:
+    print(f"⚠️  Note: Could not write report summary for email: {e}")
 
 # Save metrics summary for this run (separate process from the main app)
 try:
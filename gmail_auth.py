@@ -5,18 +5,22 @@ Handles OAuth2 and SMTP authentication for sending emails via Gmail.
 """
 
 import os
+import json
 import smtplib
 import ssl
 import base64
 import getpass
+import threading
 import certifi
+from datetime import datetime, timedelta
+from pathlib import Path
 
 # Optional Gmail API imports (for OAuth2)
 try:
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
     from google.auth.transport.requests import Request
-    from googleapiclient.discovery import build
+    from googleapiclient.discovery import build, build_from_document
     GMAIL_API_AVAILABLE = True
 except Exception:
     GMAIL_API_AVAILABLE = False
@@ -26,10 +30,24 @@ class GmailAuth:
     """Handles Gmail authentication via OAuth2 or SMTP."""
 
     CONFIG_FILE = os.path.join(os.path.dirname(__file__), '.gmail_oauth_config')
+    TOKEN_FILE = 'token.json'
+    SCOPES = ['https://www.googleapis.com/auth/gmail.send']
+
+    # Gmail API discovery document, cached so the client can be built offline
+    DISCOVERY_CACHE_FILE = Path.home() / '.config' / 'SpendingApp' / 'gmail_v1_discovery.json'
+
+    # Refresh the access token this long before it expires
+    REFRESH_MARGIN = timedelta(minutes=5)
 
     def __init__(self):
         self.gmail_api_available = GMAIL_API_AVAILABLE
 
+        # Session state: credentials and Gmail client are built once and reused
+        self._creds = None
+        self._gmail_service = None
+        self._creds_lock = threading.RLock()
+        self._refresh_timer = None
+
     @staticmethod
     def _load_oauth_config():
         """Load OAuth config from stored file."""
@@ -44,11 +62,16 @@ class GmailAuth:
     # ========================================================
     # OAuth2 Authentication
     # ========================================================
-    def get_oauth2_credentials(self, scope='gmail_api'):
+    def get_oauth2_credentials(self, scope='gmail_api', interactive=True):
         """Get OAuth2 credentials for Gmail API.
         
+        Credentials are cached for the session: token.json is read once and
+        a background timer refreshes the token shortly before it expires.
+        
         Args:
             scope: 'gmail_api' for Gmail API
+            interactive: Run the browser flow if there is no usable token
+                (False for background work, which raises instead)
         
         Returns:
             Credentials object
@@ -56,65 +79,168 @@ class GmailAuth:
         if not self.gmail_api_available:
             raise RuntimeError('Gmail API libraries not available. Install: google-auth-oauthlib')
 
-        scopes = ['https://www.googleapis.com/auth/gmail.send']
-        token_path = 'token.json'
+        with self._creds_lock:
+            if self._creds is not None and not self._needs_refresh(self._creds):
+                return self._creds
 
-        # Try to load existing token
-        creds = None
-        if os.path.exists(token_path):
-            try:
-                creds = Credentials.from_authorized_user_file(token_path, scopes)
-            except Exception:
-                creds = None
+            creds = self._creds
 
-        # Check if token is still valid
-        if creds and not creds.valid:
-            if creds.expired and creds.refresh_token:
+            # Try to load existing token (first use in this session only)
+            if creds is None and os.path.exists(self.TOKEN_FILE):
                 try:
-                    creds.refresh(Request())
+                    creds = Credentials.from_authorized_user_file(self.TOKEN_FILE, self.SCOPES)
                 except Exception:
                     creds = None
-            else:
-                creds = None
 
-        # If no valid token, run OAuth flow
-        if not creds:
-            config = self._load_oauth_config()
-            
+            # Refresh if expired or about to expire
+            if creds and self._needs_refresh(creds):
+                if creds.refresh_token:
+                    try:
+                        creds.refresh(Request())
+                        self._save_token(creds)
+                    except Exception:
+                        creds = None
+                elif not creds.valid:
+                    creds = None
+
+            # If no valid token, run OAuth flow
+            if not creds:
+                if not interactive:
+                    raise RuntimeError('No valid OAuth2 token; sign in again from the app')
+                creds = self._run_oauth_flow()
+
+            if creds is not self._creds:
+                # The Gmail client holds the old Credentials object; rebuild it on next use
+                self._gmail_service = None
+            self._creds = creds
+            self._schedule_refresh(creds)
+            return creds
+
+    def _run_oauth_flow(self):
+        """Run the browser OAuth flow and save the resulting token."""
+        config = self._load_oauth_config()
+        
+        try:
+            # Create flow from config (no need for credentials.json file)
+            flow = InstalledAppFlow.from_client_config(
+                {
+                    "installed": {
+                        "client_id": config['client_id'],
+                        "client_secret": config['client_secret'],
+                        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                        "token_uri": "https://oauth2.googleapis.com/token",
+                    }
+                },
+                self.SCOPES
+            )
+            creds = flow.run_local_server(port=0)
+            # Save token for future use
+            self._save_token(creds)
+            return creds
+        except Exception as e:
+            raise RuntimeError(f'OAuth2 authentication failed: {e}')
+
+    def _save_token(self, creds):
+        """Persist credentials to token.json."""
+        with open(self.TOKEN_FILE, 'w') as f:
+            f.write(creds.to_json())
+
+    def _needs_refresh(self, creds):
+        """True if the token is invalid or expires within REFRESH_MARGIN."""
+        if not creds.valid:
+            return True
+        expiry = getattr(creds, 'expiry', None)
+        return expiry is not None and expiry - datetime.utcnow() < self.REFRESH_MARGIN
+
+    def _schedule_refresh(self, creds):
+        """Start a daemon timer that refreshes the token before it expires."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+        expiry = getattr(creds, 'expiry', None)
+        if expiry is None or not creds.refresh_token:
+            return
+
+        delay = (expiry - datetime.utcnow() - self.REFRESH_MARGIN).total_seconds()
+        self._refresh_timer = threading.Timer(max(delay, 0), self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self):
+        """Timer callback: refresh cached credentials without blocking a send."""
+        with self._creds_lock:
+            creds = self._creds
+            if creds is None:
+                return
             try:
-                # Create flow from config (no need for credentials.json file)
-                flow = InstalledAppFlow.from_client_config(
-                    {
-                        "installed": {
-                            "client_id": config['client_id'],
-                            "client_secret": config['client_secret'],
-                            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                            "token_uri": "https://oauth2.googleapis.com/token",
-                        }
-                    },
-                    scopes
-                )
-                creds = flow.run_local_server(port=0)
-                # Save token for future use
-                with open(token_path, 'w') as f:
-                    f.write(creds.to_json())
-            except Exception as e:
-                raise RuntimeError(f'OAuth2 authentication failed: {e}')
-
-        return creds
+                creds.refresh(Request())
+                self._save_token(creds)
+                self._schedule_refresh(creds)
+            except Exception:
+                # Leave it to the next send to refresh (or re-authenticate)
+                self._refresh_timer = None
+
+    def close(self):
+        """Stop the background refresh timer."""
+        with self._creds_lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
 
     # ========================================================
     # Gmail API Send
     # ========================================================
+    def _load_discovery_document(self):
+        """Load the Gmail v1 discovery document from the local cache, fetching it once."""
+        cache_file = Path(self.DISCOVERY_CACHE_FILE)
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r') as f:
+                    return f.read()
+            except Exception:
+                pass
+
+        doc = None
+        try:
+            # Bundled with google-api-python-client 2.x
+            from googleapiclient.discovery_cache import get_static_doc
+            doc = get_static_doc('gmail', 'v1')
+        except Exception:
+            doc = None
+
+        if doc is None:
+            # Older client: fetch once via a regular build and keep its root description
+            service = build('gmail', 'v1', credentials=self.get_oauth2_credentials(), cache_discovery=False)
+            doc = json.dumps(service._rootDesc)
+
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'w') as f:
+                f.write(doc)
+        except Exception:
+            pass
+        return doc
+
+    def get_gmail_service(self, interactive=True):
+        """Get the session's Gmail API client (built once from the cached discovery document)."""
+        if not self.gmail_api_available:
+            raise RuntimeError('Gmail API not available')
+
+        creds = self.get_oauth2_credentials(scope='gmail_api', interactive=interactive)
+        if self._gmail_service is None:
+            # The client holds the same Credentials object, so refreshes are picked up automatically
+            # (a replaced object resets the client in get_oauth2_credentials)
+            self._gmail_service = build_from_document(self._load_discovery_document(), credentials=creds)
+        return self._gmail_service
+
     def send_via_gmail_api(self, sender_email, recipient_email, msg):
         """Send email via Gmail API."""
         if not self.gmail_api_available:
             raise RuntimeError('Gmail API not available')
 
-        creds = self.get_oauth2_credentials(scope='gmail_api')
-        service = build('gmail', 'v1', credentials=creds)
+        service = self.get_gmail_service()
         
-        import email.mime.base
         raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
         body = {'raw': raw}
         return service.users().messages().send(userId='me', body=body).execute()
@@ -264,6 +390,17 @@ Takes 2 minutes, done once.
             return ('oauth', None)
 
 
+# Global GmailAuth instance (one cached client and token per session)
+_gmail_auth = None
+
+def get_gmail_auth() -> GmailAuth:
+    """Get or create global GmailAuth"""
+    global _gmail_auth
+    if _gmail_auth is None:
+        _gmail_auth = GmailAuth()
+    return _gmail_auth
+
+
 # Convenience functions for backward compatibility
 def send_email(sender_email, recipient_email, msg, method='oauth', password=None):
     """Send email using the specified authentication method.
@@ -275,7 +412,7 @@ def send_email(sender_email, recipient_email, msg, method='oauth', password=None
         method: 'oauth', 'smtp_oauth', or 'smtp_login'
         password: Password (for smtp_login method)
     """
-    auth = GmailAuth()
+    auth = get_gmail_auth()
 
     if method == 'oauth':
         return auth.send_via_gmail_api(sender_email, recipient_email, msg)
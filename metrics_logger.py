@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Performance and Stability Metrics Logging
-Tracks: categorization latency, conflicts, hash stability, LLM performance
+Tracks: categorization latency, conflicts, hash stability, LLM performance,
+archive lock waits
 """
 
 import logging
@@ -38,6 +39,9 @@ class MetricsLogger:
         self.conflicts = []
         self.llm_inferences = []
         self.hash_values = {}
+        self.lock_waits = []
+        self.lock_acquisitions = 0
+        self.lock_wait_total = 0.0
         
     def setup_logger(self):
         """Configure logging with both file and console output"""
@@ -152,12 +156,42 @@ class MetricsLogger:
         self.logger.debug(f"   Memory before: {self.memory_before:.1f} MB")
         
         self.llm_start_time = time.time()
+        self.llm_first_token_time = None
         self.llm_current_question = question  # Store question for later
     
-    def log_llm_inference_complete(self, response: str, tokens_generated: int = None):
-        """Log completion of LLM inference"""
+    def log_llm_first_token(self):
+        """Log arrival of the first streamed token"""
+        
+        self.llm_first_token_time = time.time()
+        self.logger.debug(f"   Time to first token: {self.llm_first_token_time - self.llm_start_time:.2f} seconds")
+    
+    def log_llm_inference_complete(self, response: str, tokens_generated: int = None,
+                                   ollama_stats: dict = None):
+        """
+        Log completion of LLM inference
+        
+        Args:
+            response: Generated text
+            tokens_generated: Token count if known (superseded by ollama_stats)
+            ollama_stats: Ollama's final response fields (eval_count, eval_duration,
+                          prompt_eval_count, ... with durations in nanoseconds)
+        """
         
         inference_time = time.time() - self.llm_start_time
+        first_token = getattr(self, 'llm_first_token_time', None)
+        ttft = first_token - self.llm_start_time if first_token else None
+        
+        # Ollama reports the real token count and generation time
+        stats = ollama_stats or {}
+        eval_time = stats['eval_duration'] / 1e9 if stats.get('eval_duration') else None
+        if stats.get('eval_count'):
+            tokens_generated = stats['eval_count']
+        if tokens_generated and eval_time:
+            tokens_per_second = tokens_generated / eval_time
+        elif tokens_generated:
+            tokens_per_second = tokens_generated / inference_time
+        else:
+            tokens_per_second = None
         
         # Get current process memory
         process = psutil.Process(os.getpid())
@@ -172,7 +206,11 @@ class MetricsLogger:
             'response_length': len(response),
             'memory_used_mb': memory_used,
             'memory_peak_mb': memory_after,
-            'tokens_generated': tokens_generated
+            'tokens_generated': tokens_generated,
+            'prompt_tokens': stats.get('prompt_eval_count'),
+            'time_to_first_token_seconds': ttft,
+            'eval_time_seconds': eval_time,
+            'tokens_per_second': tokens_per_second
         })
         
         self.logger.debug(f"\n✅ LLM INFERENCE COMPLETE")
@@ -181,10 +219,29 @@ class MetricsLogger:
         self.logger.debug(f"   Memory used: {memory_used:.1f} MB")
         self.logger.debug(f"   Memory peak: {memory_after:.1f} MB")
         
-        if tokens_generated:
-            tokens_per_second = tokens_generated / inference_time
+        if ttft is not None:
+            self.logger.debug(f"   Time to first token: {ttft:.2f} seconds")
+        if eval_time is not None:
+            self.logger.debug(f"   Eval time: {eval_time:.2f} seconds ({tokens_generated} tokens)")
+        if tokens_per_second:
             self.logger.debug(f"   Tokens/second: {tokens_per_second:.1f}")
     
+    def log_lock_wait(self, resource: str, mode: str, wait_seconds: float):
+        """Track time spent waiting for an archive lock"""
+        
+        self.lock_acquisitions += 1
+        self.lock_wait_total += wait_seconds
+        
+        # Keep details only for contended acquisitions
+        if wait_seconds >= 0.01:
+            self.lock_waits.append({
+                'timestamp': datetime.now().isoformat(),
+                'resource': resource,
+                'mode': mode,
+                'wait_seconds': wait_seconds
+            })
+            self.logger.debug(f"🔒 Waited {wait_seconds:.2f}s for {mode} lock on {resource}")
+    
     def log_potential_hallucination(self, question: str, response: str, 
                                    severity: str = "LOW"):
         """Log potential LLM hallucination"""
@@ -213,6 +270,11 @@ class MetricsLogger:
             f"      {rule_str}"
         )
     
+    def _llm_average(self, key: str) -> float:
+        """Average of an LLM metric over the queries that recorded it"""
+        values = [i[key] for i in self.llm_inferences if i.get(key) is not None]
+        return sum(values) / len(values) if values else 0
+    
     def save_metrics_summary(self):
         """Save metrics summary to JSON file"""
         
@@ -241,11 +303,20 @@ class MetricsLogger:
                 'average_memory_used_mb': sum(i['memory_used_mb'] for i in self.llm_inferences) 
                                          / len(self.llm_inferences) if self.llm_inferences else 0,
                 'peak_memory_mb': max([i['memory_peak_mb'] for i in self.llm_inferences]) if self.llm_inferences else 0,
+                'average_time_to_first_token_seconds': self._llm_average('time_to_first_token_seconds'),
+                'average_tokens_per_second': self._llm_average('tokens_per_second'),
                 'details': self.llm_inferences
             },
             'conflicts': {
                 'total_conflicts': len(self.conflicts),
                 'details': self.conflicts
+            },
+            'archive_locks': {
+                'acquisitions': self.lock_acquisitions,
+                'total_wait_seconds': self.lock_wait_total,
+                'contended': len(self.lock_waits),
+                'max_wait_seconds': max([w['wait_seconds'] for w in self.lock_waits]) if self.lock_waits else 0,
+                'details': self.lock_waits
             }
         }
         
@@ -274,7 +345,9 @@ class MetricsLogger:
                 'response_preview': response_preview,
                 'inference_time': inference.get('inference_time_seconds', 0),
                 'response_length': inference.get('response_length', 0),
-                'memory_peak': inference.get('memory_peak_mb', 0)
+                'memory_peak': inference.get('memory_peak_mb', 0),
+                'time_to_first_token': inference.get('time_to_first_token_seconds'),
+                'tokens_per_second': inference.get('tokens_per_second')
             })
         return history
     
@@ -300,6 +373,9 @@ class MetricsLogger:
         print(f"Hash Stability: {len(self.hash_values)} vendors tracked")
         print(f"LLM Inference Time: {avg_llm_time:.2f}s avg")
         print(f"LLM Memory Usage: {avg_llm_memory:.1f}MB avg")
+        print(f"LLM Time to First Token: {self._llm_average('time_to_first_token_seconds'):.2f}s avg")
+        print(f"LLM Generation Speed: {self._llm_average('tokens_per_second'):.1f} tokens/s avg")
+        print(f"Archive Lock Wait: {self.lock_wait_total:.2f}s total ({len(self.lock_waits)} contended)")
         print(f"{'='*70}\n")
     
     def close(self):
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Columnar In-Memory Month Storage
+Holds a month of transactions as typed numpy columns: float64 amounts,
+int32 day numbers, and int32 codes into a string table shared by every
+loaded month. Transaction dicts are only built when asked for.
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+from archive_storage import ARCHIVE_COLUMNS, normalize_frame
+
+# Day number stored for dates that could not be parsed
+MISSING_DAY = np.iinfo(np.int32).min
+
+# Archive columns kept as string-table codes
+STRING_COLUMNS = ('date', 'vendor', 'category', 'description', 'logged_at')
+
+
+def parse_days(dates: pd.Series) -> np.ndarray:
+    """Days since 1970-01-01 for each date string (MISSING_DAY if unparseable)"""
+    if dates.empty:
+        return np.empty(0, dtype=np.int32)
+
+    # Dates repeat heavily within a month, so parse each distinct value once
+    codes, uniques = pd.factorize(dates)
+    parsed = pd.to_datetime(pd.Series(uniques), errors='coerce', format='mixed')
+    days = parsed.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    days[parsed.isna().to_numpy()] = MISSING_DAY
+    return days.astype(np.int32)[codes]
+
+
+def take_rows(selections: List[Tuple["MonthColumns", np.ndarray]]) -> pd.DataFrame:
+    """
+    Selected rows of several months as one typed archive frame
+
+    Args:
+        selections: (columns, row numbers) pairs sharing one string table, in output order
+
+    Returns:
+        Frame with the archive columns (strings decoded once for all months)
+    """
+    selections = [(columns, rows) for columns, rows in selections if len(rows)]
+    if not selections:
+        return normalize_frame(pd.DataFrame(columns=ARCHIVE_COLUMNS))
+
+    table = selections[0][0].table
+    data = {
+        'id': [columns.ids[row] for columns, rows in selections for row in rows.tolist()],
+        'amount': np.concatenate([columns.amount_array()[rows] for columns, rows in selections]),
+    }
+    for column in STRING_COLUMNS:
+        data[column] = table.decode_many(np.concatenate([columns.code_array(column)[rows] for columns, rows in selections]))
+    return normalize_frame(pd.DataFrame(data, columns=ARCHIVE_COLUMNS))
+
+
+class StringTable:
+    """Interned strings; each distinct value is stored once and referenced by code"""
+
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+        self._array = None
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def encode(self, value: str) -> int:
+        """Code for a string, adding it to the table if new"""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(value)
+            self.codes[value] = code
+        return code
+
+    def encode_many(self, values: pd.Series) -> np.ndarray:
+        """Codes for a column of strings (one table lookup per distinct value)"""
+        local_codes, uniques = pd.factorize(values)
+        mapping = np.array([self.encode(value) for value in uniques], dtype=np.int32)
+        return mapping[local_codes] if len(local_codes) else np.empty(0, dtype=np.int32)
+
+    def decode_many(self, codes: np.ndarray) -> np.ndarray:
+        """Strings for an array of codes (object array)"""
+        if self._array is None or len(self._array) != len(self.strings):
+            self._array = np.array(self.strings, dtype=object)
+        return self._array[codes]
+
+
+class GrowableArray:
+    """Append-friendly typed array: appends add chunks, reads merge them once"""
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self._chunks = []
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.dtype)
+        if len(values):
+            self._chunks.append(values)
+            self._length += len(values)
+
+    def array(self) -> np.ndarray:
+        """All values as one array (treat as read-only)"""
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0] if self._chunks else np.empty(0, dtype=self.dtype)
+
+    def assign(self, rows: np.ndarray, values):
+        """Overwrite values at the given positions"""
+        merged = self.array().copy()
+        merged[rows] = values
+        self._chunks = [merged]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(chunk.nbytes for chunk in self._chunks)
+
+
+class MonthColumns:
+    """One month of transactions in columnar form (row order = logging order)"""
+
+    def __init__(self, table: StringTable):
+        self.table = table
+        self.ids = []
+        self.amounts = GrowableArray(np.float64)
+        self.days = GrowableArray(np.int32)
+        self.codes = {column: GrowableArray(np.int32) for column in STRING_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, table: StringTable) -> "MonthColumns":
+        columns = cls(table)
+        columns.extend_frame(df)
+        return columns
+
+    def extend_frame(self, df: pd.DataFrame):
+        """Append rows from an archive frame"""
+        df = normalize_frame(df)
+        if df.empty:
+            return
+
+        self.ids.extend(df['id'].tolist())
+        self.amounts.extend(df['amount'].to_numpy(dtype=np.float64))
+        self.days.extend(parse_days(df['date']))
+        for column in STRING_COLUMNS:
+            self.codes[column].extend(self.table.encode_many(df[column]))
+
+    def append(self, record: Dict):
+        """Append one transaction dict"""
+        self.extend_frame(pd.DataFrame([record], columns=ARCHIVE_COLUMNS))
+
+    def set_strings(self, column: str, rows: np.ndarray, values: pd.Series):
+        """Overwrite a string column at the given row numbers"""
+        self.codes[column].assign(rows, self.table.encode_many(values))
+
+    def amount_array(self) -> np.ndarray:
+        return self.amounts.array()
+
+    def day_array(self) -> np.ndarray:
+        return self.days.array()
+
+    def code_array(self, column: str) -> np.ndarray:
+        return self.codes[column].array()
+
+    def to_frame(self, start: int = 0) -> pd.DataFrame:
+        """Rows from `start` on as a typed archive frame"""
+        data = {'id': self.ids[start:], 'amount': self.amount_array()[start:]}
+        for column in STRING_COLUMNS:
+            data[column] = self.table.decode_many(self.code_array(column)[start:])
+        return normalize_frame(pd.DataFrame(data, columns=ARCHIVE_COLUMNS))
+
+    def take(self, rows: np.ndarray) -> pd.DataFrame:
+        """Selected rows (by row number, in the given order) as a typed archive frame"""
+        return take_rows([(self, rows)])
+
+    def to_records(self, start: int = 0) -> List[Dict]:
+        """Rows from `start` on as transaction dicts (built on demand)"""
+        return self.to_frame(start).to_dict(orient='records')
+
+    def nbytes(self) -> int:
+        """Approximate memory held by this month (the shared string table excluded)"""
+        id_bytes = sys.getsizeof(self.ids) + sum(sys.getsizeof(tx_id) for tx_id in self.ids[:1]) * len(self.ids)
+        return (id_bytes + self.amounts.nbytes + self.days.nbytes
+                + sum(codes.nbytes for codes in self.codes.values()))
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Recurring Charge & Subscription Detection
+Groups archived transactions by normalized vendor and finds periodic
+charges (weekly to yearly) from inter-arrival times and amount spread,
+all as grouped array operations over the whole archive. Flags recurrences
+that are new, missed, or changed price.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from month_columns import MISSING_DAY, parse_days
+from transaction_logger import TransactionLogger, get_transaction_logger
+
+# Recognized periods: name -> (days, tolerance in days)
+PERIODS = {
+    'weekly': (7.0, 1.5),
+    'biweekly': (14.0, 2.5),
+    'monthly': (30.44, 5.0),
+    'quarterly': (91.31, 12.0),
+    'yearly': (365.25, 25.0),
+}
+
+# Charges needed to call a vendor recurring (2 if the amount repeats exactly and it is recent)
+MIN_CHARGES = 3
+
+# Share of intervals that must fall within the period's tolerance
+MIN_REGULARITY = 0.7
+
+# Largest IQR / median of the amounts for a recurring charge (utilities vary, groceries don't recur)
+MAX_AMOUNT_SPREAD = 0.5
+
+# Recent charges the typical amount is taken from (follows price changes)
+TYPICAL_WINDOW = 6
+
+# A price change is a step of more than this fraction (and MIN_PRICE_CHANGE dollars)
+# after two equal charges, reported while it is within PRICE_CHANGE_PERIODS periods
+PRICE_CHANGE_FRACTION = 0.02
+MIN_PRICE_CHANGE = 0.5
+PRICE_CHANGE_PERIODS = 2
+
+# A recurrence is new if it started within this many periods (or days, if longer) of the as-of date
+NEW_WITHIN_PERIODS = 2
+NEW_WITHIN_DAYS = 90
+
+# Overdue by more than this many periods means the recurrence ended rather than was missed
+ENDED_AFTER_PERIODS = 3
+
+RESULT_COLUMNS = [
+    'vendor', 'category', 'period', 'period_days', 'charges', 'typical_amount', 'previous_price',
+    'last_amount', 'first_date', 'last_date', 'next_expected', 'monthly_cost', 'status', 'flags'
+]
+
+
+def recurrence_keys(vendors: pd.Series) -> pd.Series:
+    """Vendor names reduced to grouping keys: upper case, no store numbers or punctuation"""
+    uniques = pd.Series(vendors.unique(), dtype=object).astype(str)
+    keys = (uniques.str.upper()
+            .str.replace(r"[-'.]", '', regex=True)
+            .str.replace(r'\d{3,}', ' ', regex=True)
+            .str.replace(r'[^A-Z&]+', ' ', regex=True)
+            .str.strip())
+    return vendors.map(dict(zip(uniques, keys)))
+
+
+class RecurringDetector:
+    """Recurring charges across TransactionLogger's whole archive"""
+
+    def __init__(self, tx_logger: TransactionLogger = None):
+        self.tx_logger = tx_logger or get_transaction_logger()
+
+    def _charges(self) -> pd.DataFrame:
+        """One row per vendor key and day: day number, amount, display vendor and category"""
+        months = self.tx_logger.get_available_months()
+        if not months:
+            return pd.DataFrame(columns=['key', 'day', 'amount', 'vendor', 'category'])
+
+        df = pd.concat([self.tx_logger.get_month_frame(m) for m in months], ignore_index=True)
+        df = pd.DataFrame({
+            'key': recurrence_keys(df['vendor']),
+            'day': parse_days(df['date']),
+            'amount': df['amount'].abs(),
+            'vendor': df['vendor'],
+            'category': df['category'],
+        })
+        df = df[(df['day'] != MISSING_DAY) & (df['key'] != '')]
+
+        # Several charges on one day count as one charge of their total
+        return (df.groupby(['key', 'day'], sort=True)
+                  .agg(amount=('amount', 'sum'), vendor=('vendor', 'last'), category=('category', 'last'))
+                  .reset_index())
+
+    def detect(self, as_of=None) -> pd.DataFrame:
+        """
+        Find recurring charges
+
+        Args:
+            as_of: Date to judge missed/new recurrences against; later charges are ignored
+                   (default: latest archived transaction)
+
+        Returns:
+            DataFrame with one row per recurring vendor: vendor, category, period,
+            period_days, charges, typical_amount (median of recent charges),
+            previous_price (before a recent price change), last_amount,
+            first_date, last_date, next_expected, monthly_cost, status
+            ('active', 'missed' or 'ended') and flags ('new', 'price changed')
+        """
+        charges = self._charges()
+        if as_of is None:
+            as_of_day = int(charges['day'].max()) if len(charges) else 0
+        else:
+            as_of_day = (pd.Timestamp(as_of).normalize() - pd.Timestamp('1970-01-01')).days
+            charges = charges[charges['day'] <= as_of_day].reset_index(drop=True)
+
+        if charges.empty:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        # Inter-arrival gaps and amount steps within each vendor (rows are sorted by key, then day)
+        grouped = charges.groupby('key', sort=False)
+        charges['gap'] = grouped['day'].diff()
+        before = grouped['amount'].shift(1)
+        charges['step'] = (
+            ((charges['amount'] - before).abs() > np.maximum(PRICE_CHANGE_FRACTION * before, MIN_PRICE_CHANGE))
+            & ((before - grouped['amount'].shift(2)).abs() < 0.01)
+        )
+        charges['old_price'] = before
+
+        stats = grouped.agg(
+            charges=('day', 'size'),
+            first_day=('day', 'first'),
+            last_day=('day', 'last'),
+            median_gap=('gap', 'median'),
+            last_amount=('amount', 'last'),
+            vendor=('vendor', 'last'),
+            category=('category', 'last'),
+        )
+        amount_q = grouped['amount'].quantile([0.25, 0.5, 0.75]).unstack()
+        stats['amount_spread'] = (amount_q[0.75] - amount_q[0.25]) / amount_q[0.5].where(amount_q[0.5] > 0)
+        stats['typical_amount'] = charges.groupby('key', sort=False).tail(TYPICAL_WINDOW).groupby('key')['amount'].median()
+
+        # Latest step from a steady price, and whether later charges kept the new price
+        steps = charges[charges['step']].groupby('key', sort=False).last()
+        stats['step_day'] = steps['day']
+        stats['previous_price'] = steps['old_price']
+        stats['new_price'] = steps['amount']
+
+        # Period whose band contains the median gap
+        period_names = list(PERIODS)
+        conditions = [(stats['median_gap'] - days).abs() <= tol for days, tol in PERIODS.values()]
+        stats['period'] = np.select(conditions, period_names, default='')
+        stats = stats[stats['period'] != ''].copy()
+        if stats.empty:
+            return pd.DataFrame(columns=RESULT_COLUMNS)  # Only single or irregular charges so far
+        stats['period_days'] = stats['period'].map({name: days for name, (days, _) in PERIODS.items()})
+        stats['tolerance'] = stats['period'].map({name: tol for name, (_, tol) in PERIODS.items()})
+
+        # Regularity: share of this vendor's gaps within tolerance of its period
+        gaps = charges[['key', 'gap']].dropna().join(stats[['period_days', 'tolerance']], on='key', how='inner')
+        gaps['regular'] = (gaps['gap'] - gaps['period_days']).abs() <= gaps['tolerance']
+        stats['regularity'] = gaps.groupby('key')['regular'].mean()
+
+        new_window = np.maximum(NEW_WITHIN_PERIODS * stats['period_days'], NEW_WITHIN_DAYS)
+        recent_start = stats['first_day'] >= as_of_day - new_window
+        exact_repeat = (stats['charges'] == 2) & (stats['amount_spread'].fillna(0) == 0)
+
+        recurring = (
+            (stats['regularity'] >= MIN_REGULARITY)
+            & (stats['amount_spread'].fillna(0) <= MAX_AMOUNT_SPREAD)
+            & ((stats['charges'] >= MIN_CHARGES) | (exact_repeat & recent_start))
+        )
+        stats = stats[recurring].copy()
+        if stats.empty:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        recent_start = recent_start[recurring]
+
+        overdue_days = as_of_day - stats['last_day']
+        stats['status'] = np.select(
+            [overdue_days > ENDED_AFTER_PERIODS * stats['period_days'],
+             overdue_days > stats['period_days'] + stats['tolerance']],
+            ['ended', 'missed'],
+            default='active'
+        )
+
+        price_changed = (
+            (stats['step_day'] >= as_of_day - PRICE_CHANGE_PERIODS * stats['period_days'] - stats['tolerance'])
+            & ((stats['last_amount'] - stats['new_price']).abs() < 0.01)
+        )
+        stats.loc[~price_changed, 'previous_price'] = np.nan
+        stats.loc[price_changed, 'typical_amount'] = stats['new_price']
+        live = stats['status'] != 'ended'
+        stats['flags'] = [
+            ', '.join(flag for flag, on in (('new', new), ('price changed', changed)) if on)
+            for new, changed in zip(recent_start & live, price_changed & live)
+        ]
+
+        epoch = pd.Timestamp('1970-01-01')
+        result = pd.DataFrame({
+            'vendor': stats['vendor'],
+            'category': stats['category'],
+            'period': stats['period'],
+            'period_days': stats['period_days'],
+            'charges': stats['charges'],
+            'typical_amount': stats['typical_amount'].round(2),
+            'previous_price': stats['previous_price'].round(2),
+            'last_amount': stats['last_amount'].round(2),
+            'first_date': epoch + pd.to_timedelta(stats['first_day'], unit='D'),
+            'last_date': epoch + pd.to_timedelta(stats['last_day'], unit='D'),
+            'next_expected': epoch + pd.to_timedelta((stats['last_day'] + stats['period_days']).round(), unit='D'),
+            'monthly_cost': (stats['typical_amount'] * PERIODS['monthly'][0] / stats['period_days']).round(2),
+            'status': stats['status'],
+            'flags': stats['flags'],
+        })
+        status_order = result['status'].map({'active': 0, 'missed': 1, 'ended': 2})
+        return (result.assign(_order=status_order)
+                      .sort_values(['_order', 'monthly_cost'], ascending=[True, False])
+                      .drop(columns='_order')
+                      .reset_index(drop=True))
+
+    def alerts(self, as_of=None) -> List[Dict]:
+        """Recurrences needing attention: new, missed, or changed price"""
+        found = self.detect(as_of)
+        flagged = found[(found['status'] == 'missed') | (found['flags'] != '')]
+        return flagged.to_dict(orient='records')
+
+    def report_frame(self, as_of=None) -> pd.DataFrame:
+        """Recurring charges that haven't ended, as a report table"""
+        columns = ["Vendor", "Category", "Every", "Amount", "Last Charged", "Next Expected",
+                   "Monthly Cost", "Status", "Alerts"]
+        found = self.detect(as_of)
+        rows = []
+        for item in found[found['status'] != 'ended'].itertuples(index=False):
+            alerts = [item.flags] if item.flags else []
+            if 'price changed' in item.flags:
+                alerts = [f"{item.flags} (was {item.previous_price:.2f})"]
+            rows.append([item.vendor, item.category, item.period, item.typical_amount,
+                         f"{item.last_date:%Y-%m-%d}", f"{item.next_expected:%Y-%m-%d}",
+                         item.monthly_cost, item.status, ', '.join(alerts)])
+        return pd.DataFrame(rows, columns=columns)
+
+    def build_recurring_context(self, as_of=None) -> str:
+        """
+        Build context for LLM listing subscriptions and recurring bills
+
+        Returns:
+            Formatted context string for LLM (empty if none were found)
+        """
+        found = self.detect(as_of)
+        live = found[found['status'] != 'ended']
+        if live.empty:
+            return ""
+
+        context = [f"RECURRING CHARGES & SUBSCRIPTIONS (about ${live['monthly_cost'].sum():.2f} per month):"]
+        for item in live.itertuples(index=False):
+            line = (f"  - {item.vendor} ({item.category}): ${item.typical_amount:.2f} {item.period}, "
+                    f"last charged {item.last_date:%Y-%m-%d}")
+            if item.status == 'missed':
+                line += f", MISSED (expected {item.next_expected:%Y-%m-%d})"
+            if 'price changed' in item.flags:
+                line += f", PRICE CHANGED from ${item.previous_price:.2f} to ${item.last_amount:.2f}"
+            if 'new' in item.flags.split(', '):
+                line += ", NEW"
+            context.append(line)
+        return "\n".join(context)
+
+
+# Global recurring detector instance
+_recurring_detector = None
+
+def get_recurring_detector() -> RecurringDetector:
+    """Get or create global recurring charge detector"""
+    global _recurring_detector
+    if _recurring_detector is None:
+        _recurring_detector = RecurringDetector()
+    return _recurring_detector
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Report Result Memoization
+Fingerprints the report inputs (statement files, rules, categories, month)
+and stores the statement-derived report frames for instant re-runs
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+# Bump when the report frames change shape so older entries are ignored
+REPORT_CACHE_VERSION = 2
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents (streamed in 1 MB chunks)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def report_fingerprint(input_files: Iterable[str],
+                       rules_file: str,
+                       categories_file: str,
+                       month: str,
+                       extra_files: Iterable[str] = ()) -> str:
+    """
+    Fingerprint everything a monthly report depends on
+
+    Args:
+        input_files: Statement files selected for the run
+        rules_file: category_rules.csv in use
+        categories_file: categories.csv in use
+        month: Target month (MM/YYYY)
+        extra_files: Other files whose contents affect the result (e.g. the generator itself)
+
+    Returns:
+        Hex digest identifying this exact set of inputs
+    """
+    parts = [f"version={REPORT_CACHE_VERSION}", f"month={month}"]
+
+    # Inputs are hashed by content, sorted so file order doesn't matter
+    for path in sorted(input_files):
+        parts.append(f"input={file_digest(path)}")
+
+    for label, path in (("rules", rules_file), ("categories", categories_file)):
+        parts.append(f"{label}={file_digest(path) if path and os.path.exists(path) else 'missing'}")
+
+    for path in extra_files:
+        if path and os.path.exists(path):
+            parts.append(f"extra={file_digest(path)}")
+
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class CachedReport:
+    """A stored report run: the frames it produced"""
+
+    def __init__(self, fingerprint: str, frames: Dict[str, pd.DataFrame], created_at: str):
+        self.fingerprint = fingerprint
+        self.frames = frames
+        self.created_at = created_at
+
+
+class ReportCache:
+    """
+    On-disk memo of report runs keyed by input fingerprint
+    Each entry is a directory holding frames.pkl and meta.json
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = 24):
+        """Initialize report cache"""
+
+        if cache_dir is None:
+            home = Path.home()
+            cache_dir = home / '.config' / 'SpendingApp' / 'report_cache'
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+    def _entry_dir(self, fingerprint: str) -> Path:
+        return self.cache_dir / fingerprint[:32]
+
+    def load(self, fingerprint: str) -> Optional[CachedReport]:
+        """
+        Look up a previous run
+
+        Returns:
+            CachedReport, or None on a miss (or an unreadable entry)
+        """
+        entry = self._entry_dir(fingerprint)
+        meta_file = entry / 'meta.json'
+        if not meta_file.exists():
+            return None
+
+        try:
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+            if meta.get('fingerprint') != fingerprint or meta.get('version') != REPORT_CACHE_VERSION:
+                return None
+
+            frames = pd.read_pickle(entry / 'frames.pkl')
+
+            # Touch the entry so pruning keeps recently used reports
+            os.utime(meta_file)
+
+            return CachedReport(
+                fingerprint,
+                frames,
+                meta.get('created_at', '')
+            )
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable report cache entry: {e}")
+            return None
+
+    def store(self, fingerprint: str, frames: Dict[str, pd.DataFrame]) -> Path:
+        """
+        Store a finished run (written to a temp directory, then renamed into place)
+
+        Args:
+            fingerprint: Input fingerprint from report_fingerprint()
+            frames: Name -> DataFrame
+
+        Returns:
+            Path of the cache entry
+        """
+        entry = self._entry_dir(fingerprint)
+        tmp_dir = Path(tempfile.mkdtemp(prefix='.tmp_', dir=self.cache_dir))
+
+        try:
+            pd.to_pickle(frames, tmp_dir / 'frames.pkl')
+
+            with open(tmp_dir / 'meta.json', 'w') as f:
+                json.dump({
+                    'fingerprint': fingerprint,
+                    'version': REPORT_CACHE_VERSION,
+                    'created_at': datetime.now().isoformat(),
+                    'frames': sorted(frames.keys()),
+                }, f, indent=2)
+
+            if entry.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self._prune()
+        return entry
+
+    def _prune(self):
+        """Drop the least recently used entries beyond max_entries"""
+        entries = [p for p in self.cache_dir.iterdir()
+                   if p.is_dir() and (p / 'meta.json').exists()]
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=lambda p: (p / 'meta.json').stat().st_mtime, reverse=True)
+        for stale in entries[self.max_entries:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def clear(self):
+        """Remove every cached report"""
+        for p in self.cache_dir.iterdir():
+            if p.is_dir():
+                shutil.rmtree(p, ignore_errors=True)
+
+
+# Global report cache instance
+_report_cache = None
+
+def get_report_cache() -> ReportCache:
+    """Get or create global report cache"""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache()
+    return _report_cache
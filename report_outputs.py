@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Report Output Writers
+Writes report frames and categorized transactions in machine-readable
+formats (Parquet, CSV, JSON lines) alongside or instead of the Excel workbook
+"""
+
+import json
+import os
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Formats accepted by generate_reports_email.py --format
+OUTPUT_FORMATS = ["xlsx", "parquet", "csv", "json"]
+DEFAULT_FORMATS = ["xlsx"]
+
+# File extension used for each machine-readable format
+FORMAT_EXTENSIONS = {
+    "parquet": "parquet",
+    "csv": "csv",
+    "json": "jsonl",
+}
+
+# Bump when the sidecar layout changes
+SIDECAR_VERSION = 1
+
+
+def parse_formats(value: str) -> List[str]:
+    """
+    Parse a comma-separated --format value
+
+    Args:
+        value: e.g. "xlsx,parquet" (None or empty means the default)
+
+    Returns:
+        Ordered list of unique formats
+
+    Raises:
+        ValueError: If an unknown format is requested
+    """
+    if not value:
+        return list(DEFAULT_FORMATS)
+
+    formats = []
+    for fmt in value.split(","):
+        fmt = fmt.strip().lower()
+        if not fmt:
+            continue
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown format '{fmt}' (choose from: {', '.join(OUTPUT_FORMATS)})"
+            )
+        if fmt not in formats:
+            formats.append(fmt)
+
+    return formats or list(DEFAULT_FORMATS)
+
+
+def _machine_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert display-formatted columns ("12.50", "4.20%") back to numbers"""
+    out = df.copy()
+    for col in out.columns:
+        if not (pd.api.types.is_object_dtype(out[col]) or pd.api.types.is_string_dtype(out[col])):
+            continue
+        text = out[col].astype(str).str.strip()
+        blank = text.eq("") | out[col].isna()
+        numeric = pd.to_numeric(text.str.rstrip("%"), errors="coerce")
+        # Only convert columns where every non-blank value is a number
+        if numeric[~blank].notna().all() and (~blank).any():
+            out[col] = numeric
+    return out
+
+
+def write_report_frames(frames: Dict[str, pd.DataFrame],
+                        output_dir: str,
+                        base_name: str,
+                        formats: List[str]) -> Dict[str, List[str]]:
+    """
+    Write each frame directly in the requested machine-readable formats
+
+    Args:
+        frames: Name -> DataFrame (e.g. report_1, report_2, report_3, transactions)
+        output_dir: Directory to write into
+        base_name: File name prefix, e.g. Spending_Report_01_2026
+        formats: Formats to write ('xlsx' is ignored here)
+
+    Returns:
+        Dictionary of format -> list of written file paths
+    """
+    written = {}
+
+    for fmt in formats:
+        if fmt not in FORMAT_EXTENSIONS:
+            continue
+
+        ext = FORMAT_EXTENSIONS[fmt]
+        paths = []
+        for name, df in frames.items():
+            path = os.path.join(output_dir, f"{base_name}_{name}.{ext}")
+            out = _machine_frame(df)
+
+            if fmt == "parquet":
+                try:
+                    out.to_parquet(path, index=False)
+                except ImportError as e:
+                    print(f"⚠️  Parquet output needs pyarrow or fastparquet: {e}")
+                    break
+            elif fmt == "csv":
+                out.to_csv(path, index=False)
+            elif fmt == "json":
+                out.to_json(path, orient="records", lines=True, date_format="iso")
+
+            paths.append(path)
+
+        if paths:
+            written[fmt] = paths
+
+    return written
+
+
+# ========================================================
+# Report sidecar (hand-off to the email step)
+# ========================================================
+def sidecar_path(output_dir: str, base_name: str) -> str:
+    """Path of the JSON sidecar written next to the workbook"""
+    return os.path.join(output_dir, f"{base_name}.summary.json")
+
+
+def write_report_sidecar(path: str,
+                         month: str,
+                         frames: Dict[str, pd.DataFrame],
+                         html_tables: Dict[str, str],
+                         workbook_path: Optional[str] = None) -> str:
+    """
+    Write the report frames and rendered HTML tables next to the workbook
+    so the email step never has to read the Excel file back
+
+    Args:
+        path: Sidecar path (see sidecar_path)
+        month: Report month (MM/YYYY)
+        frames: Name -> DataFrame to include as records
+        html_tables: Name -> rendered HTML table
+        workbook_path: Excel file generated for this run, if any
+
+    Returns:
+        The sidecar path
+    """
+    data = {
+        'version': SIDECAR_VERSION,
+        'month': month,
+        'generated_at': datetime.now().isoformat(),
+        'workbook': workbook_path,
+        'frames': {name: df.to_dict(orient='records') for name, df in frames.items()},
+        'html': html_tables,
+    }
+
+    # Temp file + rename so a reader never sees a half-written sidecar
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_report_sidecar(path: str) -> Optional[Dict]:
+    """
+    Load a report sidecar
+
+    Returns:
+        Sidecar dictionary (frames rebuilt as DataFrames), or None if missing/unreadable
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+
+    if data.get('version') != SIDECAR_VERSION:
+        return None
+
+    data['frames'] = {name: pd.DataFrame(records) for name, records in data.get('frames', {}).items()}
+    return data
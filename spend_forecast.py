@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Month-End Spend Forecasting
+Projects where each category's spending will land at month end from the
+archive's daily history: a seasonal naive model (the rest of the month
+spends like the same days of recent months) blended with a linear trend
+on this month's cumulative spend. All categories are fitted at once on a
+category x month x day array.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date
+from month_columns import MISSING_DAY, parse_days
+from transaction_logger import TransactionLogger, get_transaction_logger
+
+# Previous months the seasonal model draws on
+HISTORY_MONTHS = 6
+
+# Days of the current month needed before the trend model is trusted
+MIN_TREND_DAYS = 5
+
+# Two-sided 80% normal interval for the confidence bands
+BAND_Z = 1.2816
+
+FORECAST_COLUMNS = ['category', 'spent_to_date', 'seasonal_naive', 'trend', 'forecast', 'low', 'high', 'last_month']
+
+
+class SpendForecaster:
+    """Per-category month-end projections over TransactionLogger's archive"""
+
+    def __init__(self, tx_logger: TransactionLogger = None):
+        self.tx_logger = tx_logger or get_transaction_logger()
+
+    def forecast(self, month_key: str = None, as_of: date = None) -> pd.DataFrame:
+        """
+        Project month-end spend per category
+
+        Args:
+            month_key: Month in YYYY-MM format (default: latest archived month)
+            as_of: Last day counted as spent (default: today within the current month, else month end)
+
+        Returns:
+            DataFrame with category, spent_to_date, seasonal_naive, trend, forecast,
+            low/high (80% band) and last_month, largest forecast first. attrs hold
+            'month', 'as_of_day' and 'days_in_month'.
+        """
+        months = self.tx_logger.get_available_months()
+        if month_key is None:
+            if not months:
+                return pd.DataFrame(columns=FORECAST_COLUMNS)
+            month_key = months[-1]
+
+        period = pd.Period(month_key, freq='M')
+        days_in_month = period.days_in_month
+        history = [m for m in months if m < month_key][-HISTORY_MONTHS:]
+        used = history + [month_key]
+
+        frames = [self.tx_logger.get_month_frame(m) for m in used]
+        df = pd.concat(frames, ignore_index=True)
+        month_pos = np.repeat(np.arange(len(used)), [len(f) for f in frames])
+        days = parse_days(df['date'])
+        valid = days != MISSING_DAY
+        df, month_pos, days = df[valid], month_pos[valid], days[valid]
+        if df.empty:
+            return pd.DataFrame(columns=FORECAST_COLUMNS)
+
+        # Spending as positive amounts whichever sign the statements use
+        amounts = df['amount'].to_numpy(dtype=float)
+        spend = amounts * (-1.0 if amounts.sum() < 0 else 1.0)
+        dates = days.astype('datetime64[D]')
+        day_of_month = (dates - dates.astype('datetime64[M]').astype('datetime64[D]')).astype(int)
+
+        # Category x month x day-of-month spend
+        cat_codes, categories = pd.factorize(df['category'])
+        n_cats, n_months = len(categories), len(used)
+        flat = (cat_codes * n_months + month_pos) * 31 + day_of_month
+        daily = np.bincount(flat, weights=spend, minlength=n_cats * n_months * 31).reshape(n_cats, n_months, 31)
+
+        current = daily[:, -1, :]
+        if as_of is None:
+            today = date.today()
+            as_of = today if (today.year, today.month) == (period.year, period.month) else period.end_time.date()
+        elapsed = as_of.day if (as_of.year, as_of.month) == (period.year, period.month) else days_in_month
+        elapsed = min(max(elapsed, 0), days_in_month)
+        remaining_days = days_in_month - elapsed
+        spent = current[:, :elapsed].sum(axis=1)
+
+        # Seasonal naive: the same remaining days of each recent month, scaled to
+        # this month's remaining days when a history month is shorter (Feb vs Mar)
+        history_days = np.array([pd.Period(m, freq='M').days_in_month for m in history], dtype=float)
+        covered = np.clip(np.minimum(history_days, days_in_month) - elapsed, 0, None)
+        past = daily[:, :-1, elapsed:days_in_month].sum(axis=2)
+        # No overlapping days left (e.g. day 30 against February): use that month's daily rate
+        rate = np.where(covered > 0, past / np.maximum(covered, 1),
+                        daily[:, :-1, :].sum(axis=2) / np.maximum(history_days, 1))
+        past = rate * remaining_days
+        if history:
+            seasonal = spent + past.mean(axis=1)
+            seasonal_sd = past.std(axis=1, ddof=1) if len(history) > 1 else 0.5 * past.mean(axis=1)
+        else:
+            seasonal = spent.copy()
+            seasonal_sd = np.zeros(n_cats)
+
+        # Linear trend: least-squares slope of cumulative spend so far, extended from today's total
+        if elapsed >= 2:
+            t = np.arange(1, elapsed + 1, dtype=float)
+            t -= t.mean()
+            cumulative = current[:, :elapsed].cumsum(axis=1)
+            slope = ((cumulative - cumulative.mean(axis=1, keepdims=True)) * t).sum(axis=1) / (t * t).sum()
+            # MAD keeps one-off charges (rent, bills) from inflating the daily spread
+            so_far = current[:, :elapsed]
+            daily_sd = 1.4826 * np.median(np.abs(so_far - np.median(so_far, axis=1, keepdims=True)), axis=1)
+            trend_sd = daily_sd * np.sqrt(remaining_days)
+        else:
+            slope = spent / max(elapsed, 1)
+            trend_sd = np.abs(slope) * np.sqrt(remaining_days)
+        trend = spent + np.maximum(slope, 0.0) * remaining_days
+
+        # Inverse-variance blend per category: steady history wins for lumpy bills,
+        # the trend wins where recent months varied; history alone early in the month
+        if not history:
+            weight = np.ones(n_cats)
+        elif elapsed < MIN_TREND_DAYS:
+            weight = np.zeros(n_cats)
+        else:
+            seasonal_var, trend_var = seasonal_sd ** 2, trend_sd ** 2
+            total_var = seasonal_var + trend_var
+            weight = np.divide(seasonal_var, total_var, out=np.zeros(n_cats), where=total_var > 0)
+        forecast = weight * trend + (1 - weight) * seasonal
+        spread = BAND_Z * np.sqrt((weight * trend_sd) ** 2 + ((1 - weight) * seasonal_sd) ** 2)
+
+        result = pd.DataFrame({
+            'category': categories.astype(str),
+            'spent_to_date': spent.round(2),
+            'seasonal_naive': seasonal.round(2),
+            'trend': trend.round(2),
+            'forecast': forecast.round(2),
+            'low': np.maximum(forecast - spread, spent).round(2),
+            'high': (forecast + spread).round(2),
+            'last_month': daily[:, -2, :].sum(axis=1).round(2) if history else np.full(n_cats, np.nan),
+        })
+        result = result[(result['forecast'] != 0) | (result['spent_to_date'] != 0)]
+        result = result.sort_values('forecast', ascending=False).reset_index(drop=True)
+        result.attrs.update({'month': month_key, 'as_of_day': elapsed, 'days_in_month': days_in_month})
+        return result
+
+    def forecast_frame(self, month_key: str = None, as_of: date = None) -> pd.DataFrame:
+        """Projections as a report table with a Total row"""
+        columns = ["Category", "Spent To Date", "Forecast", "Low", "High", "Last Month"]
+        found = self.forecast(month_key, as_of)
+        if found.empty:
+            return pd.DataFrame(columns=columns)
+
+        table = found[['category', 'spent_to_date', 'forecast', 'low', 'high', 'last_month']].copy()
+        table.columns = columns
+        # Category bands are combined as if independent
+        half_width = (found['high'] - found['forecast']).to_numpy()
+        total = found['forecast'].sum()
+        table.loc[len(table)] = [
+            "Total", round(found['spent_to_date'].sum(), 2), round(total, 2),
+            round(max(total - np.sqrt((half_width ** 2).sum()), found['spent_to_date'].sum()), 2),
+            round(total + np.sqrt((half_width ** 2).sum()), 2), round(found['last_month'].sum(), 2)
+        ]
+        table.attrs.update(found.attrs)
+        return table
+
+    def build_forecast_context(self, month_key: str = None, top_n: int = 10) -> str:
+        """
+        Build context for LLM with month-end projections
+
+        Args:
+            month_key: Month in YYYY-MM format (default: latest archived month)
+            top_n: Categories to list
+
+        Returns:
+            Formatted context string for LLM (empty if the month is complete or has no data)
+        """
+        found = self.forecast(month_key)
+        if found.empty or found.attrs['as_of_day'] >= found.attrs['days_in_month']:
+            return ""
+
+        context = [
+            f"MONTH-END FORECAST FOR {found.attrs['month']} "
+            f"(data through day {found.attrs['as_of_day']} of {found.attrs['days_in_month']}, 80% range):"
+        ]
+        for item in found.head(top_n).itertuples(index=False):
+            line = (f"  - {item.category}: ${item.spent_to_date:.2f} so far, projected ${item.forecast:.2f} "
+                    f"(${item.low:.2f}–${item.high:.2f})")
+            if not np.isnan(item.last_month):
+                line += f", last month ${item.last_month:.2f}"
+            context.append(line)
+        context.append(f"  Total projected: ${found['forecast'].sum():.2f}")
+        return "\n".join(context)
+
+
+# Global forecaster instance
+_spend_forecaster = None
+
+def get_spend_forecaster() -> SpendForecaster:
+    """Get or create global spend forecaster"""
+    global _spend_forecaster
+    if _spend_forecaster is None:
+        _spend_forecaster = SpendForecaster()
+    return _spend_forecaster
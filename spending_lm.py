@@ -10,12 +10,42 @@ import subprocess
 import json
 import re
 import os
+import time
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from metrics_logger import get_metrics_logger
 from transaction_logger import get_transaction_logger, init_transaction_logger
+from anomaly_detector import get_anomaly_detector
+from recurring_detector import get_recurring_detector
+from budget_tracker import get_budget_tracker
+from spend_forecast import get_spend_forecaster
+
+# Seconds a successful Ollama health check (or request) is trusted for
+HEALTH_CHECK_TTL = 30
+
+# Keep-alive connections kept open to the Ollama server
+OLLAMA_POOL_SIZE = 4
+
+# Pooled HTTP session and health-check expiry per Ollama host, shared by every SpendingLM
+_ollama_session = None
+_ollama_healthy_until = {}
+
+def _print_token(piece: str):
+    """Default streaming output: print each piece as it arrives"""
+    print(piece, end="", flush=True)
+
+def get_ollama_session() -> requests.Session:
+    """Get or create the pooled HTTP session used for Ollama requests"""
+    global _ollama_session
+    if _ollama_session is None:
+        _ollama_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=OLLAMA_POOL_SIZE)
+        _ollama_session.mount("http://", adapter)
+        _ollama_session.mount("https://", adapter)
+    return _ollama_session
 
 class SpendingLM:
     """Local LLM interface for spending data analysis"""
@@ -35,19 +65,44 @@ class SpendingLM:
         self.categories = None
         self.rules = None
         self.transaction_logger = get_transaction_logger()  # Initialize transaction logger
+        self.session = get_ollama_session()
+    
+    def _mark_healthy(self, healthy: bool = True):
+        """Trust (or stop trusting) the Ollama server for HEALTH_CHECK_TTL seconds"""
+        _ollama_healthy_until[self.ollama_host] = time.monotonic() + HEALTH_CHECK_TTL if healthy else 0.0
+    
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request to Ollama over the pooled session
+        
+        Any response proves the server is up; a connection error clears the
+        cached health check so the next call checks again.
+        """
+        try:
+            response = self.session.request(method, f"{self.ollama_host}{path}", **kwargs)
+        except requests.exceptions.ConnectionError:
+            self._mark_healthy(False)
+            raise
+        self._mark_healthy()
+        return response
         
     def is_ollama_running(self) -> bool:
-        """Check if Ollama server is running"""
+        """Check if Ollama server is running (cached for HEALTH_CHECK_TTL seconds)"""
+        if time.monotonic() < _ollama_healthy_until.get(self.ollama_host, 0.0):
+            return True
         try:
-            response = requests.get(f"{self.ollama_host}/api/tags", timeout=2)
-            return response.status_code == 200
+            response = self._request("GET", "/api/tags", timeout=2)
+            if response.status_code != 200:
+                self._mark_healthy(False)
+                return False
+            return True
         except:
             return False
     
     def list_available_models(self) -> List[str]:
         """Get list of available models"""
         try:
-            response = requests.get(f"{self.ollama_host}/api/tags", timeout=5)
+            response = self._request("GET", "/api/tags", timeout=5)
             data = response.json()
             models = [m["name"].split(":")[0] for m in data.get("models", [])]
             self.available_models = list(set(models))  # Remove duplicates
@@ -145,30 +200,153 @@ class SpendingLM:
         """Get list of months with transaction data"""
         return self.transaction_logger.get_available_months()
     
-    def compare_months_with_llm(self, month1: str = None, month2: str = None) -> str:
+    def _emit(self, text: str, on_token: Optional[Callable[[str], None]]) -> str:
+        """Pass a whole message (e.g. an error) through a streaming caller's output"""
+        if on_token is not None:
+            on_token(text)
+        return text
+    
+    def _read_stream(self, response: requests.Response, on_token: Optional[Callable[[str], None]]) -> Tuple[str, Dict]:
+        """
+        Consume Ollama's NDJSON stream, handing each token to on_token
+        
+        Returns:
+            Full response text and the final chunk's stats (eval_count, eval_duration, ...)
+        """
+        metrics = get_metrics_logger()
+        pieces = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"])
+            piece = chunk.get("response", "")
+            if piece:
+                if not pieces:
+                    metrics.log_llm_first_token()
+                pieces.append(piece)
+                if on_token is not None:
+                    on_token(piece)
+            if chunk.get("done"):
+                return "".join(pieces), chunk
+        return "".join(pieces), {}
+    
+    def _generate(self, prompt: str, question: str, stream: bool = False,
+                  on_token: Optional[Callable[[str], None]] = None,
+                  timeout_msg: str = "⏱️  Request timed out. Try again.") -> str:
+        """
+        Run one generation on Ollama and record its metrics
+        
+        There is no health check first: a connection error on the request
+        itself reports Ollama as not running and clears the cached check.
+        
+        Args:
+            prompt: Full prompt text
+            question: Question recorded in the metrics
+            stream: Stream tokens as they arrive instead of waiting for the whole response
+            on_token: Called with each streamed piece (default: print it); error
+                      messages are passed through it too when streaming
+            timeout_msg: Message returned if Ollama stops responding
+            
+        Returns:
+            Response text or error message
+        """
+        if stream and on_token is None:
+            on_token = _print_token
+        emit = on_token if stream else None
+        
+        metrics = get_metrics_logger()
+        metrics.log_llm_query_start(question)
+        
+        try:
+            # With stream=True the timeout applies between chunks, not to the whole answer
+            response = self._request(
+                "POST",
+                "/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": stream,
+                    "temperature": 0.7,
+                },
+                timeout=30,
+                stream=stream
+            )
+            
+            # Closing the response returns its connection to the pool whatever happens below
+            with response:
+                if response.status_code == 200:
+                    if stream:
+                        try:
+                            response_text, stats = self._read_stream(response, emit)
+                        except (requests.exceptions.RequestException, RuntimeError, ValueError) as e:
+                            # Ollama answered, so a failure here is mid-stream, not "not running"
+                            error_msg = f"\n❌ Ollama stopped partway through the answer: {e}"
+                            metrics.log_potential_hallucination(question, error_msg, severity="ERROR")
+                            return self._emit(error_msg, emit)
+                        response_text = response_text or self._emit("No response generated", emit)
+                    else:
+                        stats = response.json()
+                        response_text = stats.get("response", "No response generated")
+                    
+                    # Log LLM inference complete with Ollama's own token counts and timings
+                    metrics.log_llm_inference_complete(response_text, ollama_stats=stats)
+                    
+                    return response_text
+                elif response.status_code == 404:
+                    # Model not found
+                    error_msg = f"❌ Model '{self.model}' not found.\n"
+                    error_msg += f"   Install with: ollama pull {self.model}\n"
+                    error_msg += f"   Then restart Ollama: ollama serve"
+                    metrics.log_potential_hallucination(question, error_msg, severity="ERROR")
+                    return self._emit(error_msg, emit)
+                else:
+                    try:
+                        error_data = response.json()
+                        error_detail = error_data.get("error", f"HTTP {response.status_code}")
+                    except:
+                        error_detail = response.text or f"HTTP {response.status_code}"
+                    
+                    error_msg = f"❌ LLM Error: {error_detail}"
+                    metrics.log_potential_hallucination(question, error_msg, severity="ERROR")
+                    return self._emit(error_msg, emit)
+                    
+        except requests.exceptions.ConnectionError:
+            error_msg = "❌ Ollama is not running. Start it with: ollama serve"
+            metrics.log_potential_hallucination(question, error_msg, severity="ERROR")
+            return self._emit(error_msg, emit)
+        except requests.exceptions.Timeout:
+            metrics.log_potential_hallucination(question, timeout_msg, severity="TIMEOUT")
+            return self._emit(timeout_msg, emit)
+        except Exception as e:
+            error_msg = f"❌ Error querying LLM: {e}"
+            metrics.log_potential_hallucination(question, error_msg, severity="EXCEPTION")
+            return self._emit(error_msg, emit)
+    
+    def compare_months_with_llm(self, month1: str = None, month2: str = None,
+                                stream: bool = False, on_token: Callable[[str], None] = None) -> str:
         """
         Compare spending between two months using LLM analysis
         
         Args:
             month1: First month (YYYY-MM), latest if None
             month2: Second month (YYYY-MM), previous if None
+            stream: Print (or pass to on_token) the analysis as it is generated
+            on_token: Receives each streamed piece instead of printing it
             
         Returns:
             LLM analysis of month-to-month comparison
         """
-        if not self.is_ollama_running():
-            return "❌ Ollama is not running. Start it with: ollama serve"
+        emit = (on_token or _print_token) if stream else None
         
         # Build comparison context
         context = self.transaction_logger.build_comparison_context(month1, month2)
         
         if "No transaction data" in context or "Error" in context:
-            return context
+            return self._emit(context, emit)
         
-        # Log LLM query start
-        metrics = get_metrics_logger()
         question = f"Compare spending for {month1 or 'latest'} vs {month2 or 'previous'} months"
-        metrics.log_llm_query_start(question)
         
         # Create comparison analysis prompt
         prompt = f"""{context}
@@ -181,70 +359,48 @@ Based on this spending data comparison, please provide:
 
 Be concise and actionable with specific dollar amounts."""
 
-        try:
-            response = requests.post(
-                f"{self.ollama_host}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.7,
-                },
-                timeout=30
-            )
+        return self._generate(prompt, question, stream, on_token)
+    
+    def analyze_trends_with_llm(self, window: int = 3, stream: bool = False,
+                                on_token: Callable[[str], None] = None) -> str:
+        """
+        Analyze spending trends across every archived month using LLM
+        
+        Args:
+            window: Months for rolling averages and trend slopes
+            stream: Print (or pass to on_token) the analysis as it is generated
+            on_token: Receives each streamed piece instead of printing it
             
-            if response.status_code == 200:
-                result = response.json()
-                response_text = result.get("response", "No response generated")
-                
-                # Log LLM inference complete
-                metrics.log_llm_inference_complete(
-                    response_text, 
-                    len(response_text.split())
-                )
-                
-                return response_text
-            elif response.status_code == 404:
-                # Model not found
-                error_msg = f"❌ Model '{self.model}' not found.\n"
-                error_msg += f"   Install with: ollama pull {self.model}\n"
-                error_msg += f"   Then restart Ollama: ollama serve"
-                metrics.log_potential_hallucination(question, error_msg, severity="ERROR")
-                return error_msg
-            else:
-                try:
-                    error_data = response.json()
-                    error_detail = error_data.get("error", str(response.status_code))
-                except:
-                    error_detail = str(response.status_code)
-                
-                error_msg = f"Error: {error_detail}"
-                metrics.log_potential_hallucination(question, error_msg, severity="ERROR")
-                return error_msg
-                
-        except requests.exceptions.Timeout:
-            timeout_msg = "⏱️  Request timed out. Try again."
-            metrics.log_potential_hallucination(question, timeout_msg, severity="TIMEOUT")
-            return timeout_msg
-        except Exception as e:
-            error_msg = f"❌ Error: {e}"
-            metrics.log_potential_hallucination(question, error_msg, severity="EXCEPTION")
-            return error_msg
+        Returns:
+            LLM analysis of multi-month trends
+        """
+        from trend_analytics import TrendAnalytics
+        
+        context = TrendAnalytics(self.transaction_logger).build_trend_context(window)
+        if context.startswith("No transaction data"):
+            return self._emit(context, (on_token or _print_token) if stream else None)
+        
+        question = (
+            "Based on these multi-month trends, describe the overall direction of spending, "
+            "the categories and vendors with the strongest trends, any notable year-over-year "
+            "changes, and specific recommendations."
+        )
+        return self.query(question, context=context, stream=stream, on_token=on_token)
     
-    def query(self, question: str, context: str = None) -> str:
+    def query(self, question: str, context: str = None, stream: bool = False,
+              on_token: Callable[[str], None] = None) -> str:
         """
         Ask natural language question about spending
         
         Args:
             question: Natural language query
             context: Optional pre-built context (if None, builds from data)
+            stream: Print (or pass to on_token) the answer as it is generated
+            on_token: Receives each streamed piece instead of printing it
             
         Returns:
             LLM response
         """
-        if not self.is_ollama_running():
-            return "❌ Ollama is not running. Start it with: ollama serve"
-        
         # Build context from spending data if not provided
         if context is None:
             context = self._build_context()
@@ -260,71 +416,8 @@ USER QUESTION:
 
 Please provide a clear, concise answer based on the spending data provided. If asked about amounts, be specific with dollar signs and percentages."""
         
-        # Log LLM query start
-        metrics = get_metrics_logger()
-        metrics.log_llm_query_start(question)
-        
-        try:
-            response = requests.post(
-                f"{self.ollama_host}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "temperature": 0.7,
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                response_text = result.get("response", "No response generated")
-                
-                # Log LLM inference complete
-                metrics.log_llm_inference_complete(
-                    response_text, 
-                    len(response_text.split())
-                )
-                
-                return response_text
-            elif response.status_code == 404:
-                # Model not found
-                error_msg = f"❌ Model '{self.model}' not found.\n"
-                error_msg += f"   Install with: ollama pull {self.model}\n"
-                error_msg += f"   Then restart Ollama: ollama serve"
-                metrics.log_potential_hallucination(question, error_msg, severity="ERROR")
-                return error_msg
-            else:
-                try:
-                    error_data = response.json()
-                    error_detail = error_data.get("error", f"HTTP {response.status_code}")
-                except:
-                    error_detail = response.text or f"HTTP {response.status_code}"
-                
-                error_msg = f"❌ LLM Error: {error_detail}"
-                metrics.log_potential_hallucination(
-                    question, 
-                    error_msg, 
-                    severity="ERROR"
-                )
-                return error_msg
-                
-        except requests.exceptions.Timeout:
-            timeout_msg = "⏱️  Request timed out. Try a simpler question."
-            metrics.log_potential_hallucination(
-                question, 
-                timeout_msg, 
-                severity="TIMEOUT"
-            )
-            return timeout_msg
-        except Exception as e:
-            error_msg = f"❌ Error querying LLM: {e}"
-            metrics.log_potential_hallucination(
-                question, 
-                error_msg, 
-                severity="EXCEPTION"
-            )
-            return error_msg
+        return self._generate(prompt, question, stream, on_token,
+                              timeout_msg="⏱️  Request timed out. Try a simpler question.")
     
     def _build_context_with_transactions(self) -> str:
         """Build context including actual transaction data with vendors and amounts"""
@@ -401,6 +494,42 @@ Please provide a clear, concise answer based on the spending data provided. If a
         except:
             pass
         
+        # Unusual transactions from the archive's per-vendor/category statistics
+        try:
+            anomalies = get_anomaly_detector().build_anomaly_context()
+            if anomalies:
+                context.append(anomalies)
+                context.append("")
+        except Exception:
+            pass
+        
+        # Subscriptions and recurring bills found across the whole archive
+        try:
+            recurring = get_recurring_detector().build_recurring_context()
+            if recurring:
+                context.append(recurring)
+                context.append("")
+        except Exception:
+            pass
+        
+        # Budget-to-date for the latest archived month
+        try:
+            budgets = get_budget_tracker().build_budget_context()
+            if budgets:
+                context.append(budgets)
+                context.append("")
+        except Exception:
+            pass
+        
+        # Month-end projections while the latest month is still in progress
+        try:
+            forecast = get_spend_forecaster().build_forecast_context()
+            if forecast:
+                context.append(forecast)
+                context.append("")
+        except Exception:
+            pass
+        
         context.append("INSTRUCTIONS:")
         context.append("- Reference specific vendors and amounts when answering questions")
         context.append("- Provide dollar amounts with the $ symbol")
@@ -409,17 +538,10 @@ Please provide a clear, concise answer based on the spending data provided. If a
         
         return "\n".join(context)
     
-    def analyze_spending_patterns(self) -> str:
+    def analyze_spending_patterns(self, stream: bool = False, on_token: Callable[[str], None] = None) -> str:
         """Generate automatic spending analysis and insights"""
-        if not self.is_ollama_running():
-            return "❌ Ollama is not running. Start it with: ollama serve"
-        
         context = self._build_context_with_transactions()
         
-        # Log LLM query start
-        metrics = get_metrics_logger()
-        metrics.log_llm_query_start("analyze_spending_patterns")
-        
         prompt = """Please analyze the spending data provided and give:
 1. Key spending insights (2-3 bullet points)
 2. Highest spending categories
@@ -428,25 +550,8 @@ Please provide a clear, concise answer based on the spending data provided. If a
 
 Be concise and actionable."""
         
-        try:
-            response = self.query(prompt, context=context)
-            
-            # Log LLM inference complete
-            metrics.log_llm_inference_complete(
-                response, 
-                len(response.split())
-            )
-            
-            return response
-                
-        except Exception as e:
-            error_msg = f"Error generating analysis: {e}"
-            metrics.log_potential_hallucination(
-                "analyze_spending_patterns",
-                error_msg,
-                severity="EXCEPTION"
-            )
-            return error_msg
+        # query() records the inference metrics
+        return self.query(prompt, context=context, stream=stream, on_token=on_token)
     
     def _build_context(self) -> str:
         """Build context string from available data"""
@@ -476,14 +581,16 @@ Be concise and actionable."""
         
         return "\n".join(context)
     
-    def query_logs(self, question: str = None) -> str:
+    def query_logs(self, question: str = None, stream: bool = False,
+                   on_token: Callable[[str], None] = None) -> str:
         """Query application logs and metrics with natural language"""
+        emit = (on_token or _print_token) if stream else None
         try:
             home = Path.home()
             logs_dir = home / '.config' / 'SpendingApp' / 'logs'
             
             if not logs_dir.exists():
-                return "❌ No logs found yet. Run the application first."
+                return self._emit("❌ No logs found yet. Run the application first.", emit)
             
             # Get metrics from memory (more current than JSON)
             metrics = get_metrics_logger()
@@ -570,16 +677,11 @@ User Question: {question}
 
 Based on the application metrics and transaction data available, provide a helpful and concise answer to the user's question."""
             
-            metrics.log_llm_query_start(question)
-            
-            response = self.query(question, context=context)
-            
-            metrics.log_llm_inference_complete(response)
-            
-            return response
+            # query() records the inference metrics
+            return self.query(question, context=context, stream=stream, on_token=on_token)
             
         except Exception as e:
-            return f"❌ Error querying logs: {e}"
+            return self._emit(f"❌ Error querying logs: {e}", emit)
     
     def interactive_session(self):
         """Start interactive Q&A session"""
@@ -635,8 +737,8 @@ Based on the application metrics and transaction data available, provide a helpf
                     continue
                 
                 print("\n🔍 Analyzing...\n")
-                response = self.query(question, context=transaction_context)
-                print(f"💡 Response:\n{response}")
+                print("💡 Response:")
+                self.query(question, context=transaction_context, stream=True)
                 print("\n" + "-"*70)
                 
             except KeyboardInterrupt:
@@ -717,12 +819,12 @@ def main():
         print(f"\n🤔 Query: {args.query}\n")
         print("🔍 Analyzing...\n")
         
+        print("💡 Response:")
         if args.analyze:
-            response = lm.analyze_spending_patterns()
+            lm.analyze_spending_patterns(stream=True)
         else:
-            response = lm.query(args.query)
-        
-        print(f"💡 Response:\n{response}\n")
+            lm.query(args.query, stream=True)
+        print("\n")
         return
     
     # Interactive mode
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Transaction Archive Indexes
+Per-month sorted date index and vendor/category inverted indexes over
+MonthColumns, plus a sorted name index for vendor prefix and substring
+lookups, so TransactionLogger.query never scans whole months
+"""
+
+import bisect
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set
+from month_columns import MonthColumns, StringTable
+
+_NO_ROWS = np.empty(0, dtype=np.int64)
+
+
+def _inverted(codes: np.ndarray) -> Dict[int, np.ndarray]:
+    """Code -> ascending positions into `codes`"""
+    if not len(codes):
+        return {}
+    order = np.argsort(codes, kind='stable')
+    unique_codes, starts = np.unique(codes[order], return_index=True)
+    return dict(zip(unique_codes.tolist(), np.split(order, starts[1:])))
+
+
+class MonthIndex:
+    """
+    Date-sorted view of one month with vendor and category posting lists
+
+    Positions refer to the date-sorted order; `order` maps them back to row
+    numbers in the month's logging order.
+    """
+
+    def __init__(self, columns: MonthColumns):
+        days = columns.day_array()
+        self.order = np.argsort(days, kind='stable')
+        self.days = days[self.order]
+        self.amounts = columns.amount_array()[self.order]
+        self.vendor_rows = _inverted(columns.code_array('vendor')[self.order])
+        self.category_rows = _inverted(columns.code_array('category')[self.order])
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @staticmethod
+    def _postings(rows_by_code: Dict[int, np.ndarray], codes: Iterable[int]) -> np.ndarray:
+        hits = [rows_by_code[code] for code in codes if code in rows_by_code]
+        if not hits:
+            return _NO_ROWS
+        return hits[0] if len(hits) == 1 else np.unique(np.concatenate(hits))
+
+    def select(self,
+               first_day: Optional[int] = None,
+               last_day: Optional[int] = None,
+               vendor_codes: Optional[Set[int]] = None,
+               category_codes: Optional[Set[int]] = None,
+               min_amount: Optional[float] = None,
+               max_amount: Optional[float] = None) -> np.ndarray:
+        """
+        Row numbers matching every given filter, in date order
+
+        Args:
+            first_day, last_day: Inclusive day-number range (days since 1970-01-01)
+            vendor_codes, category_codes: Allowed string-table codes
+            min_amount, max_amount: Inclusive amount bounds
+
+        Returns:
+            Array of row numbers into the month's columns
+        """
+        low = 0 if first_day is None else int(np.searchsorted(self.days, first_day, side='left'))
+        high = len(self.days) if last_day is None else int(np.searchsorted(self.days, last_day, side='right'))
+
+        positions = None
+        for rows_by_code, codes in ((self.vendor_rows, vendor_codes), (self.category_rows, category_codes)):
+            if codes is None:
+                continue
+            matched = self._postings(rows_by_code, codes)
+            positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+
+        if positions is None:
+            positions = np.arange(low, high)
+        else:
+            positions = positions[(positions >= low) & (positions < high)]
+
+        if min_amount is not None:
+            positions = positions[self.amounts[positions] >= min_amount]
+        if max_amount is not None:
+            positions = positions[self.amounts[positions] <= max_amount]
+        return self.order[positions]
+
+
+class NameIndex:
+    """Case-insensitive sorted names for prefix (bisect) and substring lookups"""
+
+    def __init__(self, names: Iterable[str]):
+        self.entries = sorted((name.casefold(), name) for name in set(names))
+        self.keys = [key for key, _ in self.entries]
+
+    def exact(self, text: str) -> List[str]:
+        return self.prefix(text, whole=True)
+
+    def prefix(self, text: str, whole: bool = False) -> List[str]:
+        """Names starting with `text` (or equal to it if whole)"""
+        key = text.casefold()
+        matches = []
+        for i in range(bisect.bisect_left(self.keys, key), len(self.keys)):
+            if not self.keys[i].startswith(key) or (whole and self.keys[i] != key):
+                break
+            matches.append(self.entries[i][1])
+        return matches
+
+    def contains(self, text: str) -> List[str]:
+        """Names containing `text` anywhere"""
+        key = text.casefold()
+        return [name for folded, name in self.entries if key in folded]
+
+
+def name_matcher(exact: Optional[Iterable[str]] = None, prefix: str = None, contains: str = None):
+    """
+    Case-insensitive predicate on names for the given filters (None if no filter)
+
+    Used to prune months by the manifest's vendor/category keys before loading rows.
+    """
+    if exact is None and prefix is None and contains is None:
+        return None
+    exact = {name.casefold() for name in exact} if exact is not None else None
+    prefix = prefix.casefold() if prefix is not None else None
+    contains = contains.casefold() if contains is not None else None
+
+    def matches(name: str) -> bool:
+        folded = name.casefold()
+        return ((exact is None or folded in exact)
+                and (prefix is None or folded.startswith(prefix))
+                and (contains is None or contains in folded))
+    return matches
+
+
+def resolve_codes(table: StringTable, names: NameIndex,
+                  exact: Optional[Iterable[str]] = None, prefix: str = None, contains: str = None) -> Optional[Set[int]]:
+    """
+    String-table codes of the names passing every filter (None if no filter)
+
+    Args:
+        table: Shared string table of the loaded months
+        names: Index of the names in use for this column
+        exact: Accepted names (any case)
+        prefix: Required leading text
+        contains: Required substring
+    """
+    matches = name_matcher(exact, prefix, contains)
+    if matches is None:
+        return None
+
+    # Narrow with the cheapest lookup, then check the rest on the few names left
+    if exact is not None:
+        candidates = [name for text in exact for name in names.exact(text)]
+    elif prefix is not None:
+        candidates = names.prefix(prefix)
+    else:
+        candidates = names.contains(contains)
+    return {table.codes[name] for name in candidates if matches(name)}
@@ -7,11 +7,143 @@ Enables month-to-month spending analysis
 
 import json
 import os
+import re
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import hashlib
+from archive_storage import get_archive_backend
+from archive_manifest import ArchiveManifest, MonthAggregates, rebuild_manifest
+from month_columns import MonthColumns, StringTable, take_rows
+from archive_lock import ArchiveLock
+from transaction_index import MonthIndex, NameIndex, name_matcher, resolve_codes
+
+CONFIG_FILE = Path.home() / '.config' / 'SpendingApp' / 'config.json'
+
+
+def get_configured_backend() -> str:
+    """Archive backend from config.json ("archive_backend"), defaulting to json"""
+    try:
+        if CONFIG_FILE.exists():
+            with open(CONFIG_FILE, 'r') as f:
+                return json.load(f).get('archive_backend', 'json')
+    except Exception:
+        pass
+    return 'json'
+
+def transaction_key(date, vendor, amount) -> str:
+    """
+    Identity of a transaction: hash of its date, vendor and amount
+
+    The category is left out so a re-categorized charge still matches the
+    archived row (and is updated in place rather than logged twice).
+    """
+    return hashlib.md5(f"{date}|{vendor}|{float(amount):.2f}".encode()).hexdigest()[:12]
+
+
+def _ordinal_ids(ids: List[str], seen: Dict[str, int] = None) -> List[str]:
+    """Suffix repeated IDs with their occurrence number (id, id-2, id-3, ...)"""
+    seen = {} if seen is None else seen
+    result = []
+    for tx_id in ids:
+        n = seen.get(tx_id, 0) + 1
+        seen[tx_id] = n
+        result.append(tx_id if n == 1 else f"{tx_id}-{n}")
+    return result
+
+
+class LoadedMonths:
+    """
+    LRU of months loaded into memory, bounded by approximate size
+    
+    A month's size is its columns plus anything derived from them that is
+    cached alongside (e.g. its decoded DataFrame), all evicted together.
+    Months with unsaved changes are pinned and never evicted.
+    """
+    
+    def __init__(self, max_bytes: int, on_evict: Callable[[str], None] = None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.dirty = set()
+        self._months = OrderedDict()
+        self._sizes = {}
+        self._extra = {}
+    
+    def __contains__(self, month_key: str) -> bool:
+        return month_key in self._months
+    
+    def __len__(self) -> int:
+        return len(self._months)
+    
+    def keys(self) -> List[str]:
+        return list(self._months.keys())
+    
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+    
+    def discard(self, month_key: str):
+        """Drop a clean month (reloaded from storage on next access)"""
+        if month_key in self._months and month_key not in self.dirty:
+            del self._months[month_key]
+            del self._sizes[month_key]
+            self._extra.pop(month_key, None)
+            if self.on_evict:
+                self.on_evict(month_key)
+    
+    def get(self, month_key: str) -> Optional[MonthColumns]:
+        """Columns for a loaded month (marks it most recently used)"""
+        if month_key not in self._months:
+            return None
+        self._months.move_to_end(month_key)
+        return self._months[month_key]
+    
+    def put(self, month_key: str, columns: MonthColumns, dirty: bool = False):
+        """Store a month's columns, evicting cold months if over budget"""
+        self._months[month_key] = columns
+        self._months.move_to_end(month_key)
+        if dirty:
+            self.dirty.add(month_key)
+        self.resize(month_key)
+    
+    def mark_dirty(self, month_key: str):
+        """Pin a month until it is saved (call after appending to its columns)"""
+        self.dirty.add(month_key)
+        self.resize(month_key)
+    
+    def mark_clean(self, month_key: str):
+        """Unpin a month after it is saved"""
+        self.dirty.discard(month_key)
+        self._evict()
+    
+    def resize(self, month_key: str):
+        """Re-measure a month's size after its columns changed"""
+        self._sizes[month_key] = self._months[month_key].nbytes() + self._extra.get(month_key, 0)
+        self._evict()
+    
+    def set_extra(self, month_key: str, nbytes: int):
+        """Count derived data cached for a loaded month (0 once it is dropped)"""
+        if month_key not in self._months:
+            return
+        self._extra[month_key] = nbytes
+        self.resize(month_key)
+    
+    def _evict(self):
+        newest = next(reversed(self._months), None)
+        for month_key in list(self._months):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if month_key in self.dirty or month_key == newest:
+                continue
+            del self._months[month_key]
+            del self._sizes[month_key]
+            self._extra.pop(month_key, None)
+            if self.on_evict:
+                self.on_evict(month_key)
+
 
 class TransactionLogger:
     """
@@ -19,8 +151,18 @@ class TransactionLogger:
     Enables historical comparison and trend analysis
     """
     
-    def __init__(self, log_dir: str = None):
-        """Initialize transaction logger"""
+    # Memory budget for loaded months (least recently used months are dropped first)
+    DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+    
+    def __init__(self, log_dir: str = None, backend: str = None, cache_bytes: int = None):
+        """
+        Initialize transaction logger
+        
+        Args:
+            log_dir: Archive directory (default: ~/.config/SpendingApp/transaction_logs)
+            backend: Storage backend name ('json', 'parquet', 'sqlite'); default from config.json
+            cache_bytes: Memory budget for loaded months (default 64 MB)
+        """
         
         # Set up log directory
         if log_dir is None:
@@ -32,15 +174,172 @@ class TransactionLogger:
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Monthly transaction storage
+        # On-disk storage format
+        self.backend = get_archive_backend(backend or get_configured_backend(), self.log_dir)
+        
+        # Advisory lock shared with other processes using this directory
+        # (lock conversions re-check the manifest for saves made in between)
+        self.lock = ArchiveLock(self.log_dir, on_reacquire=self._sync_with_disk)
+        
+        # Per-month aggregates (manifest.json), rebuilt if missing or from another backend
+        with self.lock.shared():
+            self.manifest = ArchiveManifest(self.log_dir)
+        if self.manifest.backend != self.backend.name:
+            with self.lock.exclusive():
+                self.manifest.load()
+                if self.manifest.backend != self.backend.name and self.backend.list_months():
+                    self.manifest = rebuild_manifest(self.log_dir, self.backend)
+        
+        # Monthly transaction storage (months are loaded on first access),
+        # columnar with vendors, categories and dates interned in one string table
         self.current_month_key = None
-        self.transactions_by_month = {}
+        self.strings = StringTable()
+        self.transactions_by_month = LoadedMonths(
+            cache_bytes or self.DEFAULT_CACHE_BYTES, on_evict=self._forget_month
+        )
         self.monthly_summaries = {}
+        
+        # Months present in the archive or logged this session (listing only, no rows)
+        self._known_months = None
+        
+        # Typed frames per month (filled on load, dropped when a month changes)
+        self._month_frames = {}
+        
+        # Transaction key -> row per month (built on first upsert into a month)
+        self._month_ids = {}
+        
+        # Archived rows re-categorized since the last save: month -> key -> category
+        self._recategorized = {}
+        
+        # Running sum/count/min/max per month, category and vendor (updated on every insert)
+        self._month_aggs = {}
+        
+        # Rows per month already in storage; later rows are the unsaved delta
+        self._saved_counts = {}
+        
+        # Manifest content_version of each month as it was loaded
+        self._month_versions = {}
+        
+        # Query indexes per month (rebuilt when the month's rows change), and
+        # vendor/category name indexes over every code ever indexed
+        self._month_indexes = {}
+        self._indexed_codes = {'vendor': set(), 'category': set()}
+        self._name_indexes = {}
+        
+        # Callbacks for newly logged rows (month_key, frame), re-categorized rows and after each save
+        self._insert_listeners = []
+        self._update_listeners = []
+        self._save_listeners = []
+    
+    def add_insert_listener(self, callback: Callable[[str, pd.DataFrame], None]):
+        """Call `callback(month_key, rows)` whenever new transactions are logged"""
+        self._insert_listeners.append(callback)
+    
+    def add_update_listener(self, callback: Callable[[str, pd.DataFrame], None]):
+        """Call `callback(month_key, rows)` when archived transactions change category"""
+        self._update_listeners.append(callback)
+    
+    def add_save_listener(self, callback: Callable[[], None]):
+        """Call `callback()` after the archive is saved"""
+        self._save_listeners.append(callback)
+    
+    def _notify_insert(self, month_key: str, rows: pd.DataFrame):
+        self._notify(self._insert_listeners, month_key, rows)
+    
+    def _notify(self, listeners: List[Callable], month_key: str, rows: pd.DataFrame):
+        for callback in listeners:
+            try:
+                callback(month_key, rows)
+            except Exception as e:
+                print(f"⚠️  Transaction listener failed: {e}")
     
     def _get_month_key(self, date_obj: datetime) -> str:
         """Generate month key in format YYYY-MM"""
         return date_obj.strftime('%Y-%m')
     
+    def _forget_month(self, month_key: str):
+        """Drop derived state for a month evicted from memory"""
+        self._month_frames.pop(month_key, None)
+        self._month_ids.pop(month_key, None)
+        self._month_aggs.pop(month_key, None)
+        self._saved_counts.pop(month_key, None)
+        self._month_versions.pop(month_key, None)
+        self.monthly_summaries.pop(month_key, None)
+        self._month_indexes.pop(month_key, None)
+    
+    def _sync_with_disk(self):
+        """
+        Pick up archive changes saved by other processes
+        
+        Clean months whose manifest version moved are dropped and reloaded on
+        next access; months with unsaved rows are merged when saved.
+        """
+        if not self.manifest.changed_on_disk():
+            return
+        
+        with self.lock.shared():
+            self.manifest.load()
+        
+        for month_key in self.transactions_by_month.keys():
+            if self.manifest.content_version(month_key) != self._month_versions.get(month_key, 0):
+                self.transactions_by_month.discard(month_key)
+        
+        dirty = self.transactions_by_month.dirty
+        self.monthly_summaries = {m: s for m, s in self.monthly_summaries.items() if m in dirty}
+        self._known_months = set(self.manifest.list_months()) | dirty
+    
+    def _month_listing(self) -> set:
+        """Months available in the archive (listed once, then kept up to date)"""
+        if self._known_months is None:
+            self._known_months = set(self.manifest.list_months())
+        return self._known_months
+    
+    def _month_columns(self, month_key: str) -> MonthColumns:
+        """A month's columns, loading them from the archive on first access"""
+        columns = self.transactions_by_month.get(month_key)
+        if columns is None:
+            if month_key in self._month_listing() or self.backend.has_month(month_key):
+                self._load_month(month_key)
+                columns = self.transactions_by_month.get(month_key)
+            if columns is None:
+                columns = MonthColumns(self.strings)
+                self.transactions_by_month.put(month_key, columns)
+        return columns
+    
+    def _cache_frame(self, month_key: str, frame: pd.DataFrame):
+        """Keep a month's decoded frame, counted against the memory budget"""
+        self._month_frames[month_key] = frame
+        self.transactions_by_month.set_extra(month_key, int(frame.memory_usage(deep=True).sum()))
+    
+    def _drop_frame(self, month_key: str):
+        """Drop a month's decoded frame after its columns changed"""
+        self._month_frames.pop(month_key, None)
+        self.transactions_by_month.set_extra(month_key, 0)
+    
+    def _month_changed(self, month_key: str):
+        """Record that a month gained transactions in memory"""
+        self._drop_frame(month_key)
+        self.transactions_by_month.mark_dirty(month_key)
+        self.monthly_summaries.pop(month_key, None)
+        self._month_listing().add(month_key)
+        self.current_month_key = month_key
+    
+    def _month_aggregates(self, month_key: str) -> MonthAggregates:
+        """
+        Running aggregates for a month (call before appending new rows)
+        
+        Seeded from the manifest for saved months, otherwise from the
+        month's rows once; afterwards only new rows are folded in.
+        """
+        if month_key not in self._month_aggs:
+            aggs = None
+            if month_key not in self.transactions_by_month.dirty:
+                aggs = self.manifest.aggregates(month_key)
+            if aggs is None:
+                aggs = MonthAggregates.from_frame(self.get_month_frame(month_key))
+            self._month_aggs[month_key] = aggs
+        return self._month_aggs[month_key]
+    
     def log_transaction(self, 
                        date: str, 
                        vendor: str, 
@@ -63,6 +362,8 @@ class TransactionLogger:
             Transaction ID
         """
         
+        self._sync_with_disk()
+        
         try:
             # Parse date
             date_obj = pd.to_datetime(date)
@@ -70,12 +371,7 @@ class TransactionLogger:
             
             # Generate transaction ID if not provided
             if transaction_id is None:
-                hash_input = f"{date}|{vendor}|{amount}|{category}".encode()
-                transaction_id = hashlib.md5(hash_input).hexdigest()[:12]
-            
-            # Initialize month storage if needed
-            if month_key not in self.transactions_by_month:
-                self.transactions_by_month[month_key] = []
+                transaction_id = transaction_key(date, vendor, amount)
             
             # Create transaction record
             transaction = {
@@ -89,8 +385,14 @@ class TransactionLogger:
             }
             
             # Add to monthly log
-            self.transactions_by_month[month_key].append(transaction)
-            self.current_month_key = month_key
+            columns = self._month_columns(month_key)
+            self._month_aggregates(month_key).add(category, vendor, amount)
+            columns.append(transaction)
+            if month_key in self._month_ids:
+                self._month_ids[month_key].setdefault(transaction_id, len(columns) - 1)
+            self._month_changed(month_key)
+            if self._insert_listeners:
+                self._notify_insert(month_key, columns.to_frame(start=len(columns) - 1))
             
             return transaction_id
             
@@ -98,13 +400,50 @@ class TransactionLogger:
             print(f"❌ Error logging transaction: {e}")
             return None
     
-    def log_transactions_batch(self, transactions_df: pd.DataFrame, 
-                               date_column: str = 'Date',
-                               vendor_column: str = 'Vendor',
-                               amount_column: str = 'Amount',
-                               category_column: str = 'Category') -> int:
+    def _month_id_index(self, month_key: str) -> Dict[str, int]:
         """
-        Log multiple transactions from DataFrame
+        Transaction keys already archived for a month, mapped to their rows
+        
+        Keys are recomputed from each row's date, vendor and amount (not its
+        stored ID), so rows archived under older ID schemes still match. The
+        stored month is loaded first so new rows are merged into it, not
+        written over it.
+        """
+        if month_key not in self._month_ids:
+            frame = self._month_columns(month_key).to_frame()
+            keys = _ordinal_ids([
+                transaction_key(date, vendor, amount)
+                for date, vendor, amount in zip(frame['date'], frame['vendor'], frame['amount'])
+            ])
+            self._month_ids[month_key] = {key: row for row, key in enumerate(keys)}
+        return self._month_ids[month_key]
+    
+    def _recategorize(self, month_key: str, rows: np.ndarray, keys: List[str], categories: List[str]):
+        """Change the category of archived rows in place (the month is rewritten on save)"""
+        columns = self._month_columns(month_key)
+        columns.set_strings('category', rows, pd.Series(categories))
+        self._recategorized.setdefault(month_key, {}).update(zip(keys, categories))
+        
+        # Category totals can't be adjusted for min/max, so the month's aggregates are recomputed
+        self._month_changed(month_key)
+        self._month_indexes.pop(month_key, None)
+        self._month_aggs[month_key] = MonthAggregates.from_frame(self.get_month_frame(month_key))
+        self._notify(self._update_listeners, month_key, columns.take(rows))
+    
+    def upsert_transactions(self, transactions_df: pd.DataFrame,
+                            date_column: str = 'Date',
+                            vendor_column: str = 'Vendor',
+                            amount_column: str = 'Amount',
+                            category_column: str = 'Category',
+                            occurrences: Dict[str, int] = None) -> Dict[str, int]:
+        """
+        Log transactions from a DataFrame, skipping ones already archived
+        
+        IDs are hashes of date, vendor and amount (see transaction_key);
+        identical rows within one batch get an ordinal suffix (id, id-2, ...)
+        so re-running the same import is a no-op. A row that matches an
+        archived one under a different category (e.g. after a rule change)
+        updates that row's category instead of being logged again.
         
         Args:
             transactions_df: DataFrame with transaction data
@@ -112,36 +451,254 @@ class TransactionLogger:
             vendor_column: Column name for vendor
             amount_column: Column name for amount
             category_column: Column name for category
+            occurrences: Occurrence counts to share across calls that make up one
+                         import (e.g. one per file), so IDs match a single batch
             
         Returns:
-            Number of transactions logged
+            Dictionary with 'inserted', 'updated' (re-categorized), 'skipped' (already
+            archived) and 'invalid' counts
         """
         
-        logged_count = 0
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0, 'invalid': 0}
+        self._sync_with_disk()
+        if transactions_df.empty:
+            return counts
+        
+        # Parse every date and amount in one pass ('mixed' matches per-value parsing)
+        parsed_dates = pd.to_datetime(transactions_df[date_column], errors='coerce', format='mixed')
+        amounts = pd.to_numeric(transactions_df[amount_column], errors='coerce')
+        
+        valid = parsed_dates.notna() & amounts.notna()
+        counts['invalid'] = int((~valid).sum())
+        if counts['invalid']:
+            print(f"⚠️  Skipped {counts['invalid']} transaction(s) with an unreadable date or amount")
+        if not valid.any():
+            return counts
+        
+        df = transactions_df.loc[valid]
+        dates = df[date_column].tolist()
+        vendors = df[vendor_column].tolist()
+        float_amounts = amounts[valid].astype(float).tolist()
+        categories = df[category_column].tolist()
+        descriptions = df['Description'].tolist() if 'Description' in df.columns else [''] * len(df)
+        
+        # Same keys as log_transaction and _month_id_index
+        ids = _ordinal_ids([
+            transaction_key(date, vendor, amount)
+            for date, vendor, amount in zip(dates, vendors, float_amounts)
+        ], occurrences)
+        
+        batch = pd.DataFrame({
+            'id': ids,
+            'date': dates,
+            'vendor': vendors,
+            'amount': float_amounts,
+            'category': categories,
+            'description': descriptions,
+            'logged_at': datetime.now().isoformat()
+        })
+        month_keys = pd.Series(parsed_dates[valid].dt.strftime('%Y-%m').to_numpy(), index=batch.index)
+        
+        # One append per month; keys already archived are skipped, or re-categorized
+        for month_key, group in batch.groupby(month_keys, sort=False):
+            known = self._month_id_index(month_key)
+            archived_rows = group['id'].map(known)
+            existing = group[archived_rows.notna()]
+            new_rows = group[archived_rows.isna()]
+            
+            if not existing.empty:
+                rows = archived_rows[existing.index].to_numpy(dtype=np.int64)
+                columns = self._month_columns(month_key)
+                stored = columns.table.decode_many(columns.code_array('category')[rows])
+                changed = existing['category'].astype(str).to_numpy() != stored
+                if changed.any():
+                    self._recategorize(month_key, rows[changed], existing['id'][changed].tolist(),
+                                       existing['category'][changed].astype(str).tolist())
+                    counts['updated'] += int(changed.sum())
+                counts['skipped'] += int((~changed).sum())
+            if new_rows.empty:
+                continue
+            
+            columns = self._month_columns(month_key)
+            first_row = len(columns)
+            self._month_aggregates(month_key).add_frame(new_rows)
+            columns.extend_frame(new_rows)
+            known.update(zip(new_rows['id'], range(first_row, first_row + len(new_rows))))
+            self._month_changed(month_key)
+            self._notify_insert(month_key, new_rows)
+            counts['inserted'] += len(new_rows)
+        
+        self.current_month_key = month_keys.iloc[-1]
+        return counts
+    
+    def log_transactions_batch(self, transactions_df: pd.DataFrame, 
+                               date_column: str = 'Date',
+                               vendor_column: str = 'Vendor',
+                               amount_column: str = 'Amount',
+                               category_column: str = 'Category') -> int:
+        """
+        Log multiple transactions from DataFrame (see upsert_transactions)
         
-        for idx, row in transactions_df.iterrows():
-            try:
-                self.log_transaction(
-                    date=row[date_column],
-                    vendor=row[vendor_column],
-                    amount=row[amount_column],
-                    category=row[category_column],
-                    description=row.get('Description', '')
-                )
-                logged_count += 1
-            except Exception as e:
-                print(f"⚠️  Skipped transaction at row {idx}: {e}")
+        Returns:
+            Number of new transactions logged
+        """
         
-        return logged_count
+        counts = self.upsert_transactions(
+            transactions_df, date_column, vendor_column, amount_column, category_column
+        )
+        return counts['inserted']
     
     def get_month_transactions(self, month_key: str) -> List[Dict]:
         """Get all transactions for a specific month"""
-        return self.transactions_by_month.get(month_key, [])
+        self._sync_with_disk()
+        if month_key not in self._month_listing():
+            return []
+        return self._month_columns(month_key).to_records()
+    
+    def get_month_frame(self, month_key: str) -> pd.DataFrame:
+        """Get a month's transactions as a typed DataFrame"""
+        self._sync_with_disk()
+        frame = self._month_frames.get(month_key)
+        if frame is None:
+            if month_key in self._month_listing():
+                frame = self._month_columns(month_key).to_frame()
+                self._cache_frame(month_key, frame)
+            else:
+                frame = MonthColumns(self.strings).to_frame()
+        return frame
+    
+    def get_month_aggregates(self, month_key: str) -> MonthAggregates:
+        """
+        Per-category and per-vendor aggregates for a month, without reading
+        rows when the month is saved (manifest) or stored in SQLite
+        """
+        self._sync_with_disk()
+        if month_key in self._month_aggs:
+            return self._month_aggs[month_key]
+        if month_key not in self.transactions_by_month.dirty and month_key in self.manifest.months:
+            return self.manifest.aggregates(month_key)
+        if month_key not in self.transactions_by_month and self.backend.supports_aggregates:
+            with self.lock.shared():
+                return self.backend.aggregate_month(month_key)
+        return self._month_aggregates(month_key)
+    
+    def _month_index(self, month_key: str) -> Tuple[MonthColumns, MonthIndex]:
+        """A month's columns and query index, loading the month if needed"""
+        columns = self._month_columns(month_key)
+        cached = self._month_indexes.get(month_key)
+        if cached is None or cached[0] is not columns or cached[1] != len(columns):
+            index = MonthIndex(columns)
+            cached = (columns, len(columns), index)
+            self._month_indexes[month_key] = cached
+            
+            # String codes are never reused, so names only ever get added
+            for column, rows_by_code in (('vendor', index.vendor_rows), ('category', index.category_rows)):
+                if not self._indexed_codes[column].issuperset(rows_by_code):
+                    self._indexed_codes[column].update(rows_by_code)
+                    self._name_indexes.pop(column, None)
+        return cached[0], cached[2]
+    
+    def _name_index(self, column: str) -> NameIndex:
+        """Sorted vendor or category names across every month indexed so far"""
+        if column not in self._name_indexes:
+            self._name_indexes[column] = NameIndex(self.strings.strings[code] for code in self._indexed_codes[column])
+        return self._name_indexes[column]
+    
+    @staticmethod
+    def _query_day(value, end: bool = False) -> Tuple[int, str]:
+        """Day number and month key for a query bound (a 'YYYY-MM' end means the month's last day)"""
+        text = str(value)
+        if end and re.fullmatch(r'\d{4}-\d{2}', text):
+            stamp = pd.Period(text, freq='M').end_time.normalize()
+        else:
+            stamp = pd.Timestamp(value).normalize()
+        return (stamp - pd.Timestamp('1970-01-01')).days, stamp.strftime('%Y-%m')
+    
+    def query(self,
+              start=None,
+              end=None,
+              vendor=None,
+              vendor_prefix: str = None,
+              vendor_contains: str = None,
+              category=None,
+              min_amount: float = None,
+              max_amount: float = None,
+              limit: int = None) -> pd.DataFrame:
+        """
+        Find transactions across the archive using the date, vendor and category indexes
+        
+        Months outside the date range, or whose manifest aggregates show no
+        matching vendor, category or amount, are skipped without reading rows.
+        Vendor and category matches ignore case.
+        
+        Args:
+            start: First date (inclusive), e.g. '2026-03-01' or '2026-03'
+            end: Last date (inclusive); a bare month ('2026-06') includes the whole month
+            vendor: Vendor name or list of names
+            vendor_prefix: Text the vendor name starts with
+            vendor_contains: Text anywhere in the vendor name
+            category: Category name or list of names
+            min_amount: Smallest amount to include
+            max_amount: Largest amount to include
+            limit: Stop after this many transactions (earliest first)
+            
+        Returns:
+            DataFrame of matching transactions in date order, with a 'month' column
+        """
+        vendors = [vendor] if isinstance(vendor, str) else vendor
+        categories = [category] if isinstance(category, str) else category
+        first_day, first_month = self._query_day(start) if start is not None else (None, None)
+        last_day, last_month = self._query_day(end, end=True) if end is not None else (None, None)
+        
+        months = [
+            m for m in self.get_available_months()
+            if (first_month is None or m >= first_month) and (last_month is None or m <= last_month)
+        ]
+        
+        # Prune with per-month aggregates (the manifest for saved months)
+        vendor_match = name_matcher(vendors, vendor_prefix, vendor_contains)
+        category_match = name_matcher(categories)
+        if vendor_match or category_match or min_amount is not None or max_amount is not None:
+            candidates = []
+            for month_key in months:
+                aggs = self.get_month_aggregates(month_key)
+                if not aggs.count:
+                    continue
+                if vendor_match and not any(vendor_match(name) for name in aggs.by_vendor):
+                    continue
+                if category_match and not any(category_match(name) for name in aggs.by_category):
+                    continue
+                if (min_amount is not None and aggs.max < min_amount) or (max_amount is not None and aggs.min > max_amount):
+                    continue
+                candidates.append(month_key)
+            months = candidates
+        
+        indexes = {month_key: self._month_index(month_key) for month_key in months}
+        vendor_codes = resolve_codes(self.strings, self._name_index('vendor'), vendors, vendor_prefix, vendor_contains)
+        category_codes = resolve_codes(self.strings, self._name_index('category'), categories)
+        
+        selections = []
+        month_labels = []
+        found = 0
+        for month_key, (columns, index) in indexes.items():
+            rows = index.select(first_day, last_day, vendor_codes, category_codes, min_amount, max_amount)
+            if limit is not None:
+                rows = rows[:limit - found]
+            selections.append((columns, rows))
+            month_labels.append(np.full(len(rows), month_key, dtype=object))
+            found += len(rows)
+            if limit is not None and found >= limit:
+                break
+        
+        # Decode every selected row in one pass
+        result = take_rows(selections)
+        result['month'] = np.concatenate(month_labels) if month_labels else np.empty(0, dtype=object)
+        return result
     
     def get_available_months(self) -> List[str]:
         """Get list of months with transaction data (sorted)"""
-        months = sorted(self.transactions_by_month.keys())
-        return months
+        self._sync_with_disk()
+        return sorted(self._month_listing())
     
     def calculate_monthly_summary(self, month_key: str) -> Dict:
         """
@@ -154,47 +711,21 @@ class TransactionLogger:
             Dictionary with summary statistics
         """
         
-        transactions = self.get_month_transactions(month_key)
-        
-        if not transactions:
-            return {
-                'month': month_key,
-                'total_transactions': 0,
-                'total_amount': 0,
-                'average_spending': 0,
-                'by_category': {},
-                'top_vendors': [],
-                'available': False
-            }
-        
-        # Convert to DataFrame for analysis
-        df = pd.DataFrame(transactions)
-        
-        # Category breakdown
-        category_summary = df.groupby('category')['amount'].agg(['sum', 'count', 'mean']).to_dict('index')
-        category_breakdown = {}
-        for cat, stats in category_summary.items():
-            category_breakdown[cat] = {
-                'total': float(stats['sum']),
-                'count': int(stats['count']),
-                'average': float(stats['mean'])
-            }
-        
-        # Top vendors
-        top_vendors = df.groupby('vendor')['amount'].sum().sort_values(ascending=False).head(10)
-        top_vendors_dict = {vendor: float(amount) for vendor, amount in top_vendors.items()}
-        
-        summary = {
-            'month': month_key,
-            'total_transactions': len(transactions),
-            'total_amount': float(df['amount'].sum()),
-            'average_spending': float(df['amount'].mean()),
-            'max_transaction': float(df['amount'].max()),
-            'min_transaction': float(df['amount'].min()),
-            'by_category': category_breakdown,
-            'top_vendors': top_vendors_dict,
-            'available': True
-        }
+        self._sync_with_disk()
+        if month_key in self.monthly_summaries:
+            return self.monthly_summaries[month_key]
+        
+        if month_key in self._month_aggs:
+            summary = self._month_aggs[month_key].summary(month_key)
+        elif month_key not in self.transactions_by_month.dirty and month_key in self.manifest.months:
+            # Saved months are answered from the manifest without reading rows
+            summary = self.manifest.summary(month_key)
+        elif month_key not in self.transactions_by_month and self.backend.supports_aggregates:
+            # Aggregate in storage without loading rows
+            with self.lock.shared():
+                summary = self.backend.summarize_month(month_key)
+        else:
+            summary = self._month_aggregates(month_key).summary(month_key)
         
         self.monthly_summaries[month_key] = summary
         return summary
@@ -261,7 +792,13 @@ class TransactionLogger:
     
     def save_monthly_logs(self) -> Dict[str, Path]:
         """
-        Save all transaction logs to JSON files
+        Save months with unsaved changes using the configured storage backend
+        
+        Months already in storage only get their new rows appended; new months,
+        and months with re-categorized rows, are written whole (temp file + rename). Months whose appended segments
+        have grown past the backend's threshold are compacted. Runs under the
+        archive's exclusive lock; months another process saved since we loaded
+        them are reloaded and our unsaved rows re-applied first.
         
         Returns:
             Dictionary of month -> file path
@@ -269,58 +806,134 @@ class TransactionLogger:
         
         saved_files = {}
         
-        for month_key, transactions in self.transactions_by_month.items():
-            # Create JSON file for the month
-            file_path = self.log_dir / f"transactions_{month_key}.json"
-            
-            log_data = {
-                'month': month_key,
-                'generated_at': datetime.now().isoformat(),
-                'transaction_count': len(transactions),
-                'transactions': transactions
-            }
+        with self.lock.exclusive():
+            self._sync_with_disk()
             
-            with open(file_path, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            for month_key in sorted(self.transactions_by_month.dirty):
+                if self.manifest.content_version(month_key) != self._month_versions.get(month_key, 0):
+                    self._rebase_month(month_key)
+                
+                file_path = self._save_month(month_key)
+                if file_path is not None:
+                    saved_files[month_key] = file_path
             
-            saved_files[month_key] = file_path
-            print(f"✓ Saved {len(transactions)} transactions for {month_key} → {file_path}")
+            if saved_files:
+                self.manifest.backend = self.backend.name
+                self.manifest.save()
+        
+        for callback in self._save_listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Save listener failed: {e}")
         
         return saved_files
     
+    def _rebase_month(self, month_key: str):
+        """Reload a month another process has saved, then re-apply our unsaved rows and category changes"""
+        pending = self.transactions_by_month.get(month_key).to_frame(start=self._saved_counts.get(month_key, 0))
+        recategorized = self._recategorized.pop(month_key, {})
+        self._load_month(month_key)
+        
+        known = self._month_id_index(month_key)
+        new_rows = pending[~pending['id'].isin(known)]
+        if not new_rows.empty:
+            columns = self._month_columns(month_key)
+            first_row = len(columns)
+            self._month_aggregates(month_key).add_frame(new_rows)
+            columns.extend_frame(new_rows)
+            known.update(zip(new_rows['id'], range(first_row, first_row + len(new_rows))))
+            self._drop_frame(month_key)
+            self.transactions_by_month.mark_dirty(month_key)
+        
+        still_known = [key for key in recategorized if key in known]
+        if still_known:
+            rows = np.array([known[key] for key in still_known], dtype=np.int64)
+            self._recategorize(month_key, rows, still_known, [recategorized[key] for key in still_known])
+        
+        print(f"✓ Merged {len(new_rows)} unsaved transactions for {month_key} with changes from another process")
+    
+    def _save_month(self, month_key: str) -> Optional[Path]:
+        """Write one dirty month's unsaved rows; returns the file written, if any"""
+        columns = self.transactions_by_month.get(month_key)
+        saved = self._saved_counts.get(month_key, 0)
+        recategorized = self._recategorized.pop(month_key, None)
+        
+        if len(columns) == saved and not recategorized:
+            self.transactions_by_month.mark_clean(month_key)
+            return None
+        
+        if saved and not recategorized:
+            delta = columns.to_frame(start=saved)
+            file_path = self.backend.append_month(month_key, delta)
+            if self.backend.needs_compaction(month_key):
+                file_path = self.backend.compact_month(month_key)
+        else:
+            file_path = self.backend.write_month(month_key, self.get_month_frame(month_key))
+        
+        self._saved_counts[month_key] = len(columns)
+        self.manifest.update_month(month_key, self._month_aggregates(month_key))
+        self._month_versions[month_key] = self.manifest.content_version(month_key)
+        self.transactions_by_month.mark_clean(month_key)
+        
+        if recategorized:
+            print(f"✓ Re-categorized {len(recategorized)} archived transactions for {month_key} → {file_path}")
+        if len(columns) > saved:
+            print(f"✓ Saved {len(columns) - saved} new transactions for {month_key} → {file_path}")
+        return file_path
+    
+    def _load_month(self, month_key: str) -> int:
+        """Read one month from the archive into memory; returns its row count"""
+        with self.lock.shared():
+            # Sync first so the manifest entry describes the rows we read
+            self._sync_with_disk()
+            df = self.backend.read_month(month_key)
+            self._month_versions[month_key] = self.manifest.content_version(month_key)
+        self._month_ids.pop(month_key, None)
+        self._month_aggs.pop(month_key, None)
+        self.monthly_summaries.pop(month_key, None)
+        self.transactions_by_month.put(month_key, MonthColumns.from_frame(df, self.strings))
+        self._cache_frame(month_key, df)
+        self._saved_counts[month_key] = len(df)
+        return len(df)
+    
     def load_monthly_logs(self, month_key: str = None) -> int:
         """
-        Load transaction logs from JSON files
+        Refresh the list of archived months, or load one month now
+        
+        Months are otherwise loaded on first access, so a plain call only
+        lists what is available.
         
         Args:
-            month_key: Specific month to load (YYYY-MM), or None for all
+            month_key: Specific month to load (YYYY-MM), or None to list months
             
         Returns:
             Number of transactions loaded
         """
         
-        total_loaded = 0
-        
-        if month_key:
-            # Load specific month
-            file_path = self.log_dir / f"transactions_{month_key}.json"
-            if file_path.exists():
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    self.transactions_by_month[month_key] = data['transactions']
-                    total_loaded = len(data['transactions'])
-                    print(f"✓ Loaded {total_loaded} transactions for {month_key}")
-        else:
-            # Load all months
-            for file_path in self.log_dir.glob("transactions_*.json"):
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    month = data['month']
-                    self.transactions_by_month[month] = data['transactions']
-                    total_loaded += len(data['transactions'])
-                    print(f"✓ Loaded {len(data['transactions'])} transactions for {month}")
-        
-        return total_loaded
+        if month_key is None:
+            # Pick up saves from other processes, and months the manifest hasn't seen
+            with self.lock.exclusive():
+                self._sync_with_disk()
+                self.monthly_summaries = {m: s for m, s in self.monthly_summaries.items()
+                                          if m in self.transactions_by_month.dirty}
+                if self.manifest.backend != self.backend.name:
+                    self.manifest.rebuild(self.backend)
+                else:
+                    missing = [m for m in self.backend.list_months() if m not in self.manifest.months]
+                    if missing:
+                        self.manifest.rebuild(self.backend, missing)
+            self._known_months = set(self.manifest.list_months()) | self.transactions_by_month.dirty
+            print(f"✓ {self.backend.name} archive: {len(self._known_months)} month(s) available")
+            return 0
+        
+        if month_key in self.transactions_by_month.dirty or not self.backend.has_month(month_key):
+            return 0
+        
+        count = self._load_month(month_key)
+        self._month_listing().add(month_key)
+        print(f"✓ Loaded {count} transactions for {month_key}")
+        return count
     
     def build_comparison_context(self, month1: str = None, month2: str = None) -> str:
         """
@@ -395,8 +1008,8 @@ def get_transaction_logger() -> TransactionLogger:
         _transaction_logger = TransactionLogger()
     return _transaction_logger
 
-def init_transaction_logger(log_dir: str = None) -> TransactionLogger:
+def init_transaction_logger(log_dir: str = None, backend: str = None) -> TransactionLogger:
     """Initialize transaction logger"""
     global _transaction_logger
-    _transaction_logger = TransactionLogger(log_dir)
+    _transaction_logger = TransactionLogger(log_dir, backend)
     return _transaction_logger
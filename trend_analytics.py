@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Multi-Month Trend Analytics
+Builds month × category and month × vendor pivots across the whole archive
+(from the per-month aggregates, no transaction rows) and computes rolling
+averages, year-over-year changes and trend slopes for every column at once
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from transaction_logger import TransactionLogger, get_transaction_logger
+
+# Pivot dimensions: name -> MonthAggregates attribute
+TREND_DIMENSIONS = {
+    'category': 'by_category',
+    'vendor': 'by_vendor',
+}
+
+
+def month_range(months: List[str]) -> List[str]:
+    """Every month from the first to the last key (YYYY-MM), gaps included"""
+    if not months:
+        return []
+    periods = pd.period_range(min(months), max(months), freq='M')
+    return [str(p) for p in periods]
+
+
+def rolling_average(pivot: pd.DataFrame, window: int = 3) -> pd.DataFrame:
+    """Trailing mean over `window` months for every column"""
+    return pivot.rolling(window, min_periods=1).mean()
+
+
+def year_over_year(pivot: pd.DataFrame, percent: bool = False) -> pd.DataFrame:
+    """
+    Change versus the same month a year earlier
+
+    Args:
+        pivot: Month × key totals with a gap-free monthly index
+        percent: Return percent change instead of the difference
+
+    Returns:
+        Frame of changes (NaN where the prior year is missing or zero for percent)
+    """
+    prior = pivot.shift(12)
+    if percent:
+        return (pivot - prior) / prior.abs().replace(0, np.nan) * 100
+    return pivot - prior
+
+
+def trend_slopes(pivot: pd.DataFrame, window: int = None) -> pd.Series:
+    """
+    Least-squares slope (change per month) for every column
+
+    Args:
+        pivot: Month × key totals
+        window: Fit only the last `window` months (default: all)
+
+    Returns:
+        Series of slopes indexed by column
+    """
+    data = pivot.tail(window) if window else pivot
+    if len(data) < 2:
+        return pd.Series(0.0, index=pivot.columns)
+
+    y = data.to_numpy(dtype=float)
+    x = np.arange(len(data), dtype=float)
+    x -= x.mean()
+    slopes = x @ (y - y.mean(axis=0)) / (x @ x)
+    return pd.Series(slopes, index=pivot.columns)
+
+
+class TrendAnalytics:
+    """Pivots and trend statistics over TransactionLogger's archive"""
+
+    def __init__(self, tx_logger: TransactionLogger = None):
+        self.tx_logger = tx_logger or get_transaction_logger()
+
+    def pivot(self, by: str = 'category', months: List[str] = None) -> pd.DataFrame:
+        """
+        Month × category (or vendor) totals
+
+        Args:
+            by: 'category' or 'vendor'
+            months: Months to include (default: the whole archive); gaps become 0
+
+        Returns:
+            DataFrame indexed by month with one column per key
+        """
+        if by not in TREND_DIMENSIONS:
+            raise ValueError(f"Unknown trend dimension '{by}' (choose from: {', '.join(TREND_DIMENSIONS)})")
+
+        available = set(self.tx_logger.get_available_months())
+        months = month_range(months or sorted(available))
+        attr = TREND_DIMENSIONS[by]
+
+        rows = {}
+        for month_key in months:
+            if month_key in available:
+                stats = getattr(self.tx_logger.get_month_aggregates(month_key), attr)
+                rows[month_key] = {key: stat['total'] for key, stat in stats.items()}
+            else:
+                rows[month_key] = {}
+
+        pivot = pd.DataFrame.from_dict(rows, orient='index').reindex(months).fillna(0.0)
+        pivot.index.name = 'month'
+        return pivot.sort_index(axis=1)
+
+    def analyze(self, by: str = 'category', window: int = 3, months: List[str] = None) -> Dict[str, object]:
+        """
+        All trend statistics in one call
+
+        Args:
+            by: 'category' or 'vendor'
+            window: Months for the rolling average and the slope fit
+            months: Months to include (default: the whole archive)
+
+        Returns:
+            Dictionary with 'totals', 'rolling', 'yoy', 'yoy_percent' (frames)
+            and 'slope' (series, change per month over the last `window` months)
+        """
+        totals = self.pivot(by, months)
+        return {
+            'totals': totals,
+            'rolling': rolling_average(totals, window),
+            'yoy': year_over_year(totals),
+            'yoy_percent': year_over_year(totals, percent=True),
+            'slope': trend_slopes(totals, window),
+        }
+
+    def build_trend_context(self, window: int = 3, top_n: int = 10) -> str:
+        """
+        Build context for LLM describing spending trends across every archived month
+
+        Args:
+            window: Months for rolling averages and slopes
+            top_n: Categories/vendors to list per section
+
+        Returns:
+            Formatted context string for LLM
+        """
+        months = self.tx_logger.get_available_months()
+        if len(months) < 2:
+            return "No transaction data available for trend analysis (need at least 2 months)."
+
+        trends = self.analyze('category', window)
+        totals = trends['totals']
+        latest = totals.index[-1]
+        monthly_total = totals.sum(axis=1)
+
+        context = f"""
+MULTI-MONTH SPENDING TRENDS
+
+Months: {totals.index[0]} to {latest} ({len(totals)} months)
+Rolling window: {window} months
+
+=== TOTAL SPENDING BY MONTH ===
+"""
+        for month_key, total in monthly_total.items():
+            context += f"{month_key}: ${total:.2f}\n"
+
+        context += f"\nOverall trend: ${trend_slopes(monthly_total.to_frame('total'), window)['total']:+.2f} per month (last {window} months)\n"
+
+        # Rank by size of the latest rolling average
+        latest_rolling = trends['rolling'].loc[latest]
+        ranked = latest_rolling.abs().sort_values(ascending=False).index[:top_n]
+
+        context += f"\n=== CATEGORY TRENDS ({latest}) ===\n"
+        for cat in ranked:
+            line = (f"{cat}: ${totals.at[latest, cat]:.2f} this month, "
+                    f"{window}-month avg ${latest_rolling[cat]:.2f}, "
+                    f"trend ${trends['slope'][cat]:+.2f}/month")
+            yoy = trends['yoy_percent'].at[latest, cat]
+            if not pd.isna(yoy):
+                line += f", {yoy:+.1f}% vs last year"
+            context += line + "\n"
+
+        vendor_slopes = self.analyze('vendor', window)['slope']
+        rising = vendor_slopes[vendor_slopes > 0].sort_values(ascending=False).head(top_n)
+        falling = vendor_slopes[vendor_slopes < 0].sort_values().head(top_n)
+
+        context += f"\n=== VENDORS TRENDING UP (amount per month) ===\n"
+        for vendor, slope in rising.items():
+            context += f"{vendor}: ${slope:+.2f}/month\n"
+
+        context += f"\n=== VENDORS TRENDING DOWN (amount per month) ===\n"
+        for vendor, slope in falling.items():
+            context += f"{vendor}: ${slope:+.2f}/month\n"
+
+        return context
+
+
+# Global trend analytics instance
+_trend_analytics = None
+
+def get_trend_analytics() -> TrendAnalytics:
+    """Get or create global trend analytics"""
+    global _trend_analytics
+    if _trend_analytics is None:
+        _trend_analytics = TrendAnalytics()
+    return _trend_analytics